@@ -0,0 +1,78 @@
+"""Latency benchmark for the combined ``/api/analytics/`` endpoint.
+
+Compares the old serial awaits, the concurrent fan-out and the
+single-query RPC mode against an in-memory fake client with a simulated
+per-query round-trip, for both analytics sources: the default aggregate
+RPCs over the rollup counters and the precomputed tables. Run from
+``backend/``::
+
+    python -m benchmarks.bench_analytics --latency 0.03 --iterations 20
+
+Serial latency is roughly ``5 * latency``, the fan-out roughly ``latency``
+(bounded by the slowest dataset) and the RPC mode a single round-trip.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+import database  # noqa: E402
+from config import get_settings  # noqa: E402
+from routes import analytics  # noqa: E402
+from benchmarks.datasets import FUNCTIONS, seed  # noqa: E402
+from benchmarks.fake_supabase import AsyncFakeClient  # noqa: E402
+
+
+async def _serial(hospital_id):
+    """The pre-fan-out implementation: one await after another."""
+    return analytics.AnalyticsResponse(
+        weekly_patients=await analytics.get_weekly_patients(hospital_id),
+        department_distribution=await analytics.get_department_distribution(hospital_id),
+        monthly_revenue=await analytics.get_monthly_revenue(hospital_id),
+        patient_trends=await analytics.get_patient_trends(hospital_id),
+        department_performance=await analytics.get_department_performance(hospital_id)
+    )
+
+
+async def _measure(handler, iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await handler("H-001")
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.03, help="Simulated round-trip in seconds")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=1000, help="Seeded patients and appointments")
+    args = parser.parse_args()
+
+    database._async_clients[database.ANON] = AsyncFakeClient(seed(args.rows), args.latency, functions=FUNCTIONS)
+    settings = get_settings()
+    settings.db_client_mode = "async"
+    # Measure round-trips, not cache hits, against the seeded tables
+    settings.cache_backend = "none"
+
+    print(f"{'source':>10} {'mode':>10} {'mean ms':>10} {'p95 ms':>10}")
+    for source in ("aggregate", "tables"):
+        settings.analytics_source = source
+        for name, handler, single_query in [
+            ("serial", _serial, False),
+            ("fan-out", analytics.get_all_analytics, False),
+            ("rpc", analytics.get_all_analytics, True),
+        ]:
+            settings.analytics_single_query = single_query
+            timings = sorted(asyncio.run(_measure(handler, args.iterations)))
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{source:>10} {name:>10} {statistics.mean(timings):>10.1f} {p95:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compression benchmark for list responses.
+
+Renders real list payloads (patients, appointments, doctors at several
+page sizes) from the seeded dataset and reports, for each coding and
+level, the compression ratio and CPU time per response, plus how many
+bytes each coding saves on small bodies so ``COMPRESSION_MIN_SIZE`` can
+be set where compression stops paying. Run from ``backend/``::
+
+    python -m benchmarks.bench_compression --rows 10000 --repeat 20
+
+brotli and zstd are skipped when their packages are not installed.
+"""
+import argparse
+import os
+import time
+from typing import Dict, List, Tuple
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+from middleware import compression  # noqa: E402
+from models.appointment import Appointment  # noqa: E402
+from models.doctor import Doctor  # noqa: E402
+from models.patient import Patient  # noqa: E402
+from serialization import dumps, shape  # noqa: E402
+from benchmarks.datasets import seed  # noqa: E402
+
+MODELS = {"patients": Patient, "appointments": Appointment, "doctors": Doctor}
+
+LEVELS: Dict[str, Tuple[int, ...]] = {"gzip": (1, 6, 9), "br": (1, 4, 6), "zstd": (1, 3, 9)}
+
+SMALL_SIZES = (128, 256, 512, 1024, 2048, 4096)
+
+
+def _encoders() -> Dict[str, type]:
+    encoders = {"gzip": compression._Gzip}
+    if compression.brotli is not None:
+        encoders["br"] = compression._Brotli
+    if compression.zstandard is not None:
+        encoders["zstd"] = compression._Zstd
+    return encoders
+
+
+def _compress(encoder: type, level: int, body: bytes) -> bytes:
+    instance = encoder(level)
+    return instance.compress(body) + instance.finish()
+
+
+def _payloads(rows: int, limits: List[int]) -> List[Tuple[str, bytes]]:
+    tables = seed(rows)
+    return [
+        (f"{table}?limit={limit}", dumps(shape(model, tables[table][:limit])))
+        for table, model in MODELS.items()
+        for limit in limits
+    ]
+
+
+def _cpu_ms(encoder: type, level: int, body: bytes, repeat: int) -> float:
+    start = time.thread_time()
+    for _ in range(repeat):
+        _compress(encoder, level, body)
+    return (time.thread_time() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--limits", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    encoders = _encoders()
+    payloads = _payloads(args.rows, args.limits)
+
+    print(f"{'payload':>24} {'bytes':>9} {'coding':>10} {'ratio':>7} {'cpu ms':>8} {'MB/s':>8}")
+    for label, body in payloads:
+        for name, encoder in encoders.items():
+            for level in LEVELS[name]:
+                ratio = len(_compress(encoder, level, body)) / len(body)
+                cpu = _cpu_ms(encoder, level, body, args.repeat)
+                throughput = len(body) / 1e6 / (cpu / 1000) if cpu else float("inf")
+                print(
+                    f"{label:>24} {len(body):>9} {f'{name}-{level}':>10} {ratio:>7.3f}"
+                    f" {cpu:>8.3f} {throughput:>8.1f}"
+                )
+
+    # Bytes saved on small bodies, at the default levels
+    body = payloads[0][1]
+    print()
+    print(f"{'body bytes':>10} " + " ".join(f"{name:>8}" for name in encoders))
+    for size in SMALL_SIZES:
+        sample = body[:size]
+        saved = [size - len(_compress(encoder, LEVELS[name][1], sample)) for name, encoder in encoders.items()]
+        print(f"{size:>10} " + " ".join(f"{value:>8}" for value in saved))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Concurrency benchmark for the repository layer.
+
+Compares throughput of the old inline sync ``execute()`` against the
+thread-pool and native async modes of ``repository.execute`` while the
+number of in-flight requests grows. Run from ``backend/``::
+
+    python -m benchmarks.bench_concurrency --latency 0.05 --requests 200
+
+With inline calls throughput stays flat at ``1 / latency`` regardless of
+concurrency; with either repository mode it scales with the number of
+in-flight requests (up to ``DB_MAX_WORKERS`` for the thread pool).
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+import database  # noqa: E402
+import repository  # noqa: E402
+from config import get_settings  # noqa: E402
+from benchmarks.fake_supabase import FakeClient, AsyncFakeClient  # noqa: E402
+
+ROWS = [
+    {"id": f"P-{i:04d}", "hospital_id": "H-001", "name": f"Patient {i}"}
+    for i in range(50)
+]
+
+
+async def _inline_query():
+    """The pre-repository pattern: a blocking call inside the coroutine."""
+    return database.get_supabase().table("patients").select("*").eq("hospital_id", "H-001").execute().data
+
+
+async def _repository_query():
+    return await repository.Repository("patients").find(filters={"hospital_id": "H-001"})
+
+
+async def _run(query, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await query()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated round-trip in seconds")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    database._clients[database.ANON] = FakeClient({"patients": list(ROWS)}, args.latency)
+    database._async_clients[database.ANON] = AsyncFakeClient({"patients": list(ROWS)}, args.latency)
+    settings = get_settings()
+
+    modes = [("inline", _inline_query), ("threadpool", _repository_query), ("async", _repository_query)]
+    print(f"{'concurrency':>11} " + " ".join(f"{name + ' req/s':>16}" for name, _ in modes))
+    for concurrency in args.concurrency:
+        results = []
+        for name, query in modes:
+            if name != "inline":
+                settings.db_client_mode = name
+            results.append(asyncio.run(_run(query, args.requests, concurrency)))
+        print(f"{concurrency:>11} " + " ".join(f"{rate:>16.1f}" for rate in results))
+    repository.shutdown_executor()
+
+
+if __name__ == "__main__":
+    main()
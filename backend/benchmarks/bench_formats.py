@@ -0,0 +1,75 @@
+"""Response format benchmark for bulk consumers.
+
+For pages of seeded patients and appointments, compares JSON, MessagePack
+and Arrow IPC on payload size, server encode time and client decode
+time (JSON and MessagePack to lists of dicts, Arrow to a table). Run
+from ``backend/``::
+
+    python -m benchmarks.bench_formats --rows 100000 --page 1000 --repeat 5
+
+MessagePack and Arrow are skipped when their packages are not installed.
+"""
+import argparse
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+import formats  # noqa: E402
+from models.appointment import Appointment  # noqa: E402
+from models.patient import Patient  # noqa: E402
+from serialization import dumps, shape  # noqa: E402
+from benchmarks.datasets import seed  # noqa: E402
+
+MODELS = {"patients": Patient, "appointments": Appointment}
+
+Codec = Tuple[Callable[[Any, List[Dict[str, Any]]], bytes], Callable[[bytes], Any]]
+
+
+def _codecs() -> Dict[str, Codec]:
+    codecs: Dict[str, Codec] = {"json": (lambda model, rows: dumps(rows), json.loads)}
+    if formats.msgpack is not None:
+        codecs["msgpack"] = (lambda model, rows: formats.msgpack.packb(rows), formats.msgpack.unpackb)
+    if formats.pyarrow is not None:
+        codecs["arrow"] = (
+            lambda model, rows: formats.arrow_ipc(formats.arrow_schema(model), rows),
+            lambda body: formats.pyarrow.ipc.open_stream(body).read_all()
+        )
+    return codecs
+
+
+def _time(function: Callable[[], Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--page", type=int, default=1000, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tables = seed(args.rows)
+    codecs = _codecs()
+
+    print(f"{'table':>13} {'format':>8} {'bytes':>10} {'encode ms':>10} {'decode ms':>10} {'rows/s decoded':>15}")
+    for table, model in MODELS.items():
+        rows = shape(model, tables[table][:args.page])
+        for name, (encode, decode) in codecs.items():
+            body = encode(model, rows)
+            encode_ms = _time(lambda: encode(model, rows), args.repeat)
+            decode_ms = _time(lambda: decode(body), args.repeat)
+            print(
+                f"{table:>13} {name:>8} {len(body):>10} {encode_ms:>10.2f} {decode_ms:>10.2f}"
+                f" {len(rows) / (decode_ms / 1000):>15.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
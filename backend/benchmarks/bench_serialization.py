@@ -0,0 +1,146 @@
+"""Serialization benchmark for list responses.
+
+Compares, for each response model, rows/sec of FastAPI's validated path
+(``response_model`` validation, then ``JSONResponse``) against the trusted
+read path (``serialization.shape`` then ``TrustedJSONResponse``), with the
+stdlib encoder and with orjson when it is installed. Run from
+``backend/``::
+
+    python -m benchmarks.bench_serialization --rows 10000 --repeat 5
+
+Rows carry the extra columns Supabase returns (timestamps, generated
+search vectors) so both paths do the same narrowing work.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+import serialization  # noqa: E402
+from models.appointment import Appointment, AppointmentExpanded  # noqa: E402
+from models.department import Department  # noqa: E402
+from models.doctor import Doctor  # noqa: E402
+from models.hospital import Hospital  # noqa: E402
+from models.patient import Patient  # noqa: E402
+
+DB_COLUMNS = {"created_at": "2026-01-01T00:00:00+00:00", "updated_at": "2026-01-02T00:00:00+00:00"}
+
+
+def _hospital(i: int) -> Dict[str, Any]:
+    return {"id": f"H-{i:06d}", "name": f"Hospital {i}", "location": "City", "beds": 500, "occupancy": 320, **DB_COLUMNS}
+
+
+def _department(i: int) -> Dict[str, Any]:
+    return {
+        "id": f"DEP-{i:06d}", "hospital_id": "H-001", "name": f"Department {i}", "head": "Dr. Head",
+        "doctors": 12, "nurses": 30, "beds": 40, "patients": 25,
+        "equipment": ["ECG", "MRI", "Ventilator"], "description": "General ward", **DB_COLUMNS
+    }
+
+
+def _doctor(i: int) -> Dict[str, Any]:
+    return {
+        "id": f"D-{i:06d}", "hospital_id": "H-001", "name": f"Dr. Doctor {i}", "specialty": "Cardiology",
+        "department": "Cardiology", "experience": 12, "patients": 40, "availability": "Available",
+        "email": f"doctor{i}@hospital.com", "phone": "+1 (555) 010-0100", "rating": 4.7,
+        "search_vector": "'cardiolog':2 'doctor':1", **DB_COLUMNS
+    }
+
+
+def _patient(i: int) -> Dict[str, Any]:
+    return {
+        "id": f"P-{i:06d}", "hospital_id": "H-001", "name": f"Patient {i}", "age": 20 + i % 70,
+        "gender": "Female", "condition": "Hypertension", "department": "Cardiology",
+        "admission_date": "2026-01-15", "status": "Stable", "room": "C-101",
+        "search_vector": "'hypertens':3 'patient':1", **DB_COLUMNS
+    }
+
+
+def _appointment(i: int) -> Dict[str, Any]:
+    return {
+        "id": f"A-{i:06d}", "hospital_id": "H-001", "patient_name": f"Patient {i}", "patient_id": f"P-{i:06d}",
+        "doctor_name": "Dr. Doctor 1", "doctor_id": None, "department": "Cardiology", "date": "2026-02-01",
+        "time": "10:00 AM", "type": "Consultation", "status": "Scheduled", "room": "C-101",
+        "slot": '["2026-02-01 10:00:00","2026-02-01 10:30:00")', **DB_COLUMNS
+    }
+
+
+def _appointment_expanded(i: int) -> Dict[str, Any]:
+    return {**_appointment(i), "patient": _patient(i), "doctor": _doctor(1)}
+
+
+MODELS: Dict[str, tuple] = {
+    "Hospital": (Hospital, _hospital),
+    "Department": (Department, _department),
+    "Doctor": (Doctor, _doctor),
+    "Patient": (Patient, _patient),
+    "Appointment": (Appointment, _appointment),
+    "AppointmentExpanded": (AppointmentExpanded, _appointment_expanded),
+}
+
+
+def _validated(model) -> Callable[[List[Dict[str, Any]]], bytes]:
+    """What FastAPI does for ``response_model=List[model]``."""
+    field = create_response_field(name="Response", type_=List[model])
+
+    def run(rows):
+        content = asyncio.run(serialize_response(field=field, response_content=rows))
+        return JSONResponse(content).body
+
+    return run
+
+
+def _trusted(model, encode: Callable[[Any], bytes]) -> Callable[[List[Dict[str, Any]]], bytes]:
+    def run(rows):
+        return encode(serialization.shape(model, rows))
+
+    return run
+
+
+def _stdlib(content: Any) -> bytes:
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _rows_per_second(run, rows, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(rows)
+        best = min(best, time.perf_counter() - start)
+    return len(rows) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="rows per response")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per path; the best is reported")
+    args = parser.parse_args()
+
+    paths = {"validated": None, "trusted/json": _stdlib}
+    if serialization.orjson is not None:
+        paths["trusted/orjson"] = serialization.orjson.dumps
+
+    print(f"{args.rows} rows per response, best of {args.repeat}; rows/sec")
+    print(f"{'model':>20}" + "".join(f"{name:>17}" for name in paths) + f"{'speedup':>10}")
+    for name, (model, build) in MODELS.items():
+        rows = [build(i) for i in range(args.rows)]
+        expected = json.loads(_validated(model)(rows[:100]))
+        rates = []
+        for path, encode in paths.items():
+            run = _validated(model) if encode is None else _trusted(model, encode)
+            assert json.loads(run(rows[:100])) == expected, f"{path} output differs for {name}"
+            rates.append(_rows_per_second(run, rows, args.repeat))
+        print(f"{name:>20}" + "".join(f"{rate:>17,.0f}" for rate in rates) + f"{rates[-1] / rates[0]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Throughput benchmark: production workers vs the single reloading process.
+
+Starts real uvicorn servers on ``benchmarks.server_app`` (the API on a
+seeded fake client) and drives them over HTTP from several load-generator
+processes. ``reload`` is the old ``python main.py`` setup, a single worker
+under the reloader; ``workers=N`` is ``serve.py``. Run from ``backend/``::
+
+    python -m benchmarks.bench_server --workers 1 4 --concurrency 64 --requests 4000
+
+Time to ready covers process start, seeding and the worker warm-up. Give
+the load generators CPUs of their own (``--clients``) or they become the
+bottleneck; with fewer cores than workers plus clients extra workers
+cannot help.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+PATHS = [
+    "/api/patients/?limit=50",
+    "/api/patients/P-0000042",
+    "/api/appointments/?limit=50",
+    "/api/doctors/?limit=50",
+    "/api/analytics/",
+    "/health",
+]
+
+APP = "benchmarks.server_app:app"
+
+
+def _start(mode: str, workers: int, args: argparse.Namespace) -> subprocess.Popen:
+    env = {
+        "SUPABASE_URL": "http://localhost",
+        "SUPABASE_KEY": "benchmark",
+        **os.environ,
+        "PORT": str(args.port),
+        "WORKERS": str(workers),
+        "BENCH_ROWS": str(args.rows),
+        "BENCH_LATENCY": str(args.latency),
+        "DEBUG": "False",
+    }
+    if mode == "reload":
+        code = f"import uvicorn; uvicorn.run({APP!r}, host='127.0.0.1', port={args.port}, reload=True, log_level='warning')"
+    else:
+        env["HOST"] = "127.0.0.1"
+        code = f"import serve; serve.run({APP!r})"
+    return subprocess.Popen(
+        [sys.executable, "-c", code], env=env, start_new_session=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def _stop(process: subprocess.Popen) -> None:
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+def _wait_ready(port: int, timeout: float = 120.0) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError("server did not become ready")
+
+
+async def _client(port: int, requests: int, concurrency: int, offset: int) -> Tuple[List[float], int]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30.0) as client:
+        async def worker():
+            nonlocal errors
+            for n in remaining:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(PATHS[(n + offset) % len(PATHS)])
+                    errors += response.status_code >= 400
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def _client_process(job: Tuple[int, int, int, int]) -> Tuple[List[float], int]:
+    return asyncio.run(_client(*job))
+
+
+def _drive(args: argparse.Namespace) -> Dict[str, float]:
+    clients = max(1, args.clients)
+    jobs = [(args.port, args.requests // clients, max(1, args.concurrency // clients), n) for n in range(clients)]
+    with multiprocessing.get_context("spawn").Pool(clients) as pool:
+        start = time.perf_counter()
+        results = pool.map(_client_process, jobs)
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for result, _ in results for latency in result)
+    errors = sum(count for _, count in results)
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--rows", type=int, default=10000, help="Seeded patients and appointments")
+    parser.add_argument("--latency", type=float, default=0.005, help="Simulated round-trip in seconds")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--clients", type=int, default=2, help="Load-generator processes")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    modes = [("reload", 1)] + [("workers", workers) for workers in args.workers]
+    print(f"{'mode':>12} {'ready s':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for mode, workers in modes:
+        process = _start(mode, workers, args)
+        try:
+            ready = _wait_ready(args.port)
+            result = _drive(args)
+        finally:
+            _stop(process)
+        label = mode if mode == "reload" else f"workers={workers}"
+        print(
+            f"{label:>12} {ready:>8.1f} {result['throughput']:>9.1f} {result['p50']:>8.1f}"
+            f" {result['p95']:>8.1f} {result['p99']:>8.1f} {result['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
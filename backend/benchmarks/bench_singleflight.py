@@ -0,0 +1,94 @@
+"""Shift-start stampede benchmark for single-flight reads.
+
+Fires bursts of identical concurrent requests (the doctors list of one
+hospital, the analytics dashboard) at the app on the seeded fake client,
+with the response cache off, and reports upstream queries, burst time
+and p95 latency with single-flight disabled and enabled. Run from
+``backend/``::
+
+    python -m benchmarks.bench_singleflight --burst 200 --latency 0.02
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict, List
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+import httpx  # noqa: E402
+
+import database  # noqa: E402
+import repository  # noqa: E402
+from config import get_settings  # noqa: E402
+from benchmarks.datasets import FUNCTIONS, seed  # noqa: E402
+from benchmarks.fake_supabase import AsyncFakeClient, FakeClient  # noqa: E402
+
+PATHS = {
+    "doctors": "/api/doctors/?hospital_id=H-001&limit=50",
+    "analytics": "/api/analytics/",
+}
+
+
+async def _burst(client: httpx.AsyncClient, path: str, size: int) -> Dict[str, float]:
+    latencies: List[float] = []
+
+    async def one() -> None:
+        start = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(size)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {"elapsed": elapsed * 1000, "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000}
+
+
+async def run(args: argparse.Namespace) -> None:
+    from main import app
+
+    queries = 0
+    execute = repository.execute
+
+    async def counting(build):
+        nonlocal queries
+        queries += 1
+        return await execute(build)
+
+    repository.execute = counting
+    print(f"{'path':>10} {'singleflight':>13} {'queries':>8} {'burst ms':>9} {'p95 ms':>8}")
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, path in PATHS.items():
+                for enabled in (False, True):
+                    get_settings().singleflight_enabled = enabled
+                    await client.get(path)
+                    queries = 0
+                    result = await _burst(client, path, args.burst)
+                    print(
+                        f"{name:>10} {'on' if enabled else 'off':>13} {queries:>8}"
+                        f" {result['elapsed']:>9.1f} {result['p95']:>8.1f}"
+                    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated round-trip in seconds")
+    parser.add_argument("--burst", type=int, default=200, help="Identical concurrent requests")
+    args = parser.parse_args()
+
+    tables = seed(args.rows)
+    database._clients[database.ANON] = FakeClient(tables, args.latency, functions=FUNCTIONS)
+    database._async_clients[database.ANON] = AsyncFakeClient(tables, args.latency, functions=FUNCTIONS)
+    settings = get_settings()
+    settings.cache_backend = "none"
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Seeded datasets and RPC stand-ins for running the whole API on the fake client.
+
+``seed(rows)`` builds deterministic tables sized around ``rows`` patients
+and ``rows`` appointments; hospitals, departments and doctors scale with
+it. ``FUNCTIONS`` holds Python stand-ins for the Postgres functions the
+routers call, for use as ``FakeClient(functions=...)``.
+"""
+import random
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+
+DEPARTMENTS = ["Cardiology", "Neurology", "Pediatrics", "Orthopedics", "Emergency", "Surgery"]
+CONDITIONS = ["Hypertension", "Arrhythmia", "Migraine", "Fracture", "Asthma", "Diabetes", "Appendicitis"]
+FIRST_NAMES = ["Ava", "Liam", "Maya", "Noah", "Zara", "Omar", "Lena", "Ravi", "Iris", "Theo", "Nina", "Kai"]
+LAST_NAMES = ["Patel", "Garcia", "Chen", "Okafor", "Smith", "Nguyen", "Haddad", "Kowalski", "Silva", "Mehta"]
+FIRST_DAY = date(2026, 3, 2)
+DAYS = 60
+# CURRENT_DATE for the analytics stand-ins, so their windows cover the seeded rows
+TODAY = FIRST_DAY
+
+# Rows for the precomputed analytics tables (ANALYTICS_SOURCE=tables)
+WEEKLY_PATIENTS_SAMPLE = [
+    {"day": "Mon", "patients": 45},
+    {"day": "Tue", "patients": 52},
+    {"day": "Wed", "patients": 48},
+    {"day": "Thu", "patients": 61},
+    {"day": "Fri", "patients": 55},
+    {"day": "Sat", "patients": 38},
+    {"day": "Sun", "patients": 32},
+]
+
+DEPARTMENT_DISTRIBUTION_SAMPLE = [
+    {"name": "Emergency", "value": 145, "color": "#EF4444"},
+    {"name": "Surgery", "value": 98, "color": "#3B82F6"},
+    {"name": "Pediatrics", "value": 76, "color": "#10B981"},
+    {"name": "Cardiology", "value": 89, "color": "#F59E0B"},
+    {"name": "Neurology", "value": 54, "color": "#8B5CF6"},
+]
+
+PATIENT_TRENDS_SAMPLE = [
+    {"month": "Jan", "inpatient": 420, "outpatient": 1250},
+    {"month": "Feb", "inpatient": 445, "outpatient": 1310},
+    {"month": "Mar", "inpatient": 468, "outpatient": 1380},
+    {"month": "Apr", "inpatient": 492, "outpatient": 1420},
+    {"month": "May", "inpatient": 515, "outpatient": 1485},
+    {"month": "Jun", "inpatient": 538, "outpatient": 1540},
+]
+
+MONTHLY_REVENUE_SAMPLE = [
+    {"month": "Jan", "revenue": 245000, "expenses": 180000},
+    {"month": "Feb", "revenue": 268000, "expenses": 195000},
+    {"month": "Mar", "revenue": 282000, "expenses": 205000},
+    {"month": "Apr", "revenue": 298000, "expenses": 210000},
+    {"month": "May", "revenue": 315000, "expenses": 225000},
+    {"month": "Jun", "revenue": 332000, "expenses": 230000},
+]
+
+DEPARTMENT_PERFORMANCE_SAMPLE = [
+    {"department": "Cardiology", "satisfaction": 92, "efficiency": 88},
+    {"department": "Neurology", "satisfaction": 89, "efficiency": 85},
+    {"department": "Pediatrics", "satisfaction": 95, "efficiency": 91},
+    {"department": "Orthopedics", "satisfaction": 87, "efficiency": 83},
+    {"department": "Emergency", "satisfaction": 84, "efficiency": 90},
+    {"department": "Surgery", "satisfaction": 90, "efficiency": 87},
+]
+
+ANALYTICS_TABLES = {
+    "weekly_patients": WEEKLY_PATIENTS_SAMPLE,
+    "department_distribution": DEPARTMENT_DISTRIBUTION_SAMPLE,
+    "monthly_revenue": MONTHLY_REVENUE_SAMPLE,
+    "patient_trends": PATIENT_TRENDS_SAMPLE,
+    "department_performance": DEPARTMENT_PERFORMANCE_SAMPLE,
+}
+
+# Palette analytics_department_distribution assigns by rank
+DISTRIBUTION_COLORS = ["#EF4444", "#3B82F6", "#10B981", "#F59E0B", "#8B5CF6", "#EC4899", "#14B8A6", "#F97316"]
+
+Tables = Dict[str, List[Dict[str, Any]]]
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _time(slot: int) -> str:
+    """Slot ``n`` of the 08:00-18:00 day in 15-minute steps, as "HH:MM AM"."""
+    minutes = 8 * 60 + slot * 15
+    hour, minute = divmod(minutes, 60)
+    return f"{(hour - 1) % 12 + 1:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+def seed(rows: int, seed: int = 0) -> Tables:
+    """Deterministic tables with ``rows`` patients and ``rows`` appointments."""
+    rng = random.Random(seed)
+    hospitals = [
+        {"id": f"H-{i:03d}", "name": f"General Hospital {i}", "location": f"City {i}", "beds": 800, "occupancy": 520}
+        for i in range(1, max(1, min(100, rows // 1000)) + 1)
+    ]
+    departments = [
+        {
+            "id": f"DEP-{hospital['id'][2:]}-{d}", "hospital_id": hospital["id"], "name": name,
+            "head": f"Dr. {_name(rng)}", "doctors": 12, "nurses": 30, "beds": 60, "patients": 40,
+            "equipment": ["ECG", "Ventilator"], "description": f"{name} ward"
+        }
+        for hospital in hospitals for d, name in enumerate(DEPARTMENTS)
+    ]
+    doctors = []
+    for i in range(max(len(departments), rows // 50)):
+        department = departments[i % len(departments)]
+        doctors.append({
+            "id": f"D-{i:06d}", "hospital_id": department["hospital_id"], "name": f"Dr. {_name(rng)} {i}",
+            "specialty": department["name"], "department": department["name"],
+            "experience": rng.randint(1, 35), "patients": rng.randint(0, 60),
+            "availability": rng.choice(["Available", "Available", "In Surgery", "Off Duty"]),
+            "email": f"doctor{i}@hospital.test", "phone": f"555-{i % 1000:03d}-{i % 10000:04d}"
+        })
+    for department in departments:
+        department["rooms"] = sorted(
+            f"{doctor['department'][:4].upper()}-{doctor['id'][2:]}" for doctor in doctors
+            if doctor["hospital_id"] == department["hospital_id"] and doctor["department"] == department["name"]
+        )
+    patients = []
+    for i in range(rows):
+        hospital = hospitals[i % len(hospitals)]
+        patients.append({
+            "id": f"P-{i:07d}", "hospital_id": hospital["id"], "name": _name(rng), "age": rng.randint(1, 95),
+            "gender": rng.choice(["Male", "Female", "Other"]), "condition": rng.choice(CONDITIONS),
+            "department": rng.choice(DEPARTMENTS),
+            "admission_date": (FIRST_DAY - timedelta(days=rng.randrange(365))).isoformat(),
+            "status": rng.choice(["Critical", "Stable", "Stable", "Recovering", "Discharged"]),
+            "room": f"R-{rng.randint(100, 999)}"
+        })
+    appointments = []
+    for i in range(rows):
+        doctor = doctors[i % len(doctors)]
+        patient = patients[rng.randrange(len(patients))] if patients else {"id": "P-0000000", "name": "Nobody"}
+        # Each doctor gets consecutive 30-minute slots, so seeded data has no double bookings
+        turn = i // len(doctors)
+        day, slot = divmod(turn, 20)
+        appointments.append({
+            "id": f"A-{i:07d}", "hospital_id": doctor["hospital_id"], "patient_name": patient["name"],
+            "patient_id": patient["id"], "doctor_name": doctor["name"], "doctor_id": doctor["id"],
+            "department": doctor["department"], "date": (FIRST_DAY + timedelta(days=day % DAYS)).isoformat(),
+            "time": _time(slot * 2), "type": rng.choice(["Consultation", "Follow-up", "Check-up"]),
+            "status": rng.choice(["Scheduled", "Scheduled", "Completed", "Cancelled"]),
+            "room": f"{doctor['department'][:4].upper()}-{doctor['id'][2:]}"
+        })
+    tables: Tables = {
+        "hospitals": hospitals, "departments": departments, "doctors": doctors,
+        "patients": patients, "appointments": appointments,
+    }
+    for name, template in ANALYTICS_TABLES.items():
+        tables[name] = [
+            {"id": f"{hospital['id']}-{n}", "hospital_id": hospital["id"], **row}
+            for hospital in hospitals for n, row in enumerate(template)
+        ]
+    _reconcile_rollups(tables)
+    return tables
+
+
+def _search_records(
+    tables: Tables,
+    p_query: str,
+    p_hospital_id: Optional[str] = None,
+    p_types: Optional[List[str]] = None,
+    p_limit: int = 20,
+    p_after_rank: Optional[float] = None,
+    p_after_key: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Substring stand-in for the search_records RPC (no stemming or trigrams)."""
+    needle = p_query.lower()
+    sources = {"patient": ("patients", "condition"), "doctor": ("doctors", "specialty")}
+    results = []
+    for kind in p_types or list(sources):
+        table, detail = sources[kind]
+        for row in tables.get(table, []):
+            if p_hospital_id is not None and row["hospital_id"] != p_hospital_id:
+                continue
+            rank = (needle in row["name"].lower()) * 1.0 + (needle in row[detail].lower()) * 0.5
+            if not rank:
+                continue
+            # Results run by rank descending, then "type:id" ascending
+            key = f"{kind}:{row['id']}"
+            if p_after_rank is not None and (-rank, key) <= (-p_after_rank, p_after_key):
+                continue
+            results.append((-rank, key, {
+                "type": kind, "id": row["id"], "hospital_id": row["hospital_id"],
+                "title": row["name"], "subtitle": row[detail], "rank": rank
+            }))
+    results.sort(key=lambda result: result[:2])
+    return [result for _, _, result in results[:p_limit]]
+
+
+def _reconcile_rollups(tables: Tables, p_min_interval: Optional[float] = None) -> int:
+    """Rebuild ``analytics_rollups`` from patients and appointments, like reconcile_analytics_rollups.
+
+    There is a single process to coordinate, so it never skips.
+    """
+    counts: Counter = Counter()
+    for row in tables.get("patients", []):
+        counts["admissions", row["hospital_id"], row["department"], row["admission_date"]] += 1
+        if row["status"] != "Discharged":
+            counts["active", row["hospital_id"], row["department"], None] += 1
+    for row in tables.get("appointments", []):
+        if row["status"] != "Cancelled":
+            counts["visits", row["hospital_id"], row["department"], row["date"]] += 1
+    tables["analytics_rollups"] = [
+        {"metric": metric, "hospital_id": hospital_id, "department": department, "day": day, "value": value}
+        for (metric, hospital_id, department, day), value in counts.items()
+    ]
+    return len(tables["analytics_rollups"])
+
+
+def _rollups(tables: Tables, metric: str, p_hospital_id: Optional[str]) -> List[Dict[str, Any]]:
+    return [
+        row for row in tables.get("analytics_rollups", [])
+        if row["metric"] == metric and (p_hospital_id is None or row["hospital_id"] == p_hospital_id)
+    ]
+
+
+def _weekly_admissions(tables: Tables, p_hospital_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Admissions over the last seven days, Monday first."""
+    days = [TODAY - timedelta(days=n) for n in range(7)]
+    counts: Counter = Counter()
+    for row in _rollups(tables, "admissions", p_hospital_id):
+        counts[row["day"]] += row["value"]
+    return [
+        {"day": day.strftime("%a"), "patients": counts[day.isoformat()]}
+        for day in sorted(days, key=date.isoweekday)
+    ]
+
+
+def _department_distribution(tables: Tables, p_hospital_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Active patients per department, largest first."""
+    totals: Counter = Counter()
+    for row in _rollups(tables, "active", p_hospital_id):
+        totals[row["department"]] += row["value"]
+    ranked = sorted((item for item in totals.items() if item[1] > 0), key=lambda item: (-item[1], item[0]))
+    return [
+        {"name": name, "value": value, "color": DISTRIBUTION_COLORS[n % len(DISTRIBUTION_COLORS)]}
+        for n, (name, value) in enumerate(ranked)
+    ]
+
+
+def _patient_trends(tables: Tables, p_hospital_id: Optional[str] = None, p_months: int = 6) -> List[Dict[str, Any]]:
+    """Admissions (inpatient) and visits (outpatient) for each of the last ``p_months`` months."""
+    months = []
+    for n in range(p_months - 1, -1, -1):
+        year, month = divmod(TODAY.year * 12 + TODAY.month - 1 - n, 12)
+        months.append(date(year, month + 1, 1))
+    counts: Counter = Counter()
+    for metric in ("admissions", "visits"):
+        for row in _rollups(tables, metric, p_hospital_id):
+            counts[metric, row["day"][:7]] += row["value"]
+    return [
+        {
+            "month": month.strftime("%b"),
+            "inpatient": counts["admissions", month.isoformat()[:7]],
+            "outpatient": counts["visits", month.isoformat()[:7]]
+        }
+        for month in months
+    ]
+
+
+def _precomputed(tables: Tables, name: str, p_hospital_id: Optional[str]) -> List[Dict[str, Any]]:
+    return [row for row in tables.get(name, []) if p_hospital_id is None or row["hospital_id"] == p_hospital_id]
+
+
+def _analytics_bundle(tables: Tables, p_hospital_id: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    return {
+        "weekly_patients": _weekly_admissions(tables, p_hospital_id),
+        "department_distribution": _department_distribution(tables, p_hospital_id),
+        "monthly_revenue": _precomputed(tables, "monthly_revenue", p_hospital_id),
+        "patient_trends": _patient_trends(tables, p_hospital_id),
+        "department_performance": _precomputed(tables, "department_performance", p_hospital_id),
+    }
+
+
+FUNCTIONS = {
+    "search_records": _search_records,
+    "analytics_weekly_admissions": _weekly_admissions,
+    "analytics_department_distribution": _department_distribution,
+    "analytics_patient_trends": _patient_trends,
+    "get_analytics_bundle": _analytics_bundle,
+    "reconcile_analytics_rollups": _reconcile_rollups,
+}
@@ -0,0 +1,423 @@
+"""In-memory stand-in for the Supabase client used by the benchmarks.
+
+Mimics the subset of the PostgREST query builder the repository layer uses
+and sleeps for a configurable latency on every ``execute()`` to simulate a
+network round-trip.
+"""
+import asyncio
+import operator
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+
+OPERATORS = {
+    "eq": operator.eq,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+
+# Computed relationships (migration 008): (table, name) ->
+# (target table, column holding the target ID, match used when it is unset)
+RELATIONS: Dict[tuple, tuple] = {
+    ("appointments", "patient"): ("patients", "patient_id", None),
+    ("appointments", "doctor"): (
+        "doctors", "doctor_id",
+        lambda row, other: (
+            other.get("hospital_id") == row.get("hospital_id") and other.get("name") == row.get("doctor_name")
+        )
+    ),
+}
+
+
+def _split(expression: str) -> List[str]:
+    """Split a PostgREST logic expression on top-level commas."""
+    parts, depth, quoted, current = [], 0, False, ""
+    i = 0
+    while i < len(expression):
+        char = expression[i]
+        if char == "\\" and quoted:
+            current += expression[i:i + 2]
+            i += 2
+            continue
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            i += 1
+            continue
+        current += char
+        i += 1
+    parts.append(current)
+    return parts
+
+
+def _unquote(value: str) -> str:
+    if value.startswith('"') and value.endswith('"'):
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def _predicate(expression: str) -> Callable[[Dict[str, Any]], bool]:
+    """Compile ``col.op.value`` / ``and(...)`` / ``or(...)`` into a row test."""
+    for combinator, reduce in (("and(", all), ("or(", any)):
+        if expression.startswith(combinator):
+            tests = [_predicate(part) for part in _split(expression[len(combinator):-1])]
+            return lambda row, tests=tests, reduce=reduce: reduce(test(row) for test in tests)
+
+    column, op, value = expression.split(".", 2)
+    value = _unquote(value)
+    compare = OPERATORS[op]
+    return lambda row: row.get(column) is not None and compare(str(row[column]), value)
+
+
+def _compare(stored: Any, value: Any) -> int:
+    """Compare a stored value with a filter value, numerically where possible."""
+    if isinstance(stored, (int, float)):
+        value = float(value)
+    else:
+        stored, value = str(stored), str(value)
+    return (stored > value) - (stored < value)
+
+
+def _remove(rows: List[Dict[str, Any]], doomed: List[Dict[str, Any]]) -> None:
+    """Remove ``doomed`` rows (by identity) from ``rows`` in place."""
+    if len(doomed) > 64:
+        ids = {id(row) for row in doomed}
+        rows[:] = [row for row in rows if id(row) not in ids]
+        return
+    # Recently inserted rows sit at the end, so search backwards
+    for row in doomed:
+        for i in range(len(rows) - 1, -1, -1):
+            if rows[i] is row:
+                del rows[i]
+                break
+
+
+class FakeResponse:
+    """Result of an executed query."""
+
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+
+
+class TableIndexes:
+    """ID lookup and cached sort orders over one table.
+
+    Stands in for the primary key and btree indexes, so lookups and keyset
+    pages on large seeded tables do not pay for a full scan and sort. Rows
+    added or removed behind the fake's back are picked up by a length check.
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self._by_id: Optional[Dict[Any, Dict[str, Any]]] = None
+        self._orders: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._size = -1
+
+    def _check(self) -> None:
+        if len(self.rows) != self._size:
+            self._by_id = None
+            self._orders.clear()
+            self._size = len(self.rows)
+
+    def by_id(self) -> Dict[Any, Dict[str, Any]]:
+        self._check()
+        if self._by_id is None:
+            self._by_id = {row.get("id"): row for row in self.rows}
+        return self._by_id
+
+    def ordered(self, order: tuple) -> List[Dict[str, Any]]:
+        self._check()
+        if order not in self._orders:
+            rows = list(self.rows)
+            for column, desc in reversed(order):
+                rows.sort(key=lambda row: row.get(column), reverse=desc)
+            self._orders[order] = rows
+        return self._orders[order]
+
+    # Called after the fake changed ``rows``, to keep the ID index in step
+
+    def added(self, row: Dict[str, Any]) -> None:
+        if self._by_id is not None:
+            self._by_id[row.get("id")] = row
+        self._orders.clear()
+        self._size = len(self.rows)
+
+    def removed(self, rows: List[Dict[str, Any]]) -> None:
+        if self._by_id is not None:
+            for row in rows:
+                self._by_id.pop(row.get("id"), None)
+        self._orders.clear()
+        self._size = len(self.rows)
+
+    def updated(self) -> None:
+        self._orders.clear()
+
+
+class FakeQuery:
+    """Chainable query builder over an in-memory table."""
+
+    def __init__(
+        self,
+        rows: List[Dict[str, Any]],
+        latency: float,
+        tables: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        name: Optional[str] = None,
+        indexes: Optional[TableIndexes] = None,
+        indexes_for: Optional[Callable[[str], TableIndexes]] = None
+    ):
+        self._rows = rows
+        self._latency = latency
+        self._tables = tables if tables is not None else {}
+        self._name = name
+        self._indexes = indexes if indexes is not None else TableIndexes(rows)
+        self._indexes_for = indexes_for or (lambda table: TableIndexes(self._tables.get(table, [])))
+        self._ids: Optional[List[Any]] = None
+        self._filters: List[tuple] = []
+        self._predicates: List[Callable[[Dict[str, Any]], bool]] = []
+        self._order: List[tuple] = []
+        self._limit: Optional[int] = None
+        self._columns: Optional[List[str]] = None
+        self._embeds: List[str] = []
+        self._action = "select"
+        self._payload: Optional[Dict[str, Any]] = None
+
+    def select(self, columns: str = "*"):
+        # ``name(*)`` entries embed a related row; the rest are plain columns
+        parts = [c.strip() for c in _split(columns)]
+        self._embeds = [c.split("(", 1)[0] for c in parts if c.endswith(")")]
+        plain = [c for c in parts if not c.endswith(")")]
+        self._columns = None if plain == ["*"] else plain
+        return self
+
+    def _embed(self, row: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the requested related rows of ``row`` to its selected ``result``."""
+        for relation in self._embeds:
+            target, key, match = RELATIONS[(self._name, relation)]
+            if row.get(key) is not None:
+                found = self._indexes_for(target).by_id().get(row[key])
+            elif match is not None:
+                found = next((other for other in self._tables.get(target, []) if match(row, other)), None)
+            else:
+                found = None
+            result[relation] = dict(found) if found is not None else None
+        return result
+
+    def eq(self, column: str, value: Any):
+        if column == "id":
+            self._ids = [value]
+        self._filters.append((column, value))
+        return self
+
+    def gte(self, column: str, value: Any):
+        self._predicates.append(lambda row: row.get(column) is not None and _compare(row[column], value) >= 0)
+        return self
+
+    def lte(self, column: str, value: Any):
+        self._predicates.append(lambda row: row.get(column) is not None and _compare(row[column], value) <= 0)
+        return self
+
+    def or_(self, expression: str):
+        self._predicates.append(_predicate(f"or({expression})"))
+        return self
+
+    def in_(self, column: str, values: List[Any]):
+        if column == "id":
+            self._ids = list(values)
+        allowed = {str(value) for value in values}
+        self._predicates.append(lambda row: row.get(column) is not None and str(row[column]) in allowed)
+        return self
+
+    def order(self, column: str, desc: bool = False):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int):
+        self._limit = size
+        return self
+
+    def insert(self, data: Dict[str, Any] | List[Dict[str, Any]]):
+        self._action, self._payload = "insert", data
+        return self
+
+    def upsert(self, data: Dict[str, Any] | List[Dict[str, Any]], on_conflict: str = "id"):
+        self._action, self._payload = "upsert", data
+        return self
+
+    def update(self, data: Dict[str, Any]):
+        self._action, self._payload = "update", data
+        return self
+
+    def delete(self):
+        self._action = "delete"
+        return self
+
+    def _candidates(self) -> Tuple[List[Dict[str, Any]], bool]:
+        """Rows that can match, and whether they are already in query order."""
+        if self._ids is not None:
+            by_id = self._indexes.by_id()
+            found = (by_id.get(record_id) for record_id in dict.fromkeys(self._ids))
+            return [row for row in found if row is not None], not self._order
+        if self._order:
+            return self._indexes.ordered(tuple(self._order)), True
+        return self._rows, True
+
+    def _match(self) -> List[Dict[str, Any]]:
+        candidates, ordered = self._candidates()
+        limit = self._limit if ordered else None
+        matched = []
+        for row in candidates:
+            if all(row.get(column) == value for column, value in self._filters) \
+                    and all(test(row) for test in self._predicates):
+                matched.append(row)
+                if limit is not None and len(matched) >= limit:
+                    break
+        if not ordered:
+            for column, desc in reversed(self._order):
+                matched.sort(key=lambda row: row.get(column), reverse=desc)
+        return matched[:self._limit] if self._limit is not None else matched
+
+    def _write(self) -> FakeResponse:
+        payload = self._payload if isinstance(self._payload, list) else [self._payload]
+        by_id = self._indexes.by_id()
+        if self._action != "upsert":
+            # Like the database, a statement with one bad row writes nothing
+            seen = set()
+            for item in payload:
+                if item.get("id") in by_id or (item.get("id") is not None and item.get("id") in seen):
+                    raise APIError({
+                        "code": "23505",
+                        "message": f"duplicate key value violates unique constraint: {item.get('id')}"
+                    })
+                seen.add(item.get("id"))
+        created = []
+        for item in payload:
+            existing = by_id.get(item.get("id"))
+            if existing is not None:
+                existing.update(item)
+                self._indexes.updated()
+                created.append(dict(existing))
+                continue
+            row = {"id": uuid.uuid4().hex, **item}
+            self._rows.append(row)
+            self._indexes.added(row)
+            created.append(dict(row))
+        return FakeResponse(created)
+
+    def _run(self) -> FakeResponse:
+        if self._action in ("insert", "upsert"):
+            return self._write()
+        matched = self._match()
+        if self._action == "update":
+            for row in matched:
+                row.update(self._payload)
+            self._indexes.updated()
+        elif self._action == "delete":
+            _remove(self._rows, matched)
+            self._indexes.removed(matched)
+        if self._columns is not None:
+            return FakeResponse([self._embed(row, {c: row.get(c) for c in self._columns}) for row in matched])
+        return FakeResponse([self._embed(row, dict(row)) for row in matched])
+
+    def execute(self) -> FakeResponse:
+        time.sleep(self._latency)
+        return self._run()
+
+
+class AsyncFakeQuery(FakeQuery):
+    """Query builder whose ``execute()`` is awaitable."""
+
+    async def execute(self) -> FakeResponse:
+        await asyncio.sleep(self._latency)
+        return self._run()
+
+
+class FakeRpc:
+    """Call to a registered Python stand-in for a Postgres function."""
+
+    def __init__(self, function: Callable[..., Any], tables, params: Dict[str, Any], latency: float):
+        self._function = function
+        self._tables = tables
+        self._params = params
+        self._latency = latency
+
+    def execute(self) -> FakeResponse:
+        time.sleep(self._latency)
+        return FakeResponse(self._function(self._tables, **self._params))
+
+
+class AsyncFakeRpc(FakeRpc):
+    """RPC call whose ``execute()`` is awaitable."""
+
+    async def execute(self) -> FakeResponse:
+        await asyncio.sleep(self._latency)
+        return FakeResponse(self._function(self._tables, **self._params))
+
+
+class FakeSession:
+    """Stand-in for the pooled PostgREST HTTP session closed on shutdown."""
+
+    def close(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FakePostgrest:
+    def __init__(self):
+        self.session = FakeSession()
+
+
+class FakeClient:
+    """Sync client exposing ``table()`` and ``rpc()`` like ``supabase.Client``.
+
+    ``functions`` maps RPC names to callables taking the tables dict and the
+    RPC parameters as keyword arguments.
+    """
+
+    query_class = FakeQuery
+    rpc_class = FakeRpc
+
+    def __init__(
+        self,
+        tables: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        latency: float = 0.0,
+        functions: Optional[Dict[str, Callable[..., Any]]] = None
+    ):
+        self.tables = tables if tables is not None else {}
+        self.latency = latency
+        self.functions = functions if functions is not None else {}
+        self.postgrest = FakePostgrest()
+        self._indexes: Dict[str, TableIndexes] = {}
+
+    def indexes(self, name: str) -> TableIndexes:
+        rows = self.tables.setdefault(name, [])
+        indexes = self._indexes.get(name)
+        if indexes is None or indexes.rows is not rows:
+            indexes = self._indexes[name] = TableIndexes(rows)
+        return indexes
+
+    def table(self, name: str) -> FakeQuery:
+        indexes = self.indexes(name)
+        return self.query_class(indexes.rows, self.latency, self.tables, name, indexes, self.indexes)
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> FakeRpc:
+        return self.rpc_class(self.functions[name], self.tables, params or {}, self.latency)
+
+
+class AsyncFakeClient(FakeClient):
+    """Async client exposing ``table()`` and ``rpc()`` like ``supabase.AsyncClient``."""
+
+    query_class = AsyncFakeQuery
+    rpc_class = AsyncFakeRpc
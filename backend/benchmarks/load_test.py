@@ -0,0 +1,431 @@
+"""Load test for every API endpoint against the in-memory Supabase stand-in.
+
+Runs the FastAPI app in-process (lifespan, middleware and all) over an
+ASGI transport, with the fake client seeded by ``benchmarks.datasets``
+and a simulated round-trip on every query. Each scenario is driven at
+every concurrency level; throughput, p50/p95/p99 latency and the peak
+memory allocated per request (tracemalloc, measured in a separate
+sequential pass) are printed and written as JSON. Run from ``backend/``::
+
+    python -m benchmarks.load_test --rows 10000 --latency 0.005 --concurrency 1 16 64
+    python -m benchmarks.load_test --rows 100000 --only patients. --baseline load_test_results.json
+
+Pass ``--baseline`` with an earlier result file to print the change in
+throughput and p95 per scenario. The fake scans its tables in Python, so
+at 1M rows filters that are not on ``id`` include that scan in the
+measured latency; compare runs at the same ``--rows``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+import httpx  # noqa: E402
+from fastapi.routing import APIRoute  # noqa: E402
+
+import database  # noqa: E402
+import serialization  # noqa: E402
+from config import get_settings  # noqa: E402
+from benchmarks.datasets import FUNCTIONS, seed  # noqa: E402
+from benchmarks.fake_supabase import AsyncFakeClient, FakeClient  # noqa: E402
+
+BULK_SIZE = 50
+
+# Routes no scenario drives, and why
+SKIPPED = {
+    ("GET", "/api/changes/"): "server-sent event stream never completes",
+}
+
+Request = Tuple[str, str, Optional[Any]]
+
+
+class State:
+    """Seeded tables plus the IDs created by write scenarios, for later updates and deletes."""
+
+    def __init__(self, tables: Dict[str, List[Dict[str, Any]]], seed: int):
+        self.tables = tables
+        self.rng = random.Random(seed)
+        self.created: Dict[str, List[str]] = {}
+        self.counter = 0
+
+    def next(self) -> int:
+        self.counter += 1
+        return self.counter
+
+    def pick(self, table: str) -> str:
+        """ID of an existing row, preferring rows the run created."""
+        created = self.created.get(table)
+        if created:
+            return self.rng.choice(created)
+        return self.rng.choice(self.tables[table])["id"]
+
+    def pick_many(self, table: str, count: int) -> List[str]:
+        return [self.pick(table) for _ in range(count)]
+
+    def take(self, table: str, count: int = 1) -> List[str]:
+        """IDs of created rows to delete; seeded rows are left alone."""
+        created = self.created.setdefault(table, [])
+        taken = created[-count:]
+        del created[-count:]
+        return taken
+
+    def hospital(self) -> str:
+        return self.tables["hospitals"][0]["id"]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One endpoint call pattern."""
+    name: str
+    method: str
+    route: str
+    build: Callable[[State], Request]
+    created: Optional[str] = None  # table whose new IDs the response returns
+
+
+def _record(scenario: Scenario, state: State, response: httpx.Response) -> None:
+    if scenario.created is None:
+        return
+    body = response.json()
+    ids = [result["id"] for result in body["results"] if result.get("id")] if "results" in body else [body["id"]]
+    state.created.setdefault(scenario.created, []).extend(ids)
+
+
+def _hospital_body(state: State) -> Dict[str, Any]:
+    return {"name": f"Load Hospital {state.next()}", "location": "Bench City", "beds": 200, "occupancy": 50}
+
+
+def _department_body(state: State) -> Dict[str, Any]:
+    return {
+        "hospital_id": state.hospital(), "name": f"Load Department {state.next()}", "head": "Dr. Load",
+        "doctors": 4, "nurses": 10, "beds": 20, "patients": 5
+    }
+
+
+def _doctor_body(state: State) -> Dict[str, Any]:
+    n = state.next()
+    return {
+        "hospital_id": state.hospital(), "name": f"Dr. Load {n}", "specialty": "Cardiology",
+        "department": "Cardiology", "experience": 10, "patients": 0,
+        "email": f"load{n}@hospital.test", "phone": "555-010-0100"
+    }
+
+
+def _patient_body(state: State) -> Dict[str, Any]:
+    return {
+        "hospital_id": state.hospital(), "name": f"Load Patient {state.next()}", "age": 40, "gender": "Other",
+        "condition": "Observation", "department": "Cardiology", "admission_date": "2026-03-02", "room": "L-1"
+    }
+
+
+def _appointment_body(state: State) -> Dict[str, Any]:
+    # A fresh doctor and room per booking, so the double-booking check always passes
+    n = state.next()
+    return {
+        "hospital_id": state.hospital(), "patient_name": "Load Patient", "patient_id": state.pick("patients"),
+        "doctor_name": f"Dr. Load {n}", "department": "Cardiology", "date": "2026-03-02",
+        "time": "09:00 AM", "type": "Consultation", "room": f"LOAD-{n}"
+    }
+
+
+def _crud(resource: str, table: str, body: Callable[[State], Dict[str, Any]], change: Dict[str, Any]) -> List[Scenario]:
+    base = f"/api/{resource}/"
+    return [
+        Scenario(f"{resource}.create", "POST", base, lambda s: ("POST", base, body(s)), created=table),
+        Scenario(f"{resource}.get", "GET", base + "{id}", lambda s: ("GET", base + s.pick(table), None)),
+        Scenario(
+            f"{resource}.batch", "GET", base + "batch",
+            lambda s: ("GET", f"{base}batch?ids={','.join(s.pick_many(table, 20))}", None)
+        ),
+        Scenario(f"{resource}.update", "PUT", base + "{id}", lambda s: ("PUT", base + s.pick(table), change)),
+        Scenario(
+            f"{resource}.delete", "DELETE", base + "{id}",
+            lambda s: ("DELETE", base + (s.take(table) or ["missing"])[0], None)
+        ),
+    ]
+
+
+def _bulk(resource: str, table: str, body: Callable[[State], Dict[str, Any]], change: Dict[str, Any]) -> List[Scenario]:
+    base = f"/api/{resource}/bulk"
+    return [
+        Scenario(
+            f"{resource}.bulk_create", "POST", base,
+            lambda s: ("POST", base, [body(s) for _ in range(BULK_SIZE)]), created=table
+        ),
+        Scenario(
+            f"{resource}.bulk_update", "PUT", base,
+            lambda s: ("PUT", base, [{"id": record_id, **change} for record_id in s.pick_many(table, BULK_SIZE)])
+        ),
+        Scenario(
+            f"{resource}.bulk_delete", "POST", base + "/delete",
+            lambda s: ("POST", base + "/delete", {"ids": s.take(table, BULK_SIZE)})
+        ),
+    ]
+
+
+def _get(name: str, route: str, url: Callable[[State], str]) -> Scenario:
+    return Scenario(name, "GET", route, lambda s: ("GET", url(s), None))
+
+
+def scenarios() -> List[Scenario]:
+    """Every scenario, ordered so creates run before the updates and deletes that use their rows."""
+    result = [
+        _get("health", "/health", lambda s: "/health"),
+        _get("root", "/", lambda s: "/"),
+        _get("metrics", "/metrics", lambda s: "/metrics"),
+        _get("hospitals.list", "/api/hospitals/", lambda s: "/api/hospitals/?limit=50"),
+        _get("departments.list", "/api/departments/", lambda s: f"/api/departments/?hospital_id={s.hospital()}"),
+        _get("doctors.list", "/api/doctors/", lambda s: f"/api/doctors/?hospital_id={s.hospital()}&limit=50"),
+        _get("doctors.export", "/api/doctors/export", lambda s: f"/api/doctors/export?hospital_id={s.hospital()}"),
+        _get("patients.list", "/api/patients/", lambda s: "/api/patients/?limit=100"),
+        _get(
+            "patients.list_filtered", "/api/patients/",
+            lambda s: f"/api/patients/?hospital_id={s.hospital()}&status=Critical,Stable&age_min=30&limit=100"
+        ),
+        _get(
+            "patients.export", "/api/patients/export",
+            lambda s: f"/api/patients/export?hospital_id={s.hospital()}&format=csv"
+        ),
+        _get("appointments.list", "/api/appointments/", lambda s: "/api/appointments/?limit=100"),
+        _get(
+            "appointments.list_expanded", "/api/appointments/",
+            lambda s: f"/api/appointments/?hospital_id={s.hospital()}&expand=patient,doctor&limit=50"
+        ),
+        _get(
+            "appointments.slots", "/api/appointments/slots",
+            lambda s: (
+                f"/api/appointments/slots?department=Cardiology&date_from=2026-03-02&date_to=2026-03-04"
+                f"&type=Consultation&hospital_id={s.hospital()}"
+            )
+        ),
+        _get(
+            "appointments.export", "/api/appointments/export",
+            lambda s: f"/api/appointments/export?hospital_id={s.hospital()}"
+        ),
+        _get("search", "/api/search/", lambda s: f"/api/search/?q=ava&hospital_id={s.hospital()}"),
+    ]
+    for dataset in ("weekly-patients", "department-distribution", "monthly-revenue", "patient-trends",
+                    "department-performance"):
+        route = f"/api/analytics/{dataset}"
+        result.append(_get(f"analytics.{dataset}", route, lambda s, route=route: f"{route}?hospital_id={s.hospital()}"))
+    result += [
+        _get("analytics.all", "/api/analytics/", lambda s: f"/api/analytics/?hospital_id={s.hospital()}"),
+        Scenario(
+            "analytics.reconcile", "POST", "/api/analytics/rollups/reconcile",
+            lambda s: ("POST", "/api/analytics/rollups/reconcile", None)
+        ),
+    ]
+    result += _crud("hospitals", "hospitals", _hospital_body, {"occupancy": 60})
+    result += _crud("departments", "departments", _department_body, {"nurses": 12})
+    for resource, body, change in (
+        ("doctors", _doctor_body, {"availability": "Off Duty"}),
+        ("patients", _patient_body, {"status": "Recovering"}),
+        ("appointments", _appointment_body, {"status": "Completed"}),
+    ):
+        crud = _crud(resource, resource, body, change)
+        bulk = _bulk(resource, resource, body, change)
+        # create, bulk create, reads and updates, then deletes
+        result += [crud[0], bulk[0], *crud[1:4], bulk[1], crud[4], bulk[2]]
+    return result
+
+
+def uncovered(app, covered: List[Scenario]) -> List[str]:
+    """App routes that no scenario drives and that are not knowingly skipped."""
+    driven = {(scenario.method, scenario.route) for scenario in covered}
+    missing = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        path = route.path
+        for method in sorted(route.methods):
+            template = path.replace(path[path.find("{"):path.find("}") + 1], "{id}") if "{" in path else path
+            if (method, template) not in driven and (method, path) not in SKIPPED:
+                missing.append(f"{method} {path}")
+    return missing
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def _send(client: httpx.AsyncClient, scenario: Scenario, state: State) -> httpx.Response:
+    method, url, body = scenario.build(state)
+    response = await client.request(method, url, json=body)
+    if response.status_code < 400:
+        _record(scenario, state, response)
+    return response
+
+
+async def _drive(client: httpx.AsyncClient, scenario: Scenario, state: State, requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await _send(client, scenario, state)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput": requests / elapsed,
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": _percentile(ordered, 0.50) * 1000,
+        "p95_ms": _percentile(ordered, 0.95) * 1000,
+        "p99_ms": _percentile(ordered, 0.99) * 1000,
+    }
+
+
+async def _memory(client: httpx.AsyncClient, scenario: Scenario, state: State, samples: int) -> Dict[str, float]:
+    """Peak bytes allocated while serving one request, over sequential requests."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            await _send(client, scenario, state)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return {
+        "memory_peak_kib_mean": sum(peaks) / len(peaks) / 1024,
+        "memory_peak_kib_max": max(peaks) / 1024,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = {(row["scenario"], row["concurrency"]): row for row in json.load(f)["results"]}
+
+    print(f"\nchange vs {baseline_path}")
+    print(f"{'scenario':<34}{'conc':>6}{'req/s':>10}{'p95':>10}")
+    for row in results:
+        before = baseline.get((row["scenario"], row["concurrency"]))
+        if before is None:
+            continue
+        throughput = (row["throughput"] / before["throughput"] - 1) * 100
+        p95 = (row["p95_ms"] / before["p95_ms"] - 1) * 100 if before["p95_ms"] else 0.0
+        print(f"{row['scenario']:<34}{row['concurrency']:>6}{throughput:>+9.1f}%{p95:>+9.1f}%")
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    started = time.perf_counter()
+    tables = seed(args.rows, args.seed)
+    print(f"seeded {sum(len(rows) for rows in tables.values())} rows in {time.perf_counter() - started:.1f}s")
+
+    database._clients[database.ANON] = FakeClient(tables, args.latency, functions=FUNCTIONS)
+    database._async_clients[database.ANON] = AsyncFakeClient(tables, args.latency, functions=FUNCTIONS)
+    settings = get_settings()
+    if args.cache:
+        settings.cache_backend = args.cache
+
+    from main import app
+
+    selected = [scenario for scenario in scenarios() if not args.only or scenario.name.startswith(tuple(args.only))]
+    if not args.only:
+        for route in uncovered(app, selected):
+            print(f"warning: no scenario for {route}")
+
+    state = State(tables, args.seed)
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{'scenario':<34}{'conc':>6}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'KiB/req':>10}")
+            for scenario in selected:
+                for _ in range(args.warmup):
+                    await _send(client, scenario, state)
+                memory = await _memory(client, scenario, state, args.memory_samples)
+                for concurrency in args.concurrency:
+                    row = {
+                        "scenario": scenario.name, "method": scenario.method, "route": scenario.route,
+                        "concurrency": concurrency,
+                        **await _drive(client, scenario, state, args.requests, concurrency),
+                        **memory
+                    }
+                    results.append(row)
+                    print(
+                        f"{scenario.name:<34}{concurrency:>6}{row['throughput']:>10.1f}{row['p50_ms']:>9.1f}"
+                        f"{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{sum(row['errors'].values()):>8}"
+                        f"{row['memory_peak_kib_mean']:>10.1f}"
+                    )
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "rows": args.rows,
+            "seed": args.seed,
+            "latency": args.latency,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "memory_samples": args.memory_samples,
+            "db_client_mode": settings.db_client_mode,
+            "cache_backend": settings.cache_backend,
+            "trusted_reads": settings.trusted_reads,
+            "orjson": serialization.orjson is not None,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000, help="Seeded patients and appointments (10k-1M)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.005, help="Simulated round-trip in seconds")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed requests per scenario")
+    parser.add_argument("--memory-samples", type=int, default=20, help="Sequential requests traced for memory")
+    parser.add_argument("--cache", choices=["memory", "none"], help="Override CACHE_BACKEND")
+    parser.add_argument("--only", nargs="+", help="Run only scenarios whose name starts with these prefixes")
+    parser.add_argument("--output", default="load_test_results.json", help="JSON result file")
+    parser.add_argument("--baseline", help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output}")
+    if args.baseline:
+        _compare(report["results"], args.baseline)
+
+
+if __name__ == "__main__":
+    main()
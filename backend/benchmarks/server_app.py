@@ -0,0 +1,21 @@
+"""The API wired to a seeded fake Supabase client, for serving from real workers.
+
+Import string ``benchmarks.server_app:app``. Every worker process imports
+this module and seeds its own identical copy of the dataset; size and
+simulated round-trip come from ``BENCH_ROWS`` and ``BENCH_LATENCY``.
+"""
+import os
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+import database  # noqa: E402
+from benchmarks.datasets import FUNCTIONS, seed  # noqa: E402
+from benchmarks.fake_supabase import AsyncFakeClient, FakeClient  # noqa: E402
+
+_tables = seed(int(os.environ.get("BENCH_ROWS", "10000")))
+_latency = float(os.environ.get("BENCH_LATENCY", "0.005"))
+database._clients[database.ANON] = FakeClient(_tables, _latency, functions=FUNCTIONS)
+database._async_clients[database.ANON] = AsyncFakeClient(_tables, _latency, functions=FUNCTIONS)
+
+from main import app  # noqa: E402,F401
@@ -0,0 +1,289 @@
+import asyncio
+import json
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException
+from postgrest.exceptions import APIError
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from config import get_settings
+from models.bulk import BulkItemResult, BulkResponse
+from repository import Repository
+from rollups import Rollup
+
+Results = Dict[int, BulkItemResult]
+
+# Checks a batch of (record ID or None, fields written) pairs before writing;
+# returns an error message per rejected position
+BatchCheck = Callable[[List[Tuple[Optional[str], Dict[str, Any]]]], Awaitable[Dict[int, str]]]
+
+
+@lru_cache
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def _chunks(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _ok(index: int, record_id: Any) -> BulkItemResult:
+    return BulkItemResult(index=index, id=record_id, status="ok")
+
+
+def _error(index: int, message: str, record_id: Any = None) -> BulkItemResult:
+    return BulkItemResult(index=index, id=record_id, status="error", error=message)
+
+
+def _response(results: Results) -> BulkResponse:
+    ordered = [results[index] for index in sorted(results)]
+    failed = sum(1 for result in ordered if result.status == "error")
+    return BulkResponse(succeeded=len(ordered) - failed, failed=failed, results=ordered)
+
+
+def check_batch_size(items: Sequence) -> None:
+    """Reject empty or oversized batches."""
+    limit = get_settings().bulk_max_items
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(items) > limit:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {limit} items")
+
+
+def validate_batch(
+    model: Type[BaseModel],
+    items: List[Dict[str, Any]]
+) -> Tuple[List[Tuple[int, BaseModel]], Dict[int, str]]:
+    """Validate a whole batch in one pass.
+
+    Returns ``(index, instance)`` pairs for valid items and an error message
+    per invalid index. Only batches with errors are validated a second time.
+    """
+    adapter = _list_adapter(model)
+    try:
+        return list(enumerate(adapter.validate_python(items))), {}
+    except ValidationError as exc:
+        errors: Dict[int, str] = {}
+        for error in exc.errors():
+            index, *field = error["loc"]
+            location = ".".join(str(part) for part in field)
+            errors.setdefault(index, f"{location}: {error['msg']}" if location else error["msg"])
+
+    remaining = [index for index in range(len(items)) if index not in errors]
+    validated = adapter.validate_python([items[index] for index in remaining])
+    return list(zip(remaining, validated)), errors
+
+
+def _rejected_rows(error: Exception) -> bool:
+    """Whether the database refused the statement, as opposed to the request failing.
+
+    Only then is the chunk known not to be written, so retrying its rows
+    one at a time can isolate the bad ones. After a timeout or a dropped
+    connection the chunk may have been written, and retrying would write
+    it again.
+    """
+    return isinstance(error, APIError) or getattr(error, "code", None) is not None
+
+
+async def _insert_chunk(
+    repository: Repository,
+    chunk: Sequence[Tuple[int, Dict[str, Any]]],
+    upsert: bool,
+    retries: asyncio.Semaphore
+) -> Tuple[Results, List[Dict[str, Any]]]:
+    """Insert one chunk; if the database rejects it, retry row by row to isolate bad rows.
+
+    ``retries`` bounds the row-by-row inserts in flight, so a failed chunk
+    cannot open more connections than the client pool keeps alive. Any
+    other failure marks the whole chunk failed, as its outcome is unknown.
+    Returns the per-item results and the rows written.
+    """
+    try:
+        created = await repository.insert([row for _, row in chunk], upsert=upsert)
+    except Exception as e:
+        if not _rejected_rows(e):
+            message = f"Outcome unknown, the insert may have been applied: {e!r}"
+            return {index: _error(index, message, row.get("id")) for index, row in chunk}, []
+        if len(chunk) == 1:
+            index, row = chunk[0]
+            return {index: _error(index, str(e), row.get("id"))}, []
+        async def retry(item: Tuple[int, Dict[str, Any]]) -> Tuple[Results, List[Dict[str, Any]]]:
+            async with retries:
+                return await _insert_chunk(repository, [item], upsert, retries)
+
+        results: Results = {}
+        written: List[Dict[str, Any]] = []
+        for outcome, rows in await asyncio.gather(*(retry(item) for item in chunk)):
+            results.update(outcome)
+            written.extend(rows)
+        return results, written
+
+    return {
+        index: _ok(index, row.get("id"))
+        for (index, _), row in zip(chunk, created)
+    }, created
+
+
+async def bulk_create(
+    repository: Repository,
+    model: Type[BaseModel],
+    items: List[Dict[str, Any]],
+    upsert: bool = False,
+    rollup: Optional[Rollup] = None,
+    check: Optional[BatchCheck] = None
+) -> BulkResponse:
+    """Validate and insert many rows with chunked multi-row inserts.
+
+    With ``upsert`` items carrying an ``id`` replace the existing row with
+    that ID; items without one are inserted. Items rejected by ``check``
+    are not written, and the analytics views of ``rollup`` are refreshed.
+    """
+    check_batch_size(items)
+    valid, errors = validate_batch(model, items)
+    results: Results = {index: _error(index, message) for index, message in errors.items()}
+
+    rows = []
+    for index, instance in valid:
+        row = instance.model_dump()
+        record_id = items[index].get("id") if upsert else None
+        rows.append((index, {**row, "id": record_id} if record_id else row))
+
+    if check is not None and rows:
+        rejected = await check([(row.get("id"), row) for _, row in rows])
+        for position, message in rejected.items():
+            index, row = rows[position]
+            results[index] = _error(index, message, row.get("id"))
+        rows = [item for position, item in enumerate(rows) if position not in rejected]
+
+    inserts = [(index, row) for index, row in rows if "id" not in row]
+    upserts = [(index, row) for index, row in rows if "id" in row]
+
+    async def write(chunk: Sequence[Tuple[int, Dict[str, Any]]], replace: bool) -> Results:
+        outcome, written = await _insert_chunk(repository, chunk, replace, retries)
+        if rollup is not None:
+            await rollup.changed(written, rollup.columns if replace else None)
+        return outcome
+
+    size = get_settings().bulk_chunk_size
+    retries = asyncio.Semaphore(get_settings().supabase_max_keepalive)
+    for outcome in await asyncio.gather(
+        *(write(chunk, False) for chunk in _chunks(inserts, size)),
+        *(write(chunk, True) for chunk in _chunks(upserts, size))
+    ):
+        results.update(outcome)
+
+    return _response(results)
+
+
+async def bulk_update(
+    repository: Repository,
+    model: Type[BaseModel],
+    items: List[Dict[str, Any]],
+    rollup: Optional[Rollup] = None,
+    check: Optional[BatchCheck] = None
+) -> BulkResponse:
+    """Validate and apply many partial updates, each item carrying its ``id``.
+
+    Items with identical changes share one ``update ... in (ids)`` per chunk,
+    so uniform changes (e.g. a status sweep) cost one round-trip per chunk.
+    Items rejected by ``check`` are not written, and changes to columns
+    counted by ``rollup`` refresh its analytics views.
+    """
+    check_batch_size(items)
+    valid, errors = validate_batch(model, items)
+    results: Results = {index: _error(index, message) for index, message in errors.items()}
+
+    updates: List[Tuple[int, str, Dict[str, Any]]] = []
+    for index, instance in valid:
+        record_id = items[index].get("id")
+        update_data = {k: v for k, v in instance.model_dump().items() if v is not None}
+        if not isinstance(record_id, str) or not record_id:
+            results[index] = _error(index, "id: Field required")
+        elif not update_data:
+            results[index] = _error(index, "No fields to update", record_id)
+        else:
+            updates.append((index, record_id, update_data))
+
+    if check is not None and updates:
+        rejected = await check([(record_id, update_data) for _, record_id, update_data in updates])
+        for position, message in rejected.items():
+            index, record_id, _ = updates[position]
+            results[index] = _error(index, message, record_id)
+        updates = [item for position, item in enumerate(updates) if position not in rejected]
+
+    groups: Dict[str, Tuple[Dict[str, Any], List[Tuple[int, str]]]] = {}
+    for index, record_id, update_data in updates:
+        key = json.dumps(update_data, sort_keys=True, default=str)
+        groups.setdefault(key, (update_data, []))[1].append((index, record_id))
+
+    size = get_settings().bulk_chunk_size
+    semaphore = asyncio.Semaphore(get_settings().db_max_workers)
+
+    async def apply(update_data: Dict[str, Any], chunk: Sequence[Tuple[int, str]]) -> Results:
+        record_ids = [record_id for _, record_id in chunk]
+        async with semaphore:
+            try:
+                updated = await repository.update_many(record_ids, update_data)
+            except Exception as e:
+                return {index: _error(index, str(e), record_id) for index, record_id in chunk}
+        if rollup is not None:
+            await rollup.changed(updated, update_data)
+        found = {row.get("id") for row in updated}
+        return {
+            index: _ok(index, record_id) if record_id in found else _error(index, "Not found", record_id)
+            for index, record_id in chunk
+        }
+
+    for outcome in await asyncio.gather(
+        *(
+            apply(update_data, chunk)
+            for update_data, members in groups.values()
+            for chunk in _chunks(members, size)
+        )
+    ):
+        results.update(outcome)
+
+    return _response(results)
+
+
+async def bulk_delete(
+    repository: Repository,
+    ids: List[str],
+    rollup: Optional[Rollup] = None
+) -> BulkResponse:
+    """Delete many rows with chunked ``delete ... in (ids)`` queries.
+
+    The analytics views of ``rollup``, if given, are refreshed.
+    """
+    check_batch_size(ids)
+    results: Results = {}
+    first_index: Dict[str, int] = {}
+    for index, record_id in enumerate(ids):
+        if record_id in first_index:
+            results[index] = _error(index, "Duplicate id", record_id)
+        else:
+            first_index[record_id] = index
+
+    async def delete(chunk: Sequence[str]) -> Results:
+        try:
+            deleted = await repository.delete_many(list(chunk))
+        except Exception as e:
+            return {first_index[record_id]: _error(first_index[record_id], str(e), record_id) for record_id in chunk}
+        if rollup is not None:
+            await rollup.changed(deleted)
+        found = {row.get("id") for row in deleted}
+        return {
+            first_index[record_id]: (
+                _ok(first_index[record_id], record_id) if record_id in found
+                else _error(first_index[record_id], "Not found", record_id)
+            )
+            for record_id in chunk
+        }
+
+    size = get_settings().bulk_chunk_size
+    for outcome in await asyncio.gather(*(delete(chunk) for chunk in _chunks(list(first_index), size))):
+        results.update(outcome)
+
+    return _response(results)
@@ -0,0 +1,230 @@
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from config import get_settings
+from singleflight import write_generation
+
+# Scope used for entries that span every hospital (no hospital_id filter)
+ALL_HOSPITALS = "*"
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Freshness and size limits for one cached endpoint."""
+    ttl: float
+    max_entries: int = 256
+
+
+DEFAULT_POLICY = CachePolicy(ttl=60)
+
+CACHE_POLICIES: Dict[str, CachePolicy] = {
+    "analytics.weekly_patients": CachePolicy(ttl=300),
+    "analytics.department_distribution": CachePolicy(ttl=300),
+    "analytics.monthly_revenue": CachePolicy(ttl=900),
+    "analytics.patient_trends": CachePolicy(ttl=900),
+    "analytics.department_performance": CachePolicy(ttl=900),
+    "analytics.bundle": CachePolicy(ttl=300),
+    "hospitals.list": CachePolicy(ttl=120, max_entries=64),
+    "hospitals.detail": CachePolicy(ttl=120, max_entries=512),
+    "departments.list": CachePolicy(ttl=120, max_entries=512),
+    "departments.detail": CachePolicy(ttl=120, max_entries=1024),
+}
+
+
+def _policy_overrides(raw: str) -> Dict[str, float]:
+    """Parse ``endpoint=ttl`` pairs from the CACHE_TTL_OVERRIDES setting."""
+    overrides = {}
+    for item in raw.split(","):
+        if "=" in item:
+            endpoint, ttl = item.split("=", 1)
+            overrides[endpoint.strip()] = float(ttl)
+    return overrides
+
+
+def get_policy(endpoint: str) -> CachePolicy:
+    """Get the cache policy for an endpoint, applying TTL overrides."""
+    policy = CACHE_POLICIES.get(endpoint, DEFAULT_POLICY)
+    overrides = _policy_overrides(get_settings().cache_ttl_overrides)
+    if endpoint in overrides:
+        return CachePolicy(ttl=overrides[endpoint], max_entries=policy.max_entries)
+    return policy
+
+
+class CacheBackend:
+    """Storage interface for cached responses.
+
+    Entries are grouped by endpoint and scoped by hospital so writes can
+    invalidate exactly the views they affect.
+    """
+
+    async def get(self, endpoint: str, scope: str, variant: str) -> Tuple[bool, Any]:
+        raise NotImplementedError
+
+    async def set(self, endpoint: str, scope: str, variant: str, value: Any, policy: CachePolicy) -> None:
+        raise NotImplementedError
+
+    async def invalidate(self, endpoint: str, hospital_id: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process cache with per-endpoint TTL and LRU eviction."""
+
+    def __init__(self):
+        self._entries: Dict[str, OrderedDict] = {}
+
+    async def get(self, endpoint: str, scope: str, variant: str) -> Tuple[bool, Any]:
+        entries = self._entries.get(endpoint)
+        if entries is None:
+            return False, None
+
+        key = (scope, variant)
+        entry = entries.get(key)
+        if entry is None:
+            return False, None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del entries[key]
+            return False, None
+
+        entries.move_to_end(key)
+        return True, value
+
+    async def set(self, endpoint: str, scope: str, variant: str, value: Any, policy: CachePolicy) -> None:
+        entries = self._entries.setdefault(endpoint, OrderedDict())
+        key = (scope, variant)
+        entries[key] = (time.monotonic() + policy.ttl, value)
+        entries.move_to_end(key)
+        while len(entries) > policy.max_entries:
+            entries.popitem(last=False)
+
+    async def invalidate(self, endpoint: str, hospital_id: Optional[str] = None) -> None:
+        if hospital_id is None:
+            self._entries.pop(endpoint, None)
+            return
+
+        entries = self._entries.get(endpoint)
+        if entries is None:
+            return
+        for key in [key for key in entries if key[0] in (hospital_id, ALL_HOSPITALS)]:
+            del entries[key]
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shared cache for multi-worker deployments.
+
+    TTLs are enforced per key; LRU eviction is left to the server's
+    ``maxmemory-policy`` (e.g. ``allkeys-lru``).
+    """
+
+    def __init__(self, url: str, prefix: str = "hms:cache:"):
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+
+        self._redis = redis.from_url(url)
+        self._prefix = prefix
+
+    def _key(self, endpoint: str, scope: str, variant: str) -> str:
+        return f"{self._prefix}{endpoint}|{scope}|{variant}"
+
+    async def get(self, endpoint: str, scope: str, variant: str) -> Tuple[bool, Any]:
+        raw = await self._redis.get(self._key(endpoint, scope, variant))
+        if raw is None:
+            return False, None
+        return True, json.loads(raw)
+
+    async def set(self, endpoint: str, scope: str, variant: str, value: Any, policy: CachePolicy) -> None:
+        await self._redis.set(
+            self._key(endpoint, scope, variant),
+            json.dumps(value, default=str),
+            ex=max(1, int(policy.ttl))
+        )
+
+    async def invalidate(self, endpoint: str, hospital_id: Optional[str] = None) -> None:
+        scopes = ["*"] if hospital_id is None else [hospital_id, "\\*"]
+        for scope in scopes:
+            async for key in self._redis.scan_iter(match=f"{self._prefix}{endpoint}|{scope}|*"):
+                await self._redis.delete(key)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class ResponseCache:
+    """Read-through cache in front of endpoint data loaders."""
+
+    def __init__(self, backend: Optional[CacheBackend]):
+        self.backend = backend
+        # Bumped by invalidate(), so a load that overlapped one is not stored
+        self._generation = 0
+
+    async def fetch(
+        self,
+        endpoint: str,
+        hospital_id: Optional[str],
+        loader: Callable[[], Awaitable[Any]],
+        *variant: Hashable
+    ) -> Any:
+        """Return the cached value for ``endpoint``/``hospital_id``, loading it on a miss.
+
+        ``variant`` distinguishes other parameters (IDs, page cursors) that
+        share the same hospital scope. Loader errors and ``None`` (a row
+        that does not exist yet) are never cached, so a 404 does not
+        outlive the insert that resolves it. Nor is a value whose load
+        overlapped a write or an invalidation, since it may predate them.
+        """
+        if self.backend is None:
+            return await loader()
+
+        scope = hospital_id or ALL_HOSPITALS
+        key = json.dumps(variant, default=str)
+        hit, value = await self.backend.get(endpoint, scope, key)
+        if hit:
+            return value
+
+        generation = (write_generation(), self._generation)
+        value = await loader()
+        if value is not None and generation == (write_generation(), self._generation):
+            await self.backend.set(endpoint, scope, key, value, get_policy(endpoint))
+        return value
+
+    async def invalidate(self, *endpoints: str, hospital_id: Optional[str] = None) -> None:
+        """Drop entries for a hospital (and network-wide views), or all entries."""
+        if self.backend is None:
+            return
+        self._generation += 1
+        for endpoint in endpoints:
+            await self.backend.invalidate(endpoint, hospital_id)
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+
+_response_cache: ResponseCache | None = None
+
+
+def get_cache() -> ResponseCache:
+    """Get or create the response cache for the configured backend."""
+    global _response_cache
+
+    if _response_cache is None:
+        settings = get_settings()
+        if settings.cache_backend == "redis":
+            backend = RedisCacheBackend(settings.cache_redis_url)
+        elif settings.cache_backend == "memory":
+            backend = MemoryCacheBackend()
+        else:
+            backend = None
+        _response_cache = ResponseCache(backend)
+
+    return _response_cache
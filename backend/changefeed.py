@@ -0,0 +1,268 @@
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set
+
+from fastapi import HTTPException
+
+from config import get_settings
+from metrics import CHANGEFEED_EVENTS, CHANGEFEED_RESYNCS
+from models.appointment import Appointment
+from models.department import Department
+from models.doctor import Doctor
+from models.hospital import Hospital
+from models.patient import Patient
+from serialization import row_shaper
+
+logger = logging.getLogger(__name__)
+
+# Tables whose writes are published, with the model their rows are served as
+FEED_MODELS = {
+    "hospitals": Hospital,
+    "departments": Department,
+    "doctors": Doctor,
+    "patients": Patient,
+    "appointments": Appointment,
+}
+FEED_TABLES = tuple(FEED_MODELS)
+
+# Sent instead of the backlog when a subscriber falls behind or events may
+# have been lost; clients refetch
+RESYNC = "resync"
+
+# Backoff between attempts to reconnect to Redis, doubling up to the maximum
+RECONNECT_DELAY = 0.5
+MAX_RECONNECT_DELAY = 30.0
+
+Event = Dict[str, Any]
+
+
+def row_events(
+    table: str,
+    op: str,
+    rows: List[Dict[str, Any]],
+    scope_column: str = "hospital_id",
+    fields: Optional[List[str]] = None
+) -> List[Event]:
+    """Describe written rows as feed events.
+
+    Updates carry only the changed ``fields``; inserts carry the whole row
+    and deletes just the ID. Rows are narrowed to the table's model, so
+    events hold the same fields as the REST responses.
+    """
+    model = FEED_MODELS.get(table)
+    if fields is not None and model is not None:
+        fields = [field for field in fields if field in model.model_fields]
+    shaper = row_shaper(model, tuple(fields) if fields is not None else None) if model is not None else None
+
+    events = []
+    for row in rows:
+        if op == "delete":
+            data = None
+        elif fields is not None and not fields:
+            data = {}
+        elif shaper is not None:
+            data = shaper(row)
+        elif fields is not None:
+            data = {field: row.get(field) for field in fields}
+        else:
+            data = row
+        events.append({
+            "table": table,
+            "op": op,
+            "id": row.get("id"),
+            "hospital_id": row.get(scope_column),
+            "data": data
+        })
+    return events
+
+
+class Subscription:
+    """One client's filtered, bounded view of the feed."""
+
+    def __init__(self, hospital_id: Optional[str], tables: FrozenSet[str], queue_size: int):
+        self.hospital_id = hospital_id
+        self.tables = tables
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def matches(self, event: Event) -> bool:
+        if event["table"] not in self.tables:
+            return False
+        return self.hospital_id is None or event["hospital_id"] == self.hospital_id
+
+    def offer(self, event: Event) -> None:
+        """Queue an event without blocking the writer.
+
+        A full queue means the client cannot keep up: its backlog is
+        replaced by a single resync event so memory stays bounded.
+        """
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.resync()
+
+    def resync(self) -> None:
+        """Replace the backlog with a single resync event."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait({"table": None, "op": RESYNC, "id": None, "hospital_id": self.hospital_id, "data": None})
+        CHANGEFEED_RESYNCS.inc()
+
+
+class ChangeFeed:
+    """Fan row changes out to the subscribers of this worker."""
+
+    def __init__(self, max_subscribers: int, queue_size: int):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscription] = set()
+        self._listeners: List[Callable[[Event], None]] = []
+
+    def subscribe(self, hospital_id: Optional[str], tables: FrozenSet[str]) -> Subscription:
+        if len(self._subscribers) >= self.max_subscribers:
+            raise HTTPException(status_code=503, detail="Too many change feed subscribers")
+        subscription = Subscription(hospital_id, tables, self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def add_listener(self, listener: Callable[[Event], None]) -> None:
+        """Call ``listener`` with every event, e.g. to keep an in-memory index current."""
+        self._listeners.append(listener)
+
+    def dispatch(self, events: List[Event]) -> None:
+        """Deliver events to matching local subscribers."""
+        for event in events:
+            CHANGEFEED_EVENTS.inc(table=event["table"], op=event["op"])
+            for listener in self._listeners:
+                try:
+                    listener(event)
+                except Exception:
+                    pass
+            for subscription in self._subscribers:
+                if subscription.matches(event):
+                    subscription.offer(event)
+
+    def resync(self) -> None:
+        """Tell every subscriber and listener that events may have been lost."""
+        event = {"table": None, "op": RESYNC, "id": None, "hospital_id": None, "data": None}
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception:
+                pass
+        for subscription in self._subscribers:
+            subscription.resync()
+
+    async def publish(self, events: List[Event]) -> None:
+        if events:
+            self.dispatch(events)
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        self._subscribers.clear()
+
+
+class RedisChangeFeed(ChangeFeed):
+    """Feed shared by every worker through Redis pub/sub.
+
+    Writes are published to a channel that each worker listens on, so
+    subscribers see changes regardless of which worker handled the write.
+    """
+
+    def __init__(self, url: str, max_subscribers: int, queue_size: int, channel: str = "hms:changes"):
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError("CHANGEFEED_BACKEND=redis requires the 'redis' package")
+
+        super().__init__(max_subscribers, queue_size)
+        self._redis = redis.from_url(url)
+        self._channel = channel
+        self._listener: Optional[asyncio.Task] = None
+
+    async def publish(self, events: List[Event]) -> None:
+        if events:
+            await self._redis.publish(self._channel, json.dumps(events, default=str))
+
+    async def start(self) -> None:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self._channel)
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def _listen(self, pubsub) -> None:
+        """Relay the channel to this worker, reconnecting with backoff.
+
+        Events published while the connection is down are lost, so once it
+        is back every subscriber and listener gets a resync.
+        """
+        while True:
+            try:
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.dispatch(json.loads(message["data"]))
+                logger.warning("Change feed subscription ended; reconnecting")
+            except Exception as e:
+                logger.warning("Change feed connection lost; reconnecting: %r", e)
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+            pubsub = await self._reconnect()
+            self.resync()
+
+    async def _reconnect(self):
+        delay = RECONNECT_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(self._channel)
+                return pubsub
+            except Exception as e:
+                logger.warning("Change feed reconnect failed; retrying in %.1fs: %r", delay, e)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await super().close()
+        await self._redis.aclose()
+
+
+_feed: ChangeFeed | None = None
+
+
+def get_feed() -> ChangeFeed:
+    """Get or create the change feed for the configured backend."""
+    global _feed
+
+    if _feed is None:
+        settings = get_settings()
+        if settings.changefeed_backend == "redis":
+            _feed = RedisChangeFeed(
+                settings.changefeed_redis_url,
+                settings.changefeed_max_subscribers,
+                settings.changefeed_queue_size
+            )
+        else:
+            _feed = ChangeFeed(settings.changefeed_max_subscribers, settings.changefeed_queue_size)
+
+    return _feed
+
+
+async def publish(events: List[Event]) -> None:
+    """Publish write events; feed errors never fail the write itself."""
+    try:
+        await get_feed().publish(events)
+    except Exception:
+        pass
@@ -10,10 +10,77 @@ class Settings(BaseSettings):
     supabase_key: str
     supabase_service_key: str = ""
     
+    # Supabase HTTP Pool Configuration
+    supabase_timeout: float = 10.0  # seconds per PostgREST request
+    supabase_connect_timeout: float = 5.0
+    supabase_max_connections: int = 100
+    supabase_max_keepalive: int = 20
+    supabase_keepalive_expiry: float = 30.0  # seconds an idle connection is kept
+    supabase_http2: bool = True
+    
+    # Data Access Configuration
+    db_client_mode: str = "async"  # "async" or "threadpool"
+    db_max_workers: int = 32
+    trusted_reads: bool = True  # skip response-model validation for rows read back from Supabase
+    singleflight_enabled: bool = True  # identical concurrent reads share one Supabase request
+    singleflight_timeout: float = 15.0  # seconds a read waits for a shared request
+    
+    # Bulk Write Configuration
+    bulk_max_items: int = 5000
+    bulk_chunk_size: int = 500
+    
+    # Analytics Configuration
+    analytics_query_timeout: float = 5.0  # seconds, per dataset
+    analytics_single_query: bool = False  # use the get_analytics_bundle RPC
+    analytics_source: str = "aggregate"  # "aggregate" (RPCs over rollups) or "tables"
+    rollup_reconcile_interval: float = 3600.0  # seconds between rollup rebuilds; 0 disables
+    
+    # Response Cache Configuration
+    cache_backend: str = "memory"  # "memory", "redis" or "none"
+    cache_redis_url: str = "redis://localhost:6379/0"
+    cache_ttl_overrides: str = ""  # e.g. "hospitals.list=30,analytics.bundle=600"
+    
+    # Change Feed Configuration
+    changefeed_backend: str = "memory"  # "memory" (per worker) or "redis" (shared)
+    changefeed_redis_url: str = "redis://localhost:6379/0"
+    changefeed_max_subscribers: int = 1000  # per worker
+    changefeed_queue_size: int = 256  # events buffered per subscriber
+    changefeed_heartbeat: float = 15.0  # seconds between keep-alive comments
+    
+    # Scheduling Configuration
+    schedule_day_start: str = "08:00"  # first bookable time
+    schedule_day_end: str = "18:00"  # appointments must end by this time
+    schedule_slot_minutes: int = 15  # slot search granularity
+    schedule_max_days: int = 31  # longest date range one slot search may cover
+    schedule_refresh_interval: float = 300.0  # seconds between index rebuilds; 0 disables
+    schedule_horizon_days: int = 90  # days ahead held in memory; other days are read from the database
+    
     # Server Configuration
     host: str = "0.0.0.0"
     port: int = 8000
-    debug: bool = True
+    debug: bool = True  # python main.py reloads on code changes; serve.py never does
+    workers: int = 1  # serve.py worker processes; 0 uses one per CPU
+    keep_alive: int = 5  # seconds an idle client connection is kept open
+    backlog: int = 2048  # pending connections queued by the listening socket
+    event_loop: str = "auto"  # "auto" (uvloop if installed), "asyncio" or "uvloop"
+    http_parser: str = "auto"  # "auto" (httptools if installed), "h11" or "httptools"
+    warmup_timeout: float = 10.0  # seconds per warm-up step before a worker serves; 0 disables
+    
+    # Response Compression Configuration
+    compression_enabled: bool = True
+    compression_min_size: int = 1024  # bytes; smaller complete responses are sent uncompressed
+    compression_encodings: str = "zstd,br,gzip"  # server preference among what the client accepts
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
+    
+    # Metrics and Profiling Configuration
+    profiling_enabled: bool = False
+    profile_header: str = "X-Profile"
+    profile_sample_rate: float = 0.0  # fraction of requests to profile
+    profile_slow_threshold: float = 0.5  # seconds; faster profiles are discarded
+    profile_interval: float = 0.005  # seconds between stack samples
+    profile_dir: str = "profiles"
     
     # CORS Configuration
     cors_origins: str = "http://localhost:5173,http://localhost:3000"
@@ -1,29 +1,138 @@
-from supabase import create_client, Client
+import asyncio
+from typing import Dict
+
+import httpx
+from postgrest.utils import SyncClient
+from supabase import (
+    create_client, acreate_client, Client, AsyncClient,
+    ClientOptions, AsyncClientOptions
+)
 from config import get_settings
 
-_supabase_client: Client | None = None
+# Key roles; each gets one cached client per flavour (sync/async)
+ANON = "anon"
+SERVICE = "service"
+
+_clients: Dict[str, Client] = {}
+_async_clients: Dict[str, AsyncClient] = {}
+_async_client_lock = asyncio.Lock()
+
+
+def _role_key(role: str) -> str:
+    settings = get_settings()
+    if role == SERVICE and settings.supabase_service_key:
+        return settings.supabase_service_key
+    return settings.supabase_key
+
+
+def _timeout() -> httpx.Timeout:
+    settings = get_settings()
+    return httpx.Timeout(settings.supabase_timeout, connect=settings.supabase_connect_timeout)
+
+
+def _limits() -> httpx.Limits:
+    settings = get_settings()
+    return httpx.Limits(
+        max_connections=settings.supabase_max_connections,
+        max_keepalive_connections=settings.supabase_max_keepalive,
+        keepalive_expiry=settings.supabase_keepalive_expiry
+    )
+
+
+def _pool_postgrest(client: Client | AsyncClient, session_class) -> httpx.Client | httpx.AsyncClient:
+    """Swap the PostgREST session for one with our pool limits and timeouts.
+
+    Returns the replaced default session, which the caller closes.
+    """
+    postgrest = client.postgrest
+    default_session = postgrest.session
+    postgrest.session = session_class(
+        base_url=default_session.base_url,
+        headers=default_session.headers,
+        timeout=_timeout(),
+        limits=_limits(),
+        http2=get_settings().supabase_http2,
+        follow_redirects=True
+    )
+    return default_session
+
+
+def _create(role: str) -> Client:
+    client = create_client(
+        get_settings().supabase_url,
+        _role_key(role),
+        ClientOptions(
+            postgrest_client_timeout=_timeout(),
+            auto_refresh_token=False,
+            persist_session=False
+        )
+    )
+    _pool_postgrest(client, SyncClient).close()
+    return client
+
+
+async def _acreate(role: str) -> AsyncClient:
+    client = await acreate_client(
+        get_settings().supabase_url,
+        _role_key(role),
+        AsyncClientOptions(
+            postgrest_client_timeout=_timeout(),
+            auto_refresh_token=False,
+            persist_session=False
+        )
+    )
+    await _pool_postgrest(client, httpx.AsyncClient).aclose()
+    return client
 
 
 def get_supabase() -> Client:
     """Get or create Supabase client instance."""
-    global _supabase_client
-    
-    if _supabase_client is None:
-        settings = get_settings()
-        _supabase_client = create_client(
-            settings.supabase_url,
-            settings.supabase_key
-        )
-    
-    return _supabase_client
+    if ANON not in _clients:
+        _clients[ANON] = _create(ANON)
+
+    return _clients[ANON]
+
+
+async def get_async_supabase(role: str = ANON) -> AsyncClient:
+    """Get or create async Supabase client instance for a key role."""
+    if role not in _async_clients:
+        async with _async_client_lock:
+            if role not in _async_clients:
+                _async_clients[role] = await _acreate(role)
+
+    return _async_clients[role]
 
 
 def get_supabase_admin() -> Client:
     """Get Supabase client with service role key for admin operations."""
     settings = get_settings()
-    if settings.supabase_service_key:
-        return create_client(
-            settings.supabase_url,
-            settings.supabase_service_key
-        )
-    return get_supabase()
+    if not settings.supabase_service_key:
+        return get_supabase()
+
+    if SERVICE not in _clients:
+        _clients[SERVICE] = _create(SERVICE)
+
+    return _clients[SERVICE]
+
+
+async def startup() -> None:
+    """Create the clients used by the configured data-access mode up front."""
+    settings = get_settings()
+    roles = [ANON, SERVICE] if settings.supabase_service_key else [ANON]
+    for role in roles:
+        if settings.db_client_mode == "async":
+            await get_async_supabase(role)
+        elif role == SERVICE:
+            get_supabase_admin()
+        else:
+            get_supabase()
+
+
+async def shutdown() -> None:
+    """Close the pooled HTTP sessions of every cached client."""
+    for client in _clients.values():
+        client.postgrest.session.close()
+    for client in _async_clients.values():
+        await client.postgrest.session.aclose()
+    _clients.clear()
+    _async_clients.clear()
@@ -0,0 +1,136 @@
+import asyncio
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Type
+
+from fastapi import Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from formats import ARROW_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, ArrowStream, arrow_schema, msgpack, negotiate_format, require_format
+from repository import Repository
+
+EXPORT_PAGE_SIZE = 1000
+
+ExportFormat = Literal['ndjson', 'csv', 'msgpack', 'arrow']
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "msgpack": MSGPACK_MEDIA_TYPE,
+    "arrow": ARROW_MEDIA_TYPE,
+}
+
+
+async def iter_pages(
+    repository: Repository,
+    keyset: List[str],
+    filters: Optional[Dict[str, Any]] = None,
+    page_size: int = EXPORT_PAGE_SIZE,
+    columns: str = "*"
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield every matching row page by page, prefetching the next page.
+
+    At most two pages are held in memory regardless of table size.
+    """
+    fetch = asyncio.create_task(
+        repository.find_page(keyset, page_size, None, filters=filters, columns=columns)
+    )
+    try:
+        while fetch is not None:
+            rows, next_cursor = await fetch
+            fetch = None
+            if next_cursor is not None:
+                fetch = asyncio.create_task(
+                    repository.find_page(keyset, page_size, next_cursor, filters=filters, columns=columns)
+                )
+            if rows:
+                yield rows
+    finally:
+        if fetch is not None:
+            fetch.cancel()
+
+
+async def _ndjson(pages: AsyncIterator[List[Dict[str, Any]]], columns: List[str]) -> AsyncIterator[bytes]:
+    async for rows in pages:
+        yield "".join(
+            json.dumps({column: row.get(column) for column in columns}, default=str) + "\n"
+            for row in rows
+        ).encode()
+
+
+async def _csv(pages: AsyncIterator[List[Dict[str, Any]]], columns: List[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in pages:
+        writer.writerows([row.get(column) for column in columns] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def _msgpack(pages: AsyncIterator[List[Dict[str, Any]]], columns: List[str]) -> AsyncIterator[bytes]:
+    packer = msgpack.Packer()
+    async for rows in pages:
+        yield b"".join(packer.pack({column: row.get(column) for column in columns}) for row in rows)
+
+
+async def _arrow(pages: AsyncIterator[List[Dict[str, Any]]], schema: Any) -> AsyncIterator[bytes]:
+    stream = ArrowStream(schema)
+    async for rows in pages:
+        yield stream.write(rows)
+    yield stream.close()
+
+
+def export_format(
+    request: Request,
+    format: Optional[ExportFormat] = Query(
+        None,
+        description="ndjson, csv, msgpack or arrow (default: from the Accept header, else ndjson)"
+    )
+) -> ExportFormat:
+    """Dependency choosing the export format from ``format`` or the Accept header."""
+    if format is not None:
+        return require_format(format)
+    return negotiate_format(request.headers.get("accept"), ("ndjson", "csv", "msgpack", "arrow"))
+
+
+def export_response(
+    repository: Repository,
+    keyset: List[str],
+    model: Type[BaseModel],
+    export_format: ExportFormat,
+    filters: Optional[Dict[str, Any]] = None
+) -> StreamingResponse:
+    """Stream a filtered table with flat memory use.
+
+    NDJSON and MessagePack send one object per row, MessagePack as a
+    stream of concatenated maps. Arrow sends an IPC stream with one record
+    batch per Supabase page, typed from ``model``.
+    """
+    columns = model_columns(model)
+    pages = iter_pages(repository, keyset, filters)
+    if export_format == "csv":
+        body = _csv(pages, columns)
+    elif export_format == "msgpack":
+        body = _msgpack(pages, columns)
+    elif export_format == "arrow":
+        body = _arrow(pages, arrow_schema(model, tuple(columns)))
+    else:
+        body = _ndjson(pages, columns)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{repository.table}.{export_format}"'
+        }
+    )
+
+
+def model_columns(model) -> List[str]:
+    """Export columns for a model: ``id`` first, then the declared fields."""
+    return ["id"] + [name for name in model.model_fields if name != "id"]
@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Range:
+    """Inclusive bounds for a column; a missing bound is open."""
+    low: Any = None
+    high: Any = None
+
+
+@dataclass(frozen=True)
+class OneOf:
+    """Match any of several values (SQL ``IN``)."""
+    values: Tuple[Any, ...]
+
+
+def between(low: Any = None, high: Any = None) -> Optional[Range]:
+    """Range filter from optional bounds, or ``None`` if both are missing."""
+    if low is None and high is None:
+        return None
+    return Range(low, high)
+
+
+def one_of(raw: Optional[str]) -> Optional[Any]:
+    """Filter from a comma-separated query parameter such as ``Critical,Stable``.
+
+    A single value stays an equality filter.
+    """
+    if raw is None:
+        return None
+    values = tuple(dict.fromkeys(value.strip() for value in raw.split(",") if value.strip()))
+    if not values:
+        return None
+    return values[0] if len(values) == 1 else OneOf(values)
+
+
+def apply_filters(query: Any, filters: Optional[Dict[str, Any]]) -> Any:
+    """Add ``filters`` to a PostgREST query builder so they run in the database.
+
+    Plain values become ``eq``, :class:`Range` becomes ``gte``/``lte`` and
+    :class:`OneOf` becomes ``in``. ``None`` and empty values are skipped.
+    """
+    for column, value in (filters or {}).items():
+        if value is None or value == "":
+            continue
+        if isinstance(value, Range):
+            if value.low is not None:
+                query = query.gte(column, str(value.low))
+            if value.high is not None:
+                query = query.lte(column, str(value.high))
+        elif isinstance(value, OneOf):
+            query = query.in_(column, [str(item) for item in value.values])
+        else:
+            query = query.eq(column, value)
+    return query
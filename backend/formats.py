@@ -0,0 +1,197 @@
+import io
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple, Type, Union, get_args, get_origin
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+Row = Dict[str, Any]
+
+ResponseFormat = Literal['json', 'msgpack', 'arrow']
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Accept media types understood for each format
+FORMAT_MEDIA_TYPES: Dict[str, Tuple[str, ...]] = {
+    "json": ("application/json",),
+    "ndjson": ("application/x-ndjson",),
+    "csv": ("text/csv",),
+    "msgpack": (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"),
+    "arrow": (ARROW_MEDIA_TYPE,),
+}
+
+# Optional package each binary format needs
+FORMAT_PACKAGES = {"msgpack": "msgpack", "arrow": "pyarrow"}
+
+
+def format_available(name: str) -> bool:
+    """Whether the package ``name`` encodes with is installed."""
+    if name == "msgpack":
+        return msgpack is not None
+    if name == "arrow":
+        return pyarrow is not None
+    return True
+
+
+def require_format(name: str) -> str:
+    """``name``, or a 406 if its optional package is not installed."""
+    if not format_available(name):
+        raise HTTPException(
+            status_code=406,
+            detail=f"{FORMAT_MEDIA_TYPES[name][0]} responses need the '{FORMAT_PACKAGES[name]}' package"
+        )
+    return name
+
+
+def _accept_weights(accept: str) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for item in accept.split(","):
+        media_type, _, params = item.partition(";")
+        media_type = media_type.strip().lower()
+        if not media_type:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[media_type] = weight
+    return weights
+
+
+def negotiate_format(accept: Optional[str], offered: Iterable[str]) -> str:
+    """Pick one of ``offered`` formats for an Accept header.
+
+    An exact media type beats ``application/*`` and ``*/*``; the highest
+    q-value wins and ties go to the earlier offer. The first offer is
+    the default when the header is missing or matches nothing. Raises 406
+    when only formats whose package is not installed are acceptable.
+    """
+    offered = list(offered)
+    if not accept:
+        return offered[0]
+
+    weights = _accept_weights(accept)
+    wildcard = max(weights.get("*/*", 0.0), weights.get("application/*", 0.0))
+
+    def weight(name: str) -> float:
+        exact = [weights[media_type] for media_type in FORMAT_MEDIA_TYPES[name] if media_type in weights]
+        return max(exact) if exact else wildcard
+
+    ranked = sorted(
+        (name for name in offered if weight(name) > 0),
+        key=lambda name: -weight(name)
+    )
+    if not ranked:
+        return offered[0]
+    for name in ranked:
+        if format_available(name):
+            return name
+    return require_format(ranked[0])
+
+
+def _arrow_type(annotation: Any) -> Any:
+    origin = get_origin(annotation)
+    if origin is Union:
+        return _arrow_type(next(arg for arg in get_args(annotation) if arg is not type(None)))
+    if origin is Literal:
+        return pyarrow.string()
+    if origin in (list, List):
+        return pyarrow.list_(_arrow_type(get_args(annotation)[0]))
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return pyarrow.struct(list(arrow_schema(annotation)))
+    if annotation is bool:
+        return pyarrow.bool_()
+    if annotation is int:
+        return pyarrow.int64()
+    if annotation is float:
+        return pyarrow.float64()
+    return pyarrow.string()
+
+
+def _nullable(field: FieldInfo) -> bool:
+    return not field.is_required() or type(None) in get_args(field.annotation)
+
+
+@lru_cache(maxsize=None)
+def arrow_schema(model: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None) -> Any:
+    """Arrow schema for ``fields`` of ``model`` (default: all), typed from the annotations.
+
+    Integers become int64, floats float64, literals and other strings
+    utf8, lists Arrow lists and nested models structs. Fields that are
+    optional or have a default are nullable.
+    """
+    names = fields or tuple(model.model_fields)
+    return pyarrow.schema([
+        pyarrow.field(name, _arrow_type(model.model_fields[name].annotation), nullable=_nullable(model.model_fields[name]))
+        for name in names
+    ])
+
+
+class ArrowStream:
+    """Incremental Arrow IPC stream writer: one record batch per page of rows."""
+
+    def __init__(self, schema: Any):
+        self.schema = schema
+        self._sink = io.BytesIO()
+        self._writer = pyarrow.ipc.new_stream(self._sink, schema)
+
+    def _take(self) -> bytes:
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+    def write(self, rows: List[Row]) -> bytes:
+        """IPC bytes for ``rows`` (preceded by the schema message on the first call)."""
+        self._writer.write_batch(pyarrow.RecordBatch.from_pylist(rows, schema=self.schema))
+        return self._take()
+
+    def close(self) -> bytes:
+        """The end-of-stream marker, plus the schema if no batch was written."""
+        self._writer.close()
+        return self._take()
+
+
+def arrow_ipc(schema: Any, rows: List[Row]) -> bytes:
+    """``rows`` as a complete Arrow IPC stream holding a single record batch."""
+    stream = ArrowStream(schema)
+    return stream.write(rows) + stream.close()
+
+
+class MsgPackResponse(Response):
+    """MessagePack response for JSON-compatible content: rows stay maps keyed by field name."""
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content)
+
+
+class ArrowResponse(Response):
+    """Arrow IPC stream response holding one record batch of ``content`` rows."""
+
+    media_type = ARROW_MEDIA_TYPE
+
+    def __init__(self, content: Any, schema: Any, **kwargs: Any):
+        self.schema = schema
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return arrow_ipc(self.schema, content if isinstance(content, list) else [content])
@@ -0,0 +1,94 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from config import get_settings
+from metrics import serializing
+from pagination import MAX_PAGE_SIZE
+from projection import Projection
+from repository import Repository, query_failed
+from serialization import TrustedJSONResponse
+
+# IDs per ``in`` query, keeping request URLs well under proxy limits
+LOAD_CHUNK_SIZE = 200
+MAX_BATCH_IDS = MAX_PAGE_SIZE
+
+
+class Loader:
+    """Batch and cache get-by-ID lookups for one table (DataLoader style).
+
+    Every ``load`` issued in the same event-loop tick, e.g. from one
+    ``asyncio.gather`` or one burst of change feed events, is resolved by a
+    single ``in ("id", ...)`` query per chunk. Repeated IDs share one lookup
+    for the lifetime of the loader, so create one per request or per burst.
+    """
+
+    def __init__(self, repository: Repository, columns: str = "*"):
+        self.repository = repository
+        self.columns = columns
+        self._results: Dict[str, asyncio.Future] = {}
+        self._queue: List[str] = []
+
+    def load(self, record_id: str) -> "asyncio.Future[Optional[Dict[str, Any]]]":
+        """The row with ``record_id``, or ``None`` if it does not exist."""
+        future = self._results.get(record_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._results[record_id] = future
+            self._queue.append(record_id)
+            if len(self._queue) == 1:
+                loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        return future
+
+    async def load_many(self, record_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        return list(await asyncio.gather(*(self.load(record_id) for record_id in record_ids)))
+
+    async def _dispatch(self) -> None:
+        queued, self._queue = self._queue, []
+        await asyncio.gather(*(
+            self._fetch(queued[start:start + LOAD_CHUNK_SIZE])
+            for start in range(0, len(queued), LOAD_CHUNK_SIZE)
+        ))
+
+    async def _fetch(self, record_ids: List[str]) -> None:
+        try:
+            rows = await self.repository.get_many(record_ids, self.columns)
+        except Exception as e:
+            for record_id in record_ids:
+                # Forget failures so a later load can retry
+                self._results.pop(record_id).set_exception(e)
+            return
+        found = {row["id"]: row for row in rows}
+        for record_id in record_ids:
+            self._results[record_id].set_result(found.get(record_id))
+
+
+def parse_ids(raw: str) -> List[str]:
+    """Distinct IDs, in order, from a comma-separated ``ids`` parameter."""
+    ids = list(dict.fromkeys(value.strip() for value in raw.split(",") if value.strip()))
+    if not ids:
+        raise HTTPException(status_code=400, detail="No IDs given")
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} IDs per request")
+    return ids
+
+
+async def batch_lookup(repository: Repository, raw_ids: str, fields: Projection) -> Any:
+    """Rows for the requested IDs in request order, listing IDs that do not exist as ``missing``."""
+    ids = parse_ids(raw_ids)
+    try:
+        rows = await Loader(repository, fields.columns("id")).load_many(ids)
+    except Exception as e:
+        raise query_failed(e, "Lookup")
+
+    items = [row for row in rows if row is not None]
+    missing = [record_id for record_id, row in zip(ids, rows) if row is None]
+    if fields.fields is None and not get_settings().trusted_reads:
+        return {"items": items, "missing": missing}
+    with serializing():
+        if get_settings().trusted_reads:
+            return TrustedJSONResponse(content={"items": fields.trusted(items), "missing": missing})
+        return JSONResponse(content={"items": fields.dump(items), "missing": missing})
@@ -1,8 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from config import get_settings
+import database
+import rollups
+import scheduling
+from repository import shutdown_executor
+from cache import get_cache
+from changefeed import get_feed
+from middleware.compression import CompressionMiddleware
+from middleware.etag import ETagMiddleware
+from middleware.metrics import MetricsMiddleware
+from metrics import render_metrics
+from pagination import NEXT_CURSOR_HEADER
+from warmup import warm_up
+
+from routes import hospitals, patients, doctors, appointments, departments, analytics, changes, search
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open pooled Supabase clients and warm the worker up on startup; release them on shutdown."""
+    await database.startup()
+    await get_feed().start()
+    rollups.start_reconciler()
+    scheduling.start_refresher()
+    await warm_up()
+    yield
+    await scheduling.stop_refresher()
+    await rollups.stop_reconciler()
+    await get_feed().close()
+    await get_cache().close()
+    shutdown_executor()
+    await database.shutdown()
 
-from routes import hospitals, patients, doctors, appointments, departments, analytics
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -10,12 +42,20 @@ app = FastAPI(
     description="Backend API for the Multi Hospital Management System",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Get settings
 settings = get_settings()
 
+# Conditional GET support (added before CORS so 304s still carry CORS headers)
+app.add_middleware(ETagMiddleware)
+
+# Response compression (outside ETag, so tags are computed on the identity body)
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -23,8 +63,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# Request metrics and profiling (outermost, so timings cover the whole stack)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(hospitals.router, prefix="/api/hospitals", tags=["Hospitals"])
 app.include_router(patients.router, prefix="/api/patients", tags=["Patients"])
@@ -32,6 +76,8 @@ app.include_router(doctors.router, prefix="/api/doctors", tags=["Doctors"])
 app.include_router(appointments.router, prefix="/api/appointments", tags=["Appointments"])
 app.include_router(departments.router, prefix="/api/departments", tags=["Departments"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
+app.include_router(changes.router, prefix="/api/changes", tags=["Changes"])
+app.include_router(search.router, prefix="/api/search", tags=["Search"])
 
 
 @app.get("/")
@@ -44,6 +90,12 @@ async def root():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
@@ -51,10 +103,9 @@ async def health_check():
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=settings.debug
-    )
+    if settings.debug:
+        import uvicorn
+        uvicorn.run("main:app", host=settings.host, port=settings.port, reload=True)
+    else:
+        import serve
+        serve.run()
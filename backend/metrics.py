@@ -0,0 +1,212 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class RequestTimings:
+    """Time spent in each phase of the current request."""
+
+    def __init__(self):
+        self.route: Optional[str] = None
+        self.db = 0.0
+        self.handler = 0.0
+        # Response encoding the handler did itself, part of ``handler`` above
+        self.serialization = 0.0
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request() -> RequestTimings:
+    """Begin collecting timings for the request running in this context."""
+    timings = RequestTimings()
+    _current_timings.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the request running in this context, if it is being measured."""
+    return _current_timings.get()
+
+
+def record_db_time(seconds: float) -> None:
+    """Add a Supabase round-trip to the current request, if any."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.db += seconds
+
+
+@contextmanager
+def serializing() -> Iterator[None]:
+    """Count the enclosed work as serialization even though a handler runs it.
+
+    For handlers that shape and encode their own response instead of
+    leaving it to FastAPI.
+    """
+    timings = _current_timings.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings.serialization += time.perf_counter() - start
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by label set."""
+
+    def __init__(self, name: str, description: str, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            # counts per bucket, then +Inf count, then sum
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for key, series in sorted(snapshot.items()):
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_labels(key, le=repr(bound))} {int(count)}")
+            lines.append(f"{self.name}_bucket{_labels(key, le='+Inf')} {int(series[-2])}")
+            lines.append(f"{self.name}_sum{_labels(key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(key)} {int(series[-2])}")
+        return lines
+
+
+class Counter:
+    """Prometheus-style monotonically increasing counter keyed by label set."""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._series: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = dict(self._series)
+        for key, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{_labels(key)} {value}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: Labels, **extra: str) -> str:
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Total request latency by route."
+)
+REQUEST_PHASE_DURATION = Histogram(
+    "http_request_phase_duration_seconds",
+    "Request latency split into db (Supabase, summed across concurrent queries), handler (excluding db) and serialization (validation, encoding, middleware)."
+)
+REQUESTS_TOTAL = Counter(
+    "http_requests_total",
+    "Requests served by route and status."
+)
+CHANGEFEED_EVENTS = Counter(
+    "changefeed_events_total",
+    "Row changes dispatched to change feed subscribers by table and operation."
+)
+CHANGEFEED_RESYNCS = Counter(
+    "changefeed_resyncs_total",
+    "Subscriber backlogs replaced by a resync: the client fell behind or the feed reconnected."
+)
+COMPRESSION_RATIO = Histogram(
+    "http_response_compression_ratio",
+    "Compressed size over original size of compressed responses by route and encoding.",
+    buckets=(0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.75, 1.0)
+)
+COMPRESSION_SECONDS = Histogram(
+    "http_response_compression_seconds",
+    "CPU time spent compressing each response by route and encoding.",
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+COMPRESSION_BYTES = Counter(
+    "http_response_compression_bytes_total",
+    "Response body bytes before (original) and after (compressed) compression by route and encoding."
+)
+COALESCED_READS = Counter(
+    "db_reads_coalesced_total",
+    "Reads that joined an identical query already in flight instead of issuing their own, by table or function."
+)
+
+REGISTRY: List[Any] = [
+    REQUEST_DURATION, REQUEST_PHASE_DURATION, REQUESTS_TOTAL,
+    CHANGEFEED_EVENTS, CHANGEFEED_RESYNCS,
+    COMPRESSION_RATIO, COMPRESSION_SECONDS, COMPRESSION_BYTES,
+    COALESCED_READS
+]
+
+
+def render_metrics() -> str:
+    """Render every registered metric in the Prometheus text format."""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _timed_endpoint(endpoint: Callable[..., Any], route: str) -> Callable[..., Any]:
+    """Wrap an async endpoint so its run time is recorded against ``route``."""
+    endpoint = getattr(endpoint, "_instrumented_endpoint", endpoint)
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        timings = _current_timings.get()
+        if timings is None:
+            return await endpoint(*args, **kwargs)
+        timings.route = route
+        start = time.perf_counter()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            timings.handler += time.perf_counter() - start
+
+    wrapper._instrumented_endpoint = endpoint
+    return wrapper
+
+
+class InstrumentedRoute(APIRoute):
+    """Route that records handler time and its path template for metrics."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, _timed_endpoint(endpoint, path), **kwargs)
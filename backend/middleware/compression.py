@@ -0,0 +1,241 @@
+import time
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import Settings, get_settings
+from metrics import COMPRESSION_BYTES, COMPRESSION_RATIO, COMPRESSION_SECONDS, current_timings
+from middleware.etag import _header
+from middleware.metrics import UNMATCHED_ROUTE
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content types worth compressing; everything else is passed through
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+    "application/msgpack",
+    "application/vnd.apache.arrow.stream",
+)
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        # wbits 31: gzip container, zero mtime so equal bodies compress identically
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+Encoder = Callable[[], object]
+
+
+def available_encoders(settings: Settings) -> Dict[str, Encoder]:
+    """Encoder factories by content-coding, in the configured preference order.
+
+    Codings whose optional package is not installed are left out.
+    """
+    factories: Dict[str, Encoder] = {
+        "gzip": lambda: _Gzip(settings.compression_gzip_level),
+    }
+    if brotli is not None:
+        factories["br"] = lambda: _Brotli(settings.compression_brotli_quality)
+    if zstandard is not None:
+        factories["zstd"] = lambda: _Zstd(settings.compression_zstd_level)
+
+    preferred = [name.strip().lower() for name in settings.compression_encodings.split(",")]
+    return {name: factories[name] for name in preferred if name in factories}
+
+
+def negotiate(accept_encoding: str, codings: Iterable[str]) -> Optional[str]:
+    """Pick a content-coding for an Accept-Encoding header (RFC 9110).
+
+    The highest q-value the client gives wins; ties go to the earlier of
+    ``codings``. Returns None when the client accepts none of them.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+
+    chosen, best = None, 0.0
+    for name in codings:
+        weight = weights.get(name, weights.get("*", 0.0))
+        if weight > best:
+            chosen, best = name, weight
+    return chosen
+
+
+def _compressible(headers: Iterable[Tuple[bytes, bytes]]) -> bool:
+    if _header(headers, b"content-encoding") is not None:
+        return False
+    content_type = _header(headers, b"content-type") or ""
+    return content_type.lower().startswith(COMPRESSIBLE_TYPES)
+
+
+def _encoded_headers(
+    headers: Iterable[Tuple[bytes, bytes]], coding: str, length: Optional[int]
+) -> List[Tuple[bytes, bytes]]:
+    """Response headers for a body sent with ``coding``; ``length`` None means streamed."""
+    result: List[Tuple[bytes, bytes]] = []
+    has_vary = False
+    for key, value in headers:
+        name = key.lower()
+        if name == b"content-length":
+            continue
+        if name == b"etag" and not value.startswith(b"W/"):
+            # The bytes differ from the identity body the tag was computed on
+            value = b"W/" + value
+        if name == b"vary":
+            has_vary = True
+            if b"accept-encoding" not in value.lower():
+                value += b", Accept-Encoding"
+        result.append((key, value))
+
+    if not has_vary:
+        result.append((b"vary", b"Accept-Encoding"))
+    result.append((b"content-encoding", coding.encode("latin-1")))
+    if length is not None:
+        result.append((b"content-length", str(length).encode("latin-1")))
+    return result
+
+
+class CompressionMiddleware:
+    """Compress text, JSON and binary row responses with gzip, brotli or zstd.
+
+    The coding is negotiated from Accept-Encoding against
+    ``COMPRESSION_ENCODINGS``; brotli and zstd need their optional packages.
+    Complete responses smaller than ``COMPRESSION_MIN_SIZE`` are sent as-is.
+    Streamed responses are compressed incrementally and flushed at every
+    chunk the app sends, so server-sent events still reach the client one
+    by one. Ratio, bytes and CPU time per route are recorded in the
+    metrics registry.
+    """
+
+    def __init__(self, app: ASGIApp):
+        settings = get_settings()
+        self.app = app
+        self.minimum_size = settings.compression_min_size
+        self.encoders = available_encoders(settings)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coding = negotiate(_header(scope["headers"], b"accept-encoding") or "", self.encoders)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        encoder = None
+        passthrough = False
+        original = compressed = 0
+        cpu = 0.0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, encoder, passthrough, original, compressed, cpu
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                if _compressible(message.get("headers", [])):
+                    start = message
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                encoder = self.encoders[coding]()
+
+            began = time.thread_time()
+            chunk = encoder.compress(body) + (encoder.flush() if more_body else encoder.finish())
+            cpu += time.thread_time() - began
+            original += len(body)
+            compressed += len(chunk)
+
+            if start is not None:
+                headers = _encoded_headers(start.get("headers", []), coding, None if more_body else len(chunk))
+                await send({**start, "headers": headers})
+                start = None
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+            if not more_body:
+                timings = current_timings()
+                route = (timings.route if timings is not None else None) or UNMATCHED_ROUTE
+                COMPRESSION_SECONDS.observe(cpu, route=route, encoding=coding)
+                COMPRESSION_RATIO.observe(compressed / max(1, original), route=route, encoding=coding)
+                COMPRESSION_BYTES.inc(original, route=route, encoding=coding, stage="original")
+                COMPRESSION_BYTES.inc(compressed, route=route, encoding=coding, stage="compressed")
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,97 @@
+import hashlib
+from typing import Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Headers that describe the omitted body and must not be sent with a 304
+BODY_HEADERS = {b"content-length", b"content-type", b"content-encoding"}
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match header (RFC 9110)."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _header(headers: Iterable[Tuple[bytes, bytes]], name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ETagMiddleware:
+    """Add ETags to GET responses and answer matching If-None-Match with 304.
+
+    Only complete, single-chunk ``200`` responses are tagged; streamed
+    responses pass through untouched. A handler-supplied ETag is kept.
+    """
+
+    def __init__(self, app: ASGIApp, prefixes: Tuple[str, ...] = ("/api",)):
+        self.app = app
+        self.prefixes = prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not scope["path"].startswith(self.prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = _header(scope["headers"], b"if-none-match")
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                if message["status"] != 200:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if message.get("more_body", False):
+                # Streaming response: forward as-is without an ETag
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            headers: List[Tuple[bytes, bytes]] = list(start.get("headers", []))
+            etag = _header(headers, b"etag")
+            if etag is None:
+                etag = compute_etag(message.get("body", b""))
+                headers.append((b"etag", etag.encode("latin-1")))
+
+            if if_none_match is not None and etag_matches(if_none_match, etag):
+                await send({
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(k, v) for k, v in headers if k.lower() not in BODY_HEADERS],
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send({**start, "headers": headers})
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,84 @@
+import logging
+import random
+import threading
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import get_settings
+from metrics import REQUEST_DURATION, REQUEST_PHASE_DURATION, REQUESTS_TOTAL, start_request
+from profiler import StackSampler
+
+logger = logging.getLogger(__name__)
+
+# Route label for requests that did not match any API route
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """Record per-route latency histograms and optionally profile slow requests.
+
+    Each request is split into ``db`` (Supabase round-trips), ``handler``
+    (endpoint code excluding db) and ``serialization`` (request validation,
+    response validation/encoding and middleware, including responses a
+    handler renders itself). Profiling is opt-in via
+    ``PROFILING_ENABLED`` and then triggered per request by the profile
+    header or ``PROFILE_SAMPLE_RATE``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _should_profile(self, scope: Scope) -> bool:
+        settings = get_settings()
+        if not settings.profiling_enabled:
+            return False
+        header = settings.profile_header.lower().encode("latin-1")
+        if any(key == header for key, _ in scope["headers"]):
+            return True
+        return random.random() < settings.profile_sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        timings = start_request()
+        sampler = None
+        if self._should_profile(scope):
+            sampler = StackSampler(threading.get_ident(), settings.profile_interval).start()
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = timings.route or UNMATCHED_ROUTE
+            method = scope["method"]
+
+            REQUESTS_TOTAL.inc(method=method, route=route, status=str(status))
+            REQUEST_DURATION.observe(elapsed, method=method, route=route)
+            REQUEST_PHASE_DURATION.observe(timings.db, method=method, route=route, phase="db")
+            REQUEST_PHASE_DURATION.observe(
+                max(0.0, timings.handler - timings.db - timings.serialization),
+                method=method, route=route, phase="handler"
+            )
+            REQUEST_PHASE_DURATION.observe(
+                max(0.0, elapsed - timings.handler + timings.serialization),
+                method=method, route=route, phase="serialization"
+            )
+
+            if sampler is not None:
+                sampler.stop()
+                if elapsed >= settings.profile_slow_threshold:
+                    path = sampler.dump(settings.profile_dir, f"{method} {route}")
+                    logger.warning("Slow request %s %s took %.3fs, profile written to %s", method, route, elapsed, path)
@@ -0,0 +1,42 @@
+-- Analytics Bundle RPC for Multi Hospital Management System
+-- Run this after 002_seed_data.sql in your Supabase SQL Editor
+
+-- Return every analytics dataset in a single round-trip.
+-- Pass NULL to include all hospitals.
+CREATE OR REPLACE FUNCTION get_analytics_bundle(p_hospital_id TEXT DEFAULT NULL)
+RETURNS JSON AS $$
+    SELECT json_build_object(
+        'weekly_patients', COALESCE((
+            SELECT json_agg(json_build_object('day', day, 'patients', patients) ORDER BY id)
+            FROM weekly_patients
+            WHERE p_hospital_id IS NULL OR hospital_id = p_hospital_id
+        ), '[]'::json),
+        'department_distribution', COALESCE((
+            SELECT json_agg(json_build_object('name', name, 'value', value, 'color', color) ORDER BY id)
+            FROM department_distribution
+            WHERE p_hospital_id IS NULL OR hospital_id = p_hospital_id
+        ), '[]'::json),
+        'monthly_revenue', COALESCE((
+            SELECT json_agg(json_build_object('month', month, 'revenue', revenue, 'expenses', expenses) ORDER BY id)
+            FROM monthly_revenue
+            WHERE p_hospital_id IS NULL OR hospital_id = p_hospital_id
+        ), '[]'::json),
+        'patient_trends', COALESCE((
+            SELECT json_agg(json_build_object('month', month, 'inpatient', inpatient, 'outpatient', outpatient) ORDER BY id)
+            FROM patient_trends
+            WHERE p_hospital_id IS NULL OR hospital_id = p_hospital_id
+        ), '[]'::json),
+        'department_performance', COALESCE((
+            SELECT json_agg(json_build_object('department', department, 'satisfaction', satisfaction, 'efficiency', efficiency) ORDER BY id)
+            FROM department_performance
+            WHERE p_hospital_id IS NULL OR hospital_id = p_hospital_id
+        ), '[]'::json)
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Indexes backing the per-hospital lookups above
+CREATE INDEX IF NOT EXISTS idx_weekly_patients_hospital ON weekly_patients(hospital_id);
+CREATE INDEX IF NOT EXISTS idx_department_distribution_hospital ON department_distribution(hospital_id);
+CREATE INDEX IF NOT EXISTS idx_monthly_revenue_hospital ON monthly_revenue(hospital_id);
+CREATE INDEX IF NOT EXISTS idx_patient_trends_hospital ON patient_trends(hospital_id);
+CREATE INDEX IF NOT EXISTS idx_department_performance_hospital ON department_performance(hospital_id);
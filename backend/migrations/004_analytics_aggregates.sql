@@ -0,0 +1,108 @@
+-- Server-side Analytics Aggregates for Multi Hospital Management System
+-- Run this after 003_analytics_bundle.sql in your Supabase SQL Editor
+--
+-- These functions compute analytics from the patients and appointments
+-- tables with GROUP BY over date buckets, replacing the precomputed
+-- weekly_patients, department_distribution and patient_trends tables.
+-- Pass NULL as p_hospital_id to aggregate across all hospitals.
+
+-- Admissions per day over the last 7 days, Mon..Sun
+CREATE OR REPLACE FUNCTION analytics_weekly_admissions(p_hospital_id TEXT DEFAULT NULL)
+RETURNS TABLE(day TEXT, patients INTEGER) AS $$
+    SELECT to_char(d.bucket, 'Dy'), COUNT(p.id)::INTEGER
+    FROM generate_series(CURRENT_DATE - 6, CURRENT_DATE, INTERVAL '1 day') AS d(bucket)
+    LEFT JOIN patients p
+        ON p.admission_date = d.bucket::date
+        AND (p_hospital_id IS NULL OR p.hospital_id = p_hospital_id)
+    GROUP BY d.bucket
+    ORDER BY EXTRACT(ISODOW FROM d.bucket);
+$$ LANGUAGE sql STABLE;
+
+-- Current (not discharged) patients per department, largest first
+CREATE OR REPLACE FUNCTION analytics_department_distribution(p_hospital_id TEXT DEFAULT NULL)
+RETURNS TABLE(name TEXT, value INTEGER, color TEXT) AS $$
+    SELECT
+        c.department,
+        c.total::INTEGER,
+        (ARRAY['#EF4444', '#3B82F6', '#10B981', '#F59E0B', '#8B5CF6', '#EC4899', '#14B8A6', '#F97316'])
+            [((ROW_NUMBER() OVER (ORDER BY c.total DESC, c.department) - 1) % 8) + 1]
+    FROM (
+        SELECT p.department, COUNT(*) AS total
+        FROM patients p
+        WHERE p.status <> 'Discharged'
+            AND (p_hospital_id IS NULL OR p.hospital_id = p_hospital_id)
+        GROUP BY p.department
+    ) c
+    ORDER BY c.total DESC, c.department;
+$$ LANGUAGE sql STABLE;
+
+-- Monthly admissions (inpatient) and non-cancelled appointments (outpatient)
+-- for the last p_months months, oldest first
+CREATE OR REPLACE FUNCTION analytics_patient_trends(p_hospital_id TEXT DEFAULT NULL, p_months INTEGER DEFAULT 6)
+RETURNS TABLE(month TEXT, inpatient INTEGER, outpatient INTEGER) AS $$
+    WITH buckets AS (
+        SELECT generate_series(
+            date_trunc('month', CURRENT_DATE) - make_interval(months => p_months - 1),
+            date_trunc('month', CURRENT_DATE),
+            INTERVAL '1 month'
+        )::date AS bucket
+    ),
+    bounds AS (
+        SELECT MIN(bucket) AS first_day, (MAX(bucket) + INTERVAL '1 month')::date AS end_day
+        FROM buckets
+    ),
+    admissions AS (
+        SELECT date_trunc('month', p.admission_date)::date AS bucket, COUNT(*) AS total
+        FROM patients p, bounds
+        WHERE p.admission_date >= bounds.first_day
+            AND p.admission_date < bounds.end_day
+            AND (p_hospital_id IS NULL OR p.hospital_id = p_hospital_id)
+        GROUP BY 1
+    ),
+    visits AS (
+        SELECT date_trunc('month', a.date)::date AS bucket, COUNT(*) AS total
+        FROM appointments a, bounds
+        WHERE a.date >= bounds.first_day
+            AND a.date < bounds.end_day
+            AND a.status <> 'Cancelled'
+            AND (p_hospital_id IS NULL OR a.hospital_id = p_hospital_id)
+        GROUP BY 1
+    )
+    SELECT to_char(b.bucket, 'Mon'), COALESCE(ad.total, 0)::INTEGER, COALESCE(v.total, 0)::INTEGER
+    FROM buckets b
+    LEFT JOIN admissions ad ON ad.bucket = b.bucket
+    LEFT JOIN visits v ON v.bucket = b.bucket
+    ORDER BY b.bucket;
+$$ LANGUAGE sql STABLE;
+
+-- Serve the aggregated datasets from the single-round-trip bundle as well
+CREATE OR REPLACE FUNCTION get_analytics_bundle(p_hospital_id TEXT DEFAULT NULL)
+RETURNS JSON AS $$
+    SELECT json_build_object(
+        'weekly_patients', COALESCE((
+            SELECT json_agg(w) FROM analytics_weekly_admissions(p_hospital_id) w
+        ), '[]'::json),
+        'department_distribution', COALESCE((
+            SELECT json_agg(d) FROM analytics_department_distribution(p_hospital_id) d
+        ), '[]'::json),
+        'monthly_revenue', COALESCE((
+            SELECT json_agg(json_build_object('month', month, 'revenue', revenue, 'expenses', expenses) ORDER BY id)
+            FROM monthly_revenue
+            WHERE p_hospital_id IS NULL OR hospital_id = p_hospital_id
+        ), '[]'::json),
+        'patient_trends', COALESCE((
+            SELECT json_agg(t) FROM analytics_patient_trends(p_hospital_id) t
+        ), '[]'::json),
+        'department_performance', COALESCE((
+            SELECT json_agg(json_build_object('department', department, 'satisfaction', satisfaction, 'efficiency', efficiency) ORDER BY id)
+            FROM department_performance
+            WHERE p_hospital_id IS NULL OR hospital_id = p_hospital_id
+        ), '[]'::json)
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Indexes over the time buckets used above
+CREATE INDEX IF NOT EXISTS idx_patients_admission_date ON patients(admission_date);
+CREATE INDEX IF NOT EXISTS idx_patients_hospital_admission ON patients(hospital_id, admission_date);
+CREATE INDEX IF NOT EXISTS idx_patients_active_department ON patients(hospital_id, department) WHERE status <> 'Discharged';
+CREATE INDEX IF NOT EXISTS idx_appointments_hospital_date ON appointments(hospital_id, date);
@@ -0,0 +1,120 @@
+-- Incremental Analytics Rollups for Multi Hospital Management System
+-- Run this after 004_analytics_aggregates.sql in your Supabase SQL Editor (PostgreSQL 15+)
+--
+-- Per-hospital, per-department, per-day deltas are applied to these
+-- counters on every patient and appointment write (by triggers since
+-- 009_analytics_rollup_triggers.sql), so the analytics
+-- functions read O(buckets) rows instead of scanning the base tables.
+-- reconcile_analytics_rollups() rebuilds the counters from scratch.
+
+CREATE TABLE IF NOT EXISTS analytics_rollups (
+    metric TEXT NOT NULL CHECK (metric IN ('admissions', 'active', 'visits')),
+    hospital_id TEXT NOT NULL,
+    department TEXT NOT NULL,
+    day DATE,  -- NULL for point-in-time metrics ('active')
+    value INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT analytics_rollups_bucket UNIQUE NULLS NOT DISTINCT (metric, hospital_id, department, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_analytics_rollups_day ON analytics_rollups(metric, day, hospital_id);
+
+-- Add a batch of deltas: [{"metric", "hospital_id", "department", "day", "delta"}, ...]
+CREATE OR REPLACE FUNCTION apply_analytics_rollups(p_deltas JSON)
+RETURNS VOID AS $$
+    INSERT INTO analytics_rollups AS r (metric, hospital_id, department, day, value)
+    SELECT d.metric, d.hospital_id, d.department, d.day, SUM(d.delta)
+    FROM json_to_recordset(p_deltas) AS d(metric TEXT, hospital_id TEXT, department TEXT, day DATE, delta INTEGER)
+    GROUP BY d.metric, d.hospital_id, d.department, d.day
+    ON CONFLICT ON CONSTRAINT analytics_rollups_bucket
+    DO UPDATE SET value = r.value + EXCLUDED.value;
+$$ LANGUAGE sql;
+
+-- Rebuild every counter from the base tables; returns the number of buckets
+CREATE OR REPLACE FUNCTION reconcile_analytics_rollups()
+RETURNS INTEGER AS $$
+DECLARE
+    bucket_count INTEGER;
+BEGIN
+    LOCK TABLE analytics_rollups IN EXCLUSIVE MODE;
+    DELETE FROM analytics_rollups;
+
+    INSERT INTO analytics_rollups (metric, hospital_id, department, day, value)
+    SELECT 'admissions', hospital_id, department, admission_date, COUNT(*)
+    FROM patients
+    GROUP BY hospital_id, department, admission_date
+    UNION ALL
+    SELECT 'active', hospital_id, department, NULL, COUNT(*)
+    FROM patients
+    WHERE status <> 'Discharged'
+    GROUP BY hospital_id, department
+    UNION ALL
+    SELECT 'visits', hospital_id, department, date, COUNT(*)
+    FROM appointments
+    WHERE status <> 'Cancelled'
+    GROUP BY hospital_id, department, date;
+
+    GET DIAGNOSTICS bucket_count = ROW_COUNT;
+    RETURN bucket_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Serve the aggregates from the counters (same signatures as 004)
+CREATE OR REPLACE FUNCTION analytics_weekly_admissions(p_hospital_id TEXT DEFAULT NULL)
+RETURNS TABLE(day TEXT, patients INTEGER) AS $$
+    SELECT to_char(d.bucket, 'Dy'), COALESCE(SUM(r.value), 0)::INTEGER
+    FROM generate_series(CURRENT_DATE - 6, CURRENT_DATE, INTERVAL '1 day') AS d(bucket)
+    LEFT JOIN analytics_rollups r
+        ON r.metric = 'admissions'
+        AND r.day = d.bucket::date
+        AND (p_hospital_id IS NULL OR r.hospital_id = p_hospital_id)
+    GROUP BY d.bucket
+    ORDER BY EXTRACT(ISODOW FROM d.bucket);
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION analytics_department_distribution(p_hospital_id TEXT DEFAULT NULL)
+RETURNS TABLE(name TEXT, value INTEGER, color TEXT) AS $$
+    SELECT
+        c.department,
+        c.total::INTEGER,
+        (ARRAY['#EF4444', '#3B82F6', '#10B981', '#F59E0B', '#8B5CF6', '#EC4899', '#14B8A6', '#F97316'])
+            [((ROW_NUMBER() OVER (ORDER BY c.total DESC, c.department) - 1) % 8) + 1]
+    FROM (
+        SELECT r.department, SUM(r.value) AS total
+        FROM analytics_rollups r
+        WHERE r.metric = 'active'
+            AND (p_hospital_id IS NULL OR r.hospital_id = p_hospital_id)
+        GROUP BY r.department
+        HAVING SUM(r.value) > 0
+    ) c
+    ORDER BY c.total DESC, c.department;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION analytics_patient_trends(p_hospital_id TEXT DEFAULT NULL, p_months INTEGER DEFAULT 6)
+RETURNS TABLE(month TEXT, inpatient INTEGER, outpatient INTEGER) AS $$
+    WITH buckets AS (
+        SELECT generate_series(
+            date_trunc('month', CURRENT_DATE) - make_interval(months => p_months - 1),
+            date_trunc('month', CURRENT_DATE),
+            INTERVAL '1 month'
+        )::date AS bucket
+    ),
+    monthly AS (
+        SELECT
+            date_trunc('month', r.day)::date AS bucket,
+            SUM(r.value) FILTER (WHERE r.metric = 'admissions') AS admissions,
+            SUM(r.value) FILTER (WHERE r.metric = 'visits') AS visits
+        FROM analytics_rollups r
+        WHERE r.metric IN ('admissions', 'visits')
+            AND r.day >= (SELECT MIN(bucket) FROM buckets)
+            AND r.day < (SELECT MAX(bucket) FROM buckets) + INTERVAL '1 month'
+            AND (p_hospital_id IS NULL OR r.hospital_id = p_hospital_id)
+        GROUP BY 1
+    )
+    SELECT to_char(b.bucket, 'Mon'), COALESCE(m.admissions, 0)::INTEGER, COALESCE(m.visits, 0)::INTEGER
+    FROM buckets b
+    LEFT JOIN monthly m ON m.bucket = b.bucket
+    ORDER BY b.bucket;
+$$ LANGUAGE sql STABLE;
+
+-- Seed the counters from existing data
+SELECT reconcile_analytics_rollups();
@@ -0,0 +1,70 @@
+-- Double-Booking Guard for Multi Hospital Management System
+-- Run this after 005_analytics_rollups.sql in your Supabase SQL Editor
+--
+-- The API rejects overlapping bookings using its in-memory schedule index;
+-- these exclusion constraints are the authoritative guard against races
+-- between workers and writes made outside the API. Resolve existing
+-- overlaps (see the query at the end) before adding the constraints.
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- Minutes blocked by each appointment type (keep in sync with scheduling.py)
+CREATE OR REPLACE FUNCTION appointment_duration(p_type TEXT)
+RETURNS INTERVAL AS $$
+    SELECT make_interval(mins => CASE p_type
+        WHEN 'Consultation' THEN 30
+        WHEN 'Follow-up' THEN 20
+        WHEN 'Check-up' THEN 30
+        WHEN 'Surgery' THEN 120
+        WHEN 'Prenatal' THEN 30
+        WHEN 'Emergency' THEN 60
+        ELSE 30
+    END);
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Time span of each appointment, maintained from date, time and type
+ALTER TABLE appointments ADD COLUMN IF NOT EXISTS slot TSRANGE;
+
+CREATE OR REPLACE FUNCTION set_appointment_slot()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.slot := tsrange(
+        NEW.date + NEW.time::time,
+        NEW.date + NEW.time::time + appointment_duration(NEW.type)
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS appointments_slot ON appointments;
+CREATE TRIGGER appointments_slot
+    BEFORE INSERT OR UPDATE OF date, time, type ON appointments
+    FOR EACH ROW EXECUTE FUNCTION set_appointment_slot();
+
+UPDATE appointments
+SET slot = tsrange(date + time::time, date + time::time + appointment_duration(type))
+WHERE slot IS NULL;
+
+ALTER TABLE appointments ALTER COLUMN slot SET NOT NULL;
+
+-- No doctor or room may hold two active bookings at the same time
+ALTER TABLE appointments DROP CONSTRAINT IF EXISTS appointments_no_doctor_overlap;
+ALTER TABLE appointments ADD CONSTRAINT appointments_no_doctor_overlap
+    EXCLUDE USING gist (hospital_id WITH =, doctor_name WITH =, slot WITH &&)
+    WHERE (status <> 'Cancelled');
+
+ALTER TABLE appointments DROP CONSTRAINT IF EXISTS appointments_no_room_overlap;
+ALTER TABLE appointments ADD CONSTRAINT appointments_no_room_overlap
+    EXCLUDE USING gist (hospital_id WITH =, room WITH =, slot WITH &&)
+    WHERE (status <> 'Cancelled');
+
+-- Existing overlaps, to resolve before adding the constraints above:
+-- SELECT a.id, b.id, a.hospital_id, a.doctor_name, a.room, a.slot, b.slot
+-- FROM appointments a
+-- JOIN appointments b
+--     ON a.id < b.id
+--     AND a.hospital_id = b.hospital_id
+--     AND (a.doctor_name = b.doctor_name OR a.room = b.room)
+--     AND tsrange(a.date + a.time::time, a.date + a.time::time + appointment_duration(a.type))
+--      && tsrange(b.date + b.time::time, b.date + b.time::time + appointment_duration(b.type))
+-- WHERE a.status <> 'Cancelled' AND b.status <> 'Cancelled';
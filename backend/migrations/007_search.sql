@@ -0,0 +1,89 @@
+-- Full-Text and Fuzzy Search for Multi Hospital Management System
+-- Run this after 006_appointment_conflicts.sql in your Supabase SQL Editor
+--
+-- Patients are searchable by name and condition, doctors by name and
+-- specialty. Whole and prefix word matches use a tsvector GIN index;
+-- misspellings and partial words fall back to trigram word similarity.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE patients ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(condition, '')), 'B')
+    ) STORED;
+
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(specialty, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_patients_search ON patients USING gin(search_vector);
+CREATE INDEX IF NOT EXISTS idx_patients_name_trgm ON patients USING gin(name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_patients_condition_trgm ON patients USING gin(condition gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_doctors_search ON doctors USING gin(search_vector);
+CREATE INDEX IF NOT EXISTS idx_doctors_name_trgm ON doctors USING gin(name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_doctors_specialty_trgm ON doctors USING gin(specialty gin_trgm_ops);
+
+-- "jo smi" -> 'jo':* & 'smi':*
+CREATE OR REPLACE FUNCTION search_prefix_query(p_query TEXT)
+RETURNS TSQUERY AS $$
+    SELECT to_tsquery('simple', COALESCE(string_agg(word || ':*', ' & '), ''))
+    FROM (
+        SELECT regexp_replace(term, '[^[:alnum:]]', '', 'g') AS word
+        FROM regexp_split_to_table(lower(p_query), '\s+') AS term
+    ) words
+    WHERE word <> '';
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Ranked matches, best first; resume after (p_after_rank, p_after_key)
+-- where key is type || ':' || id of the last result already returned
+CREATE OR REPLACE FUNCTION search_records(
+    p_query TEXT,
+    p_hospital_id TEXT DEFAULT NULL,
+    p_types TEXT[] DEFAULT ARRAY['patient', 'doctor'],
+    p_limit INTEGER DEFAULT 20,
+    p_after_rank REAL DEFAULT NULL,
+    p_after_key TEXT DEFAULT NULL
+)
+RETURNS TABLE(type TEXT, id TEXT, hospital_id TEXT, title TEXT, subtitle TEXT, rank REAL) AS $$
+    WITH matches AS (
+        SELECT
+            'patient'::TEXT AS type, p.id, p.hospital_id, p.name AS title, p.condition AS subtitle,
+            (
+                ts_rank(p.search_vector, search_prefix_query(p_query))
+                + GREATEST(word_similarity(p_query, p.name), word_similarity(p_query, p.condition))
+            )::REAL AS rank
+        FROM patients p
+        WHERE 'patient' = ANY(p_types)
+            AND (p_hospital_id IS NULL OR p.hospital_id = p_hospital_id)
+            AND (
+                p.search_vector @@ search_prefix_query(p_query)
+                OR p_query <% p.name
+                OR p_query <% p.condition
+            )
+        UNION ALL
+        SELECT
+            'doctor'::TEXT, d.id, d.hospital_id, d.name, d.specialty,
+            (
+                ts_rank(d.search_vector, search_prefix_query(p_query))
+                + GREATEST(word_similarity(p_query, d.name), word_similarity(p_query, d.specialty))
+            )::REAL
+        FROM doctors d
+        WHERE 'doctor' = ANY(p_types)
+            AND (p_hospital_id IS NULL OR d.hospital_id = p_hospital_id)
+            AND (
+                d.search_vector @@ search_prefix_query(p_query)
+                OR p_query <% d.name
+                OR p_query <% d.specialty
+            )
+    )
+    SELECT m.type, m.id, m.hospital_id, m.title, m.subtitle, m.rank
+    FROM matches m
+    WHERE p_after_rank IS NULL
+        OR m.rank < p_after_rank
+        OR (m.rank = p_after_rank AND m.type || ':' || m.id > p_after_key)
+    ORDER BY m.rank DESC, m.type || ':' || m.id
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
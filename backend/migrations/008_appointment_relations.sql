@@ -0,0 +1,31 @@
+-- Embedded Relations for Multi Hospital Management System
+-- Run this after 007_search.sql in your Supabase SQL Editor
+--
+-- appointments references patients and doctors by plain TEXT columns with
+-- no foreign keys (doctor_id is often unset; doctor_name is what the API
+-- writes), so PostgREST cannot detect the relationships on its own. These
+-- computed relationships let GET /api/appointments?expand=patient,doctor
+-- embed both rows in the same request:
+--
+--   select=*,patient(*),doctor(*)
+--
+-- ROWS 1 marks each relationship as to-one, so PostgREST embeds an object
+-- (or null) instead of an array.
+
+CREATE OR REPLACE FUNCTION patient(appointments)
+RETURNS SETOF patients ROWS 1 AS $$
+    SELECT * FROM patients WHERE id = $1.patient_id;
+$$ LANGUAGE sql STABLE;
+
+-- Prefer the doctor_id link; otherwise match by name within the hospital
+CREATE OR REPLACE FUNCTION doctor(appointments)
+RETURNS SETOF doctors ROWS 1 AS $$
+    SELECT * FROM doctors
+    WHERE CASE
+        WHEN $1.doctor_id IS NOT NULL THEN id = $1.doctor_id
+        ELSE hospital_id = $1.hospital_id AND name = $1.doctor_name
+    END
+    LIMIT 1;
+$$ LANGUAGE sql STABLE;
+
+CREATE INDEX IF NOT EXISTS idx_doctors_hospital_name ON doctors(hospital_id, name);
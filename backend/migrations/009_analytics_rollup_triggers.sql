@@ -0,0 +1,104 @@
+-- Trigger-Maintained Analytics Rollups for Multi Hospital Management System
+-- Run this after 008_appointment_relations.sql in your Supabase SQL Editor
+--
+-- Moves counter maintenance from the API into Postgres: statement-level
+-- AFTER triggers on patients and appointments add the deltas of every
+-- write to analytics_rollups in the writing transaction, so the counters
+-- commit or roll back with the rows, cannot drift under concurrent
+-- updates, and also follow writes made outside the API.
+--
+-- reconcile_analytics_rollups() takes an EXCLUSIVE lock on the counters,
+-- which conflicts with the triggers' upserts: writes in flight finish
+-- before the rebuild reads the base tables, and later writes wait for it
+-- and apply their deltas on top, so a rebuild never double counts.
+
+-- Buckets a patients or appointments row (as JSONB) counts towards
+CREATE OR REPLACE FUNCTION analytics_rollup_buckets(p_table TEXT, p_row JSONB)
+RETURNS TABLE(metric TEXT, hospital_id TEXT, department TEXT, day DATE) AS $$
+    SELECT 'admissions', p_row->>'hospital_id', p_row->>'department', (p_row->>'admission_date')::date
+    WHERE p_table = 'patients'
+    UNION ALL
+    SELECT 'active', p_row->>'hospital_id', p_row->>'department', NULL
+    WHERE p_table = 'patients' AND p_row->>'status' <> 'Discharged'
+    UNION ALL
+    SELECT 'visits', p_row->>'hospital_id', p_row->>'department', (p_row->>'date')::date
+    WHERE p_table = 'appointments' AND p_row->>'status' <> 'Cancelled';
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Apply the rows a statement removed (old_rows) and added (new_rows)
+CREATE OR REPLACE FUNCTION sync_analytics_rollups()
+RETURNS TRIGGER AS $$
+DECLARE
+    deltas JSON;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT json_agg(d) INTO deltas FROM (
+            SELECT b.metric, b.hospital_id, b.department, b.day, COUNT(*) AS delta
+            FROM new_rows n, LATERAL analytics_rollup_buckets(TG_TABLE_NAME, to_jsonb(n)) b
+            GROUP BY 1, 2, 3, 4
+        ) d;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT json_agg(d) INTO deltas FROM (
+            SELECT b.metric, b.hospital_id, b.department, b.day, -COUNT(*) AS delta
+            FROM old_rows o, LATERAL analytics_rollup_buckets(TG_TABLE_NAME, to_jsonb(o)) b
+            GROUP BY 1, 2, 3, 4
+        ) d;
+    ELSE
+        SELECT json_agg(d) INTO deltas FROM (
+            SELECT b.metric, b.hospital_id, b.department, b.day, SUM(c.sign) AS delta
+            FROM (
+                SELECT to_jsonb(n) AS row, 1 AS sign FROM new_rows n
+                UNION ALL
+                SELECT to_jsonb(o), -1 FROM old_rows o
+            ) c, LATERAL analytics_rollup_buckets(TG_TABLE_NAME, c.row) b
+            GROUP BY 1, 2, 3, 4
+            HAVING SUM(c.sign) <> 0
+        ) d;
+    END IF;
+
+    IF deltas IS NOT NULL THEN
+        PERFORM apply_analytics_rollups(deltas);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS patients_rollups_insert ON patients;
+CREATE TRIGGER patients_rollups_insert
+    AFTER INSERT ON patients
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_analytics_rollups();
+
+DROP TRIGGER IF EXISTS patients_rollups_update ON patients;
+CREATE TRIGGER patients_rollups_update
+    AFTER UPDATE ON patients
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_analytics_rollups();
+
+DROP TRIGGER IF EXISTS patients_rollups_delete ON patients;
+CREATE TRIGGER patients_rollups_delete
+    AFTER DELETE ON patients
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_analytics_rollups();
+
+DROP TRIGGER IF EXISTS appointments_rollups_insert ON appointments;
+CREATE TRIGGER appointments_rollups_insert
+    AFTER INSERT ON appointments
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_analytics_rollups();
+
+DROP TRIGGER IF EXISTS appointments_rollups_update ON appointments;
+CREATE TRIGGER appointments_rollups_update
+    AFTER UPDATE ON appointments
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_analytics_rollups();
+
+DROP TRIGGER IF EXISTS appointments_rollups_delete ON appointments;
+CREATE TRIGGER appointments_rollups_delete
+    AFTER DELETE ON appointments
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_analytics_rollups();
+
+-- The API no longer applies deltas itself; rebuild once so counters
+-- drifted by the old path start from the base tables
+SELECT reconcile_analytics_rollups();
@@ -0,0 +1,17 @@
+-- Bookable Rooms for Multi Hospital Management System
+-- Run this after 009_analytics_rollup_triggers.sql in your Supabase SQL Editor
+--
+-- Slot search offers the rooms listed on each department, so a room can
+-- be booked before its first appointment exists. Existing departments
+-- start with the rooms their appointments already use.
+
+ALTER TABLE departments ADD COLUMN IF NOT EXISTS rooms TEXT[] NOT NULL DEFAULT '{}';
+
+UPDATE departments d
+SET rooms = ARRAY(
+    SELECT DISTINCT a.room
+    FROM appointments a
+    WHERE a.hospital_id = d.hospital_id AND a.department = d.name
+    ORDER BY a.room
+)
+WHERE d.rooms = '{}';
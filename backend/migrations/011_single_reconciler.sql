@@ -0,0 +1,62 @@
+-- One Analytics Rollup Reconciler for Multi Hospital Management System
+-- Run this after 010_department_rooms.sql in your Supabase SQL Editor
+--
+-- Every API worker runs the periodic reconcile job. The rebuild now takes
+-- a transaction-scoped advisory lock and returns NULL without touching
+-- the counters when another rebuild holds it. Called with p_min_interval
+-- (seconds), it also returns NULL when the last rebuild is more recent
+-- than that, so N workers rebuild about once per interval instead of N
+-- times.
+
+CREATE TABLE IF NOT EXISTS analytics_rollups_reconciled (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    reconciled_at TIMESTAMPTZ NOT NULL
+);
+
+-- The new parameter has a default, so the old zero-argument function
+-- would make calls without arguments ambiguous
+DROP FUNCTION IF EXISTS reconcile_analytics_rollups();
+
+-- Rebuild every counter from the base tables; returns the number of
+-- buckets, or NULL if the rebuild was skipped
+CREATE OR REPLACE FUNCTION reconcile_analytics_rollups(p_min_interval DOUBLE PRECISION DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    bucket_count INTEGER;
+BEGIN
+    IF NOT pg_try_advisory_xact_lock(hashtext('reconcile_analytics_rollups')) THEN
+        RETURN NULL;
+    END IF;
+    IF p_min_interval IS NOT NULL AND EXISTS (
+        SELECT 1 FROM analytics_rollups_reconciled
+        WHERE reconciled_at > now() - make_interval(secs => p_min_interval)
+    ) THEN
+        RETURN NULL;
+    END IF;
+
+    LOCK TABLE analytics_rollups IN EXCLUSIVE MODE;
+    DELETE FROM analytics_rollups;
+
+    INSERT INTO analytics_rollups (metric, hospital_id, department, day, value)
+    SELECT 'admissions', hospital_id, department, admission_date, COUNT(*)
+    FROM patients
+    GROUP BY hospital_id, department, admission_date
+    UNION ALL
+    SELECT 'active', hospital_id, department, NULL, COUNT(*)
+    FROM patients
+    WHERE status <> 'Discharged'
+    GROUP BY hospital_id, department
+    UNION ALL
+    SELECT 'visits', hospital_id, department, date, COUNT(*)
+    FROM appointments
+    WHERE status <> 'Cancelled'
+    GROUP BY hospital_id, department, date;
+
+    GET DIAGNOSTICS bucket_count = ROW_COUNT;
+
+    INSERT INTO analytics_rollups_reconciled (id, reconciled_at) VALUES (TRUE, now())
+    ON CONFLICT (id) DO UPDATE SET reconciled_at = EXCLUDED.reconciled_at;
+
+    RETURN bucket_count;
+END;
+$$ LANGUAGE plpgsql;
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Literal
+from models.patient import Patient
+from models.doctor import Doctor
 
 
 AppointmentStatus = Literal['Scheduled', 'In Progress', 'Completed', 'Cancelled']
@@ -59,3 +61,21 @@ class Appointment(AppointmentBase):
     
     class Config:
         from_attributes = True
+
+
+class AppointmentSlot(BaseModel):
+    """A free (doctor, room, time) slot for booking."""
+    hospital_id: str
+    doctor_id: str
+    doctor_name: str
+    department: str
+    room: str
+    date: str
+    time: str
+    duration: int = Field(..., description="Minutes the appointment type blocks")
+
+
+class AppointmentExpanded(Appointment):
+    """Appointment with related rows embedded through ``expand``."""
+    patient: Optional[Patient] = None
+    doctor: Optional[Doctor] = None
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Generic, List, TypeVar
+
+
+T = TypeVar("T")
+
+
+class BatchResponse(BaseModel, Generic[T]):
+    """Rows found by a multi-get, in request order, and the IDs that were not found."""
+    items: List[T]
+    missing: List[str]
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+
+class BulkItemResult(BaseModel):
+    """Outcome for one item of a bulk request."""
+    index: int = Field(..., description="Position of the item in the request")
+    id: Optional[str] = None
+    status: Literal['ok', 'error']
+    error: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    """Per-item results of a bulk request."""
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+class BulkDeleteRequest(BaseModel):
+    """IDs to delete in one request."""
+    ids: List[str] = Field(..., min_length=1)
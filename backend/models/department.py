@@ -12,6 +12,7 @@ class DepartmentBase(BaseModel):
     beds: int = Field(..., ge=0, description="Total beds")
     patients: int = Field(..., ge=0, description="Current patients")
     equipment: List[str] = Field(default_factory=list)
+    rooms: List[str] = Field(default_factory=list, description="Rooms appointments can be booked into")
     description: Optional[str] = Field(None, max_length=500)
     
     @field_validator('hospital_id')
@@ -45,6 +46,7 @@ class DepartmentUpdate(BaseModel):
     beds: Optional[int] = Field(None, ge=0)
     patients: Optional[int] = Field(None, ge=0)
     equipment: Optional[List[str]] = None
+    rooms: Optional[List[str]] = None
     description: Optional[str] = Field(None, max_length=500)
 
 
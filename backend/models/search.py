@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Literal
+
+
+SearchType = Literal['patient', 'doctor']
+
+
+class SearchResult(BaseModel):
+    """A ranked search match."""
+    type: SearchType
+    id: str
+    hospital_id: str
+    title: str
+    subtitle: str
+    rank: float
@@ -0,0 +1,107 @@
+import base64
+import json
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, Query, Response
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# List bodies stay plain arrays; the cursor for the next page travels in
+# this header, which main.py lists in the CORS expose_headers
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# OpenAPI for the 200 response of a paginated list, passed as ``responses=``
+PAGE_RESPONSES = {
+    200: {
+        "description": "One page of results",
+        "headers": {
+            NEXT_CURSOR_HEADER: {
+                "description": "Cursor for the next page, passed back as `after`; absent on the last page",
+                "schema": {"type": "string"},
+            }
+        },
+    }
+}
+
+# Keyset columns; the trailing "id" makes every key unique
+ID_KEYSET = ["id"]
+APPOINTMENT_KEYSET = ["date", "time", "id"]
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode keyset values into an opaque cursor."""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keyset: List[str]) -> List[Any]:
+    """Decode an opaque cursor into keyset values."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != len(keyset):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return values
+
+
+def _quote(value: Any) -> str:
+    """Quote a value for use inside a PostgREST logical filter."""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def keyset_filter(keyset: List[str], values: List[Any]) -> str:
+    """Build a PostgREST ``or`` filter selecting rows after ``values``.
+
+    For ``(a, b)`` this is ``a > x OR (a = x AND b > y)``.
+    """
+    clauses = []
+    for i, column in enumerate(keyset):
+        terms = [f"{prev}.eq.{_quote(values[j])}" for j, prev in enumerate(keyset[:i])]
+        terms.append(f"{column}.gt.{_quote(values[i])}")
+        clauses.append(terms[0] if len(terms) == 1 else f"and({','.join(terms)})")
+    return ",".join(clauses)
+
+
+class PageParams:
+    """Shared ``limit``/``after`` query parameters for list endpoints.
+
+    Pages are returned as plain arrays; the cursor for the next one is in
+    the X-Next-Cursor header (see ``PAGE_RESPONSES``).
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items to return"),
+        after: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page")
+    ):
+        self.limit = limit
+        self.after = after
+
+    @property
+    def page_size(self) -> Optional[int]:
+        """Effective page size, or ``None`` for an unpaginated listing."""
+        if self.limit is None and self.after is not None:
+            return DEFAULT_PAGE_SIZE
+        return self.limit
+
+    def cursor(self, keyset: List[str]) -> Optional[List[Any]]:
+        """Decode ``after`` for the given keyset."""
+        if self.after is None:
+            return None
+        return decode_cursor(self.after, keyset)
+
+
+def set_next_cursor(response: Response, values: Optional[List[Any]]) -> None:
+    """Set the X-Next-Cursor header to the next-page cursor, if there is one.
+
+    The header is absent on the last page; clients pass its value back as
+    ``after``.
+    """
+    if values is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(values)
@@ -0,0 +1,58 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+
+class StackSampler:
+    """Sample one thread's Python stack on a background thread.
+
+    Stacks are aggregated in the collapsed ``frame;frame;frame count``
+    format understood by flamegraph.pl, speedscope and inferno. Sampling the
+    event-loop thread also captures other requests interleaved with the
+    profiled one, so profiles are most useful for CPU-bound slow requests.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Samples in collapsed-stack format, one stack per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def dump(self, directory: str, label: str) -> str:
+        """Write the samples to ``directory`` and return the file path."""
+        os.makedirs(directory, exist_ok=True)
+        safe_label = re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_") or "request"
+        path = os.path.join(directory, f"{int(time.time() * 1000)}-{safe_label}-{os.getpid()}.folded")
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+        return path
@@ -0,0 +1,154 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter, create_model
+
+from config import get_settings
+from formats import ArrowResponse, MsgPackResponse, ResponseFormat, arrow_schema, negotiate_format
+from metrics import serializing
+from serialization import TrustedJSONResponse, shape
+
+
+@lru_cache(maxsize=None)
+def partial_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Response model containing only ``fields`` of ``model``, with their types and constraints."""
+    return create_model(
+        f"{model.__name__}Fields",
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields}
+    )
+
+
+@lru_cache(maxsize=None)
+def _adapter(model: Type[BaseModel], fields: Optional[Tuple[str, ...]], many: bool) -> TypeAdapter:
+    partial = model if fields is None else partial_model(model, fields)
+    return TypeAdapter(List[partial] if many else partial)
+
+
+class Projection:
+    """Fields selected through the ``fields`` query parameter, and the negotiated response format."""
+
+    def __init__(self, model: Type[BaseModel], fields: Optional[str], format: ResponseFormat = "json"):
+        self.model = model
+        self.format = format
+        self.fields: Optional[Tuple[str, ...]] = None
+
+        if fields:
+            requested = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+            unknown = [name for name in requested if name not in model.model_fields]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+            self.fields = requested or None
+
+    def columns(self, *required: str) -> str:
+        """PostgREST select list, always including ``required`` columns (e.g. the keyset)."""
+        if self.fields is None:
+            return "*"
+        return ",".join(dict.fromkeys(self.fields + required))
+
+    def dump(self, data: Any) -> Any:
+        """``data`` validated and narrowed to the selected fields, as JSON-compatible values."""
+        adapter = _adapter(self.model, self.fields, isinstance(data, list))
+        return adapter.dump_python(adapter.validate_python(data), mode="json")
+
+    def trusted(self, data: Any) -> Any:
+        """``data`` narrowed to the selected fields without validation.
+
+        For rows read back from our own database, which were validated when
+        they were written.
+        """
+        return shape(self.model, data, self.fields)
+
+    def render(self, data: Any, response: Optional[Response] = None) -> Any:
+        """Return ``data`` as a response narrowed to the selected fields.
+
+        With ``trusted_reads`` off and no ``fields``, ``data`` is returned
+        unchanged for FastAPI to validate against the response model.
+        Headers already set on ``response`` are carried over, since FastAPI
+        ignores them when a handler returns its own response. MessagePack
+        and Arrow responses are always built here.
+        """
+        trusted = get_settings().trusted_reads
+        if self.fields is None and not trusted and self.format == "json":
+            return data
+
+        headers = {
+            key: value for key, value in (response.headers.items() if response else [])
+            if key.lower() != "content-length"
+        }
+        headers["vary"] = "Accept"
+        with serializing():
+            if self.format == "msgpack":
+                return MsgPackResponse(content=self.trusted(data) if trusted else self.dump(data), headers=headers)
+            if self.format == "arrow":
+                content = self.trusted(data) if trusted else self.dump(data)
+                return ArrowResponse(content=content, schema=arrow_schema(self.model, self.fields), headers=headers)
+            if trusted:
+                return TrustedJSONResponse(content=self.trusted(data), headers=headers)
+            return JSONResponse(content=self.dump(data), headers=headers)
+
+
+class Expansion:
+    """Related rows selected through the ``expand`` query parameter.
+
+    ``relations`` maps each relation name to the PostgREST embedded-resource
+    clause that fetches it, so the related rows arrive in the same request.
+    """
+
+    def __init__(self, relations: Dict[str, str], expand: Optional[str]):
+        self.relations = relations
+        self.names: Tuple[str, ...] = ()
+
+        if expand:
+            requested = tuple(dict.fromkeys(name.strip() for name in expand.split(",") if name.strip()))
+            unknown = [name for name in requested if name not in relations]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown relations: {', '.join(unknown)}")
+            self.names = requested
+
+    def columns(self, columns: str) -> str:
+        """``columns`` with the embedded-resource clause of each requested relation appended."""
+        return ",".join([columns, *(self.relations[name] for name in self.names)])
+
+    def project(self, fields: Projection, model: Type[BaseModel]) -> Projection:
+        """``fields`` widened to the requested relations of ``model``, the expanded response model."""
+        if not self.names:
+            return fields
+        if fields.fields is None:
+            return Projection(model, None, fields.format)
+        return Projection(model, ",".join(fields.fields + self.names), fields.format)
+
+
+def projection(model: Type[BaseModel]) -> Callable[..., Projection]:
+    """Dependency parsing ``fields`` against ``model``'s field names.
+
+    The response format is negotiated from the Accept header: JSON unless
+    the client asks for MessagePack or Arrow.
+    """
+    def dependency(
+        request: Request,
+        response: Response,
+        fields: Optional[str] = Query(
+            None,
+            description=f"Comma-separated {model.__name__} fields to return (default: all)"
+        )
+    ) -> Projection:
+        response.headers["Vary"] = "Accept"
+        format = negotiate_format(request.headers.get("accept"), ("json", "msgpack", "arrow"))
+        return Projection(model, fields, format)
+
+    return dependency
+
+
+def expansion(relations: Dict[str, str]) -> Callable[..., Expansion]:
+    """Dependency parsing ``expand`` against the names in ``relations``."""
+    def dependency(
+        expand: Optional[str] = Query(
+            None,
+            description=f"Comma-separated related rows to embed: {', '.join(relations)}"
+        )
+    ) -> Expansion:
+        return Expansion(relations, expand)
+
+    return dependency
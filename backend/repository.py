@@ -0,0 +1,234 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import HTTPException
+
+from config import get_settings
+from database import get_supabase, get_async_supabase
+from pagination import keyset_filter
+from filters import apply_filters
+from metrics import record_db_time
+from singleflight import coalesce, freeze, invalidate_reads
+import changefeed
+
+# (column, descending) pairs applied in order
+Ordering = List[Tuple[str, bool]]
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get or create the bounded executor used for the sync client."""
+    global _executor
+
+    if _executor is None:
+        settings = get_settings()
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.db_max_workers,
+            thread_name_prefix="supabase"
+        )
+
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Shut down the executor, waiting for in-flight queries."""
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+async def execute(build: Callable[[Any], Any]) -> Any:
+    """Run a PostgREST query without blocking the event loop.
+
+    ``build`` receives a Supabase client and returns the query builder to
+    execute. With ``db_client_mode="async"`` the native async client is
+    used; otherwise the sync client runs on a bounded thread pool.
+    """
+    settings = get_settings()
+    start = time.perf_counter()
+
+    try:
+        if settings.db_client_mode == "async":
+            client = await get_async_supabase()
+            return await build(client).execute()
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_executor(),
+            lambda: build(get_supabase()).execute()
+        )
+    finally:
+        record_db_time(time.perf_counter() - start)
+
+
+def query_failed(error: Exception, what: str) -> HTTPException:
+    """The HTTP error for a query that raised ``error``: 504 on a timeout, else 503.
+
+    Timeouts include a single-flight wait that gave up, so an outage is
+    never reported as an empty or missing result.
+    """
+    if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException)):
+        return HTTPException(status_code=504, detail=f"{what} timed out")
+    return HTTPException(status_code=503, detail=f"{what} unavailable")
+
+
+async def rpc(function: str, params: Optional[Dict[str, Any]] = None, read_only: bool = False) -> Any:
+    """Call a Postgres function through PostgREST.
+
+    Identical concurrent calls of a ``read_only`` function share one
+    request; any other call counts as a write.
+    """
+    def call():
+        return execute(lambda client: client.rpc(function, params or {}))
+
+    if read_only:
+        response = await coalesce(function, ("rpc", function, freeze(params)), call)
+        return response.data
+
+    response = await call()
+    invalidate_reads()
+    return response.data
+
+
+class Repository:
+    """Async data access for a single Supabase table.
+
+    Identical concurrent reads share one request (see :mod:`singleflight`).
+    Writes are published to the change feed, scoped by ``scope_column``.
+    """
+
+    def __init__(self, table: str, scope_column: str = "hospital_id"):
+        self.table = table
+        self.scope_column = scope_column
+
+    async def _publish(self, op: str, rows: List[Dict[str, Any]], fields: Optional[List[str]] = None) -> None:
+        invalidate_reads()
+        await changefeed.publish(changefeed.row_events(self.table, op, rows, self.scope_column, fields))
+
+    async def find(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        columns: str = "*",
+        order: Optional[Ordering] = None,
+        limit: Optional[int] = None,
+        after: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Select rows matching ``filters`` (see :func:`filters.apply_filters`).
+
+        ``after`` maps keyset columns, in sort order, to the values of the
+        last row already seen; only rows sorting after it are returned.
+        """
+        def build(client):
+            query = apply_filters(client.table(self.table).select(columns), filters)
+            if after:
+                query = query.or_(keyset_filter(list(after), list(after.values())))
+            for column, desc in order or []:
+                query = query.order(column, desc=desc)
+            if limit is not None:
+                query = query.limit(limit)
+            return query
+
+        key = (
+            "find", self.table, columns, freeze(filters), tuple(order or ()), limit,
+            tuple(after.items()) if after else None
+        )
+        response = await coalesce(self.table, key, lambda: execute(build))
+        return response.data
+
+    async def find_page(
+        self,
+        keyset: List[str],
+        limit: Optional[int],
+        after: Optional[List[Any]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        columns: str = "*"
+    ) -> Tuple[List[Dict[str, Any]], Optional[List[Any]]]:
+        """Select one keyset page in ascending ``keyset`` order.
+
+        Returns the rows and the keyset values to resume after, or ``None``
+        when this is the last page. With ``limit=None`` every row is returned.
+        """
+        rows = await self.find(
+            filters=filters,
+            columns=columns,
+            order=[(column, False) for column in keyset],
+            limit=limit + 1 if limit is not None else None,
+            after=dict(zip(keyset, after)) if after else None
+        )
+
+        if limit is None or len(rows) <= limit:
+            return rows, None
+
+        rows = rows[:limit]
+        return rows, [rows[-1][column] for column in keyset]
+
+    async def get(self, record_id: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+        """Get a single row by ID, or ``None`` if it does not exist."""
+        response = await coalesce(
+            self.table,
+            ("get", self.table, record_id, columns),
+            lambda: execute(lambda client: client.table(self.table).select(columns).eq("id", record_id))
+        )
+        return response.data[0] if response.data else None
+
+    async def get_many(self, record_ids: List[str], columns: str = "*") -> List[Dict[str, Any]]:
+        """Get the rows with the listed IDs; missing IDs are left out."""
+        response = await coalesce(
+            self.table,
+            ("get_many", self.table, tuple(record_ids), columns),
+            lambda: execute(lambda client: client.table(self.table).select(columns).in_("id", record_ids))
+        )
+        return response.data
+
+    async def insert(
+        self,
+        data: Dict[str, Any] | List[Dict[str, Any]],
+        upsert: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Insert (or upsert on ``id``) one or many rows and return them."""
+        if upsert:
+            response = await execute(
+                lambda client: client.table(self.table).upsert(data, on_conflict="id")
+            )
+        else:
+            response = await execute(lambda client: client.table(self.table).insert(data))
+        await self._publish("upsert" if upsert else "insert", response.data)
+        return response.data
+
+    async def update(self, record_id: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Update a row by ID and return the updated rows."""
+        response = await execute(
+            lambda client: client.table(self.table).update(data).eq("id", record_id)
+        )
+        await self._publish("update", response.data, list(data))
+        return response.data
+
+    async def update_many(self, record_ids: List[str], data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Apply the same update to every listed ID and return the updated rows."""
+        response = await execute(
+            lambda client: client.table(self.table).update(data).in_("id", record_ids)
+        )
+        await self._publish("update", response.data, list(data))
+        return response.data
+
+    async def delete(self, record_id: str) -> List[Dict[str, Any]]:
+        """Delete a row by ID and return the deleted rows."""
+        response = await execute(
+            lambda client: client.table(self.table).delete().eq("id", record_id)
+        )
+        await self._publish("delete", response.data)
+        return response.data
+
+    async def delete_many(self, record_ids: List[str]) -> List[Dict[str, Any]]:
+        """Delete every listed ID and return the deleted rows."""
+        response = await execute(
+            lambda client: client.table(self.table).delete().in_("id", record_ids)
+        )
+        await self._publish("delete", response.data)
+        return response.data
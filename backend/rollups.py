@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from cache import get_cache
+from config import get_settings
+from repository import rpc
+
+logger = logging.getLogger(__name__)
+
+# Cached views derived from the rollup counters
+ANALYTICS_VIEWS = (
+    "analytics.weekly_patients",
+    "analytics.department_distribution",
+    "analytics.patient_trends",
+    "analytics.bundle",
+)
+
+_reconciler: Optional[asyncio.Task] = None
+
+
+class Rollup:
+    """Analytics counters contributed by the rows of one table.
+
+    The counters are kept by triggers in Postgres (migration 009), in the
+    same transaction as the write; the API only drops the cached views a
+    write may have moved.
+    """
+
+    def __init__(self, columns: Tuple[str, ...]):
+        self.columns = columns
+
+    def touches(self, columns: Iterable[str]) -> bool:
+        """Whether writing ``columns`` can move any counter."""
+        return any(column in self.columns for column in columns)
+
+    async def changed(self, rows: List[Dict[str, Any]], columns: Optional[Iterable[str]] = None) -> None:
+        """Drop the cached analytics views a write of ``rows`` may have moved.
+
+        ``columns`` are the columns rewritten on existing rows, or None for
+        inserts and deletes. Rewriting ``hospital_id`` may move rows out of
+        another hospital, so the views are dropped for every hospital.
+        """
+        if not rows:
+            return
+        cache = get_cache()
+        if columns is not None:
+            columns = list(columns)
+            if not self.touches(columns):
+                return
+            if "hospital_id" in columns:
+                await cache.invalidate(*ANALYTICS_VIEWS)
+                return
+        for hospital_id in {row.get("hospital_id") for row in rows}:
+            await cache.invalidate(*ANALYTICS_VIEWS, hospital_id=hospital_id)
+
+
+PATIENT_ROLLUP = Rollup(("hospital_id", "department", "admission_date", "status"))
+APPOINTMENT_ROLLUP = Rollup(("hospital_id", "department", "date", "status"))
+
+
+async def reconcile(min_interval: Optional[float] = None) -> Optional[int]:
+    """Rebuild every counter from the base tables; returns the bucket count.
+
+    Returns None without rebuilding while another rebuild is running, or
+    when the last one finished less than ``min_interval`` seconds ago
+    (migration 011), so only one of several workers does the work.
+    """
+    buckets = await rpc("reconcile_analytics_rollups", {"p_min_interval": min_interval})
+    if buckets is not None:
+        await get_cache().invalidate(*ANALYTICS_VIEWS)
+    return buckets
+
+
+async def _reconcile_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reconcile(min_interval=interval)
+        except Exception as e:
+            logger.warning("Analytics rollup reconcile failed: %r", e)
+
+
+def start_reconciler() -> None:
+    """Start the periodic reconcile job unless ROLLUP_RECONCILE_INTERVAL is 0."""
+    global _reconciler
+
+    interval = get_settings().rollup_reconcile_interval
+    if interval > 0 and _reconciler is None:
+        _reconciler = asyncio.create_task(_reconcile_periodically(interval))
+
+
+async def stop_reconciler() -> None:
+    """Cancel the periodic reconcile job."""
+    global _reconciler
+
+    if _reconciler is not None:
+        _reconciler.cancel()
+        try:
+            await _reconciler
+        except asyncio.CancelledError:
+            pass
+        _reconciler = None
@@ -1,58 +1,40 @@
-from fastapi import APIRouter, Query
-from typing import List, Optional
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Awaitable, Callable, List, Optional
 from models.analytics import (
     WeeklyData, DepartmentDistribution, MonthlyRevenue,
     PatientTrend, DepartmentPerformance, AnalyticsResponse
 )
-from database import get_supabase
-
-router = APIRouter()
-
-# Mock data fallbacks (used when database is empty or hospital not specified)
-WEEKLY_PATIENTS_MOCK = [
-    {"day": "Mon", "patients": 45},
-    {"day": "Tue", "patients": 52},
-    {"day": "Wed", "patients": 48},
-    {"day": "Thu", "patients": 61},
-    {"day": "Fri", "patients": 55},
-    {"day": "Sat", "patients": 38},
-    {"day": "Sun", "patients": 32},
-]
-
-DEPARTMENT_DISTRIBUTION_MOCK = [
-    {"name": "Emergency", "value": 145, "color": "#EF4444"},
-    {"name": "Surgery", "value": 98, "color": "#3B82F6"},
-    {"name": "Pediatrics", "value": 76, "color": "#10B981"},
-    {"name": "Cardiology", "value": 89, "color": "#F59E0B"},
-    {"name": "Neurology", "value": 54, "color": "#8B5CF6"},
-]
-
-MONTHLY_REVENUE_MOCK = [
-    {"month": "Jan", "revenue": 245000, "expenses": 180000},
-    {"month": "Feb", "revenue": 268000, "expenses": 195000},
-    {"month": "Mar", "revenue": 282000, "expenses": 205000},
-    {"month": "Apr", "revenue": 298000, "expenses": 210000},
-    {"month": "May", "revenue": 315000, "expenses": 225000},
-    {"month": "Jun", "revenue": 332000, "expenses": 230000},
-]
-
-PATIENT_TRENDS_MOCK = [
-    {"month": "Jan", "inpatient": 420, "outpatient": 1250},
-    {"month": "Feb", "inpatient": 445, "outpatient": 1310},
-    {"month": "Mar", "inpatient": 468, "outpatient": 1380},
-    {"month": "Apr", "inpatient": 492, "outpatient": 1420},
-    {"month": "May", "inpatient": 515, "outpatient": 1485},
-    {"month": "Jun", "inpatient": 538, "outpatient": 1540},
-]
-
-DEPARTMENT_PERFORMANCE_MOCK = [
-    {"department": "Cardiology", "satisfaction": 92, "efficiency": 88},
-    {"department": "Neurology", "satisfaction": 89, "efficiency": 85},
-    {"department": "Pediatrics", "satisfaction": 95, "efficiency": 91},
-    {"department": "Orthopedics", "satisfaction": 87, "efficiency": 83},
-    {"department": "Emergency", "satisfaction": 84, "efficiency": 90},
-    {"department": "Surgery", "satisfaction": 90, "efficiency": 87},
-]
+from metrics import InstrumentedRoute
+from repository import Repository, rpc
+from config import get_settings
+from cache import get_cache
+import rollups
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+weekly_patients_table = Repository("weekly_patients")
+department_distribution_table = Repository("department_distribution")
+monthly_revenue_table = Repository("monthly_revenue")
+patient_trends_table = Repository("patient_trends")
+department_performance_table = Repository("department_performance")
+
+async def _aggregate(function: str, table: Repository, hospital_id: Optional[str]) -> List[dict]:
+    """Aggregate a dataset from the rollup counters in Postgres.
+
+    Reads the precomputed table instead when ANALYTICS_SOURCE is "tables".
+    """
+    if get_settings().analytics_source == "aggregate":
+        return await rpc(function, {"p_hospital_id": hospital_id}, read_only=True)
+    return await table.find(filters={"hospital_id": hospital_id})
+
+
+async def _load(endpoint: str, hospital_id: Optional[str], loader: Callable[[], Awaitable[List[dict]]]) -> List[dict]:
+    """Cached dataset; a failed query is a 503 rather than made-up data."""
+    try:
+        return await get_cache().fetch(endpoint, hospital_id, loader)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Analytics unavailable: {e}")
 
 
 @router.get("/weekly-patients", response_model=List[WeeklyData])
@@ -60,17 +42,11 @@ async def get_weekly_patients(
     hospital_id: Optional[str] = Query(None, description="Filter by hospital ID")
 ):
     """Get weekly patient admission data."""
-    try:
-        supabase = get_supabase()
-        query = supabase.table("weekly_patients").select("*")
-        if hospital_id:
-            query = query.eq("hospital_id", hospital_id)
-        response = query.execute()
-        if response.data:
-            return response.data
-    except Exception:
-        pass
-    return WEEKLY_PATIENTS_MOCK
+    return await _load(
+        "analytics.weekly_patients",
+        hospital_id,
+        lambda: _aggregate("analytics_weekly_admissions", weekly_patients_table, hospital_id)
+    )
 
 
 @router.get("/department-distribution", response_model=List[DepartmentDistribution])
@@ -78,17 +54,11 @@ async def get_department_distribution(
     hospital_id: Optional[str] = Query(None, description="Filter by hospital ID")
 ):
     """Get patient distribution by department."""
-    try:
-        supabase = get_supabase()
-        query = supabase.table("department_distribution").select("*")
-        if hospital_id:
-            query = query.eq("hospital_id", hospital_id)
-        response = query.execute()
-        if response.data:
-            return response.data
-    except Exception:
-        pass
-    return DEPARTMENT_DISTRIBUTION_MOCK
+    return await _load(
+        "analytics.department_distribution",
+        hospital_id,
+        lambda: _aggregate("analytics_department_distribution", department_distribution_table, hospital_id)
+    )
 
 
 @router.get("/monthly-revenue", response_model=List[MonthlyRevenue])
@@ -96,17 +66,11 @@ async def get_monthly_revenue(
     hospital_id: Optional[str] = Query(None, description="Filter by hospital ID")
 ):
     """Get monthly revenue and expenses data."""
-    try:
-        supabase = get_supabase()
-        query = supabase.table("monthly_revenue").select("*")
-        if hospital_id:
-            query = query.eq("hospital_id", hospital_id)
-        response = query.execute()
-        if response.data:
-            return response.data
-    except Exception:
-        pass
-    return MONTHLY_REVENUE_MOCK
+    return await _load(
+        "analytics.monthly_revenue",
+        hospital_id,
+        lambda: monthly_revenue_table.find(filters={"hospital_id": hospital_id})
+    )
 
 
 @router.get("/patient-trends", response_model=List[PatientTrend])
@@ -114,17 +78,11 @@ async def get_patient_trends(
     hospital_id: Optional[str] = Query(None, description="Filter by hospital ID")
 ):
     """Get inpatient vs outpatient trends."""
-    try:
-        supabase = get_supabase()
-        query = supabase.table("patient_trends").select("*")
-        if hospital_id:
-            query = query.eq("hospital_id", hospital_id)
-        response = query.execute()
-        if response.data:
-            return response.data
-    except Exception:
-        pass
-    return PATIENT_TRENDS_MOCK
+    return await _load(
+        "analytics.patient_trends",
+        hospital_id,
+        lambda: _aggregate("analytics_patient_trends", patient_trends_table, hospital_id)
+    )
 
 
 @router.get("/department-performance", response_model=List[DepartmentPerformance])
@@ -132,29 +90,72 @@ async def get_department_performance(
     hospital_id: Optional[str] = Query(None, description="Filter by hospital ID")
 ):
     """Get department satisfaction and efficiency scores."""
+    return await _load(
+        "analytics.department_performance",
+        hospital_id,
+        lambda: department_performance_table.find(filters={"hospital_id": hospital_id})
+    )
+
+
+async def _fetch_with_timeout(
+    fetch: Callable[[Optional[str]], Awaitable[List[Any]]],
+    hospital_id: Optional[str]
+) -> List[Any]:
+    """Run one dataset query; a query slower than the timeout is a 504."""
     try:
-        supabase = get_supabase()
-        query = supabase.table("department_performance").select("*")
-        if hospital_id:
-            query = query.eq("hospital_id", hospital_id)
-        response = query.execute()
-        if response.data:
-            return response.data
+        return await asyncio.wait_for(
+            fetch(hospital_id),
+            timeout=get_settings().analytics_query_timeout
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Analytics query timed out")
+
+
+async def _fetch_bundle(hospital_id: Optional[str]) -> Optional[dict]:
+    """Fetch every dataset in one call to the get_analytics_bundle RPC."""
+    try:
+        bundle = await get_cache().fetch(
+            "analytics.bundle",
+            hospital_id,
+            lambda: asyncio.wait_for(
+                rpc("get_analytics_bundle", {"p_hospital_id": hospital_id}, read_only=True),
+                timeout=get_settings().analytics_query_timeout
+            )
+        )
     except Exception:
-        pass
-    return DEPARTMENT_PERFORMANCE_MOCK
+        return None
+    if not isinstance(bundle, dict):
+        return None
+    return {
+        "weekly_patients": bundle.get("weekly_patients") or [],
+        "department_distribution": bundle.get("department_distribution") or [],
+        "monthly_revenue": bundle.get("monthly_revenue") or [],
+        "patient_trends": bundle.get("patient_trends") or [],
+        "department_performance": bundle.get("department_performance") or [],
+    }
 
 
 @router.get("/", response_model=AnalyticsResponse)
 async def get_all_analytics(
     hospital_id: Optional[str] = Query(None, description="Filter by hospital ID")
 ):
-    """Get all analytics data in one request."""
-    weekly = await get_weekly_patients(hospital_id)
-    distribution = await get_department_distribution(hospital_id)
-    revenue = await get_monthly_revenue(hospital_id)
-    trends = await get_patient_trends(hospital_id)
-    performance = await get_department_performance(hospital_id)
+    """Get all analytics data in one request.
+
+    Uses the single-query RPC when enabled, otherwise fetches the five
+    datasets concurrently with a per-query timeout.
+    """
+    if get_settings().analytics_single_query:
+        bundle = await _fetch_bundle(hospital_id)
+        if bundle is not None:
+            return AnalyticsResponse(**bundle)
+    
+    weekly, distribution, revenue, trends, performance = await asyncio.gather(
+        _fetch_with_timeout(get_weekly_patients, hospital_id),
+        _fetch_with_timeout(get_department_distribution, hospital_id),
+        _fetch_with_timeout(get_monthly_revenue, hospital_id),
+        _fetch_with_timeout(get_patient_trends, hospital_id),
+        _fetch_with_timeout(get_department_performance, hospital_id)
+    )
     
     return AnalyticsResponse(
         weekly_patients=weekly,
@@ -163,3 +164,15 @@ async def get_all_analytics(
         patient_trends=trends,
         department_performance=performance
     )
+
+
+@router.post("/rollups/reconcile")
+async def reconcile_rollups():
+    """Rebuild the analytics rollup counters from the patients and appointments tables."""
+    try:
+        buckets = await rollups.reconcile()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Reconcile failed: {e}")
+    if buckets is None:
+        raise HTTPException(status_code=409, detail="A reconcile is already running")
+    return {"buckets": buckets}
@@ -1,95 +1,226 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from models.appointment import Appointment, AppointmentCreate, AppointmentUpdate
-from database import get_supabase
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from datetime import date as Date
+from typing import Any, Dict, List, Optional
+from models.appointment import Appointment, AppointmentCreate, AppointmentExpanded, AppointmentSlot, AppointmentType, AppointmentUpdate
+from models.bulk import BulkDeleteRequest, BulkResponse
+from models.batch import BatchResponse
+from metrics import InstrumentedRoute
+from repository import Repository, query_failed
+from rollups import APPOINTMENT_ROLLUP
+from scheduling import find_conflicts, find_slots, is_conflict_error
+from config import get_settings
+from bulk import bulk_create, bulk_update, bulk_delete
+from export import ExportFormat, export_format, export_response
+from projection import Expansion, Projection, expansion, projection
+from loader import batch_lookup
+from filters import between, one_of
+from pagination import APPOINTMENT_KEYSET, PAGE_RESPONSES, PageParams, set_next_cursor
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
+appointments_table = Repository("appointments")
 
-@router.get("/", response_model=List[Appointment])
+# Related rows ``expand`` can embed, as computed relationships (migration 008)
+APPOINTMENT_RELATIONS = {"patient": "patient(*)", "doctor": "doctor(*)"}
+
+
+@router.get(
+    "/",
+    response_model=List[AppointmentExpanded],
+    response_model_exclude_unset=True,
+    responses=PAGE_RESPONSES
+)
 async def get_appointments(
+    response: Response,
     hospital_id: Optional[str] = Query(None, description="Filter by hospital ID"),
-    status: Optional[str] = Query(None, description="Filter by status"),
-    date: Optional[str] = Query(None, description="Filter by date"),
-    department: Optional[str] = Query(None, description="Filter by department"),
-    patient_id: Optional[str] = Query(None, description="Filter by patient ID")
+    status: Optional[str] = Query(None, description="Filter by status; comma-separate several values"),
+    date: Optional[str] = Query(None, description="Filter by exact date (overrides date_from/date_to)"),
+    department: Optional[str] = Query(None, description="Filter by department; comma-separate several values"),
+    patient_id: Optional[str] = Query(None, description="Filter by patient ID"),
+    date_from: Optional[Date] = Query(None, description="On or after this date"),
+    date_to: Optional[Date] = Query(None, description="On or before this date"),
+    page: PageParams = Depends(),
+    fields: Projection = Depends(projection(Appointment)),
+    expand: Expansion = Depends(expansion(APPOINTMENT_RELATIONS))
 ):
-    """Get all appointments with optional filters."""
+    """Get all appointments with optional filters, paginated by keyset cursor.
+
+    ``expand=patient,doctor`` embeds the related rows in the same query.
+    """
+    after = page.cursor(APPOINTMENT_KEYSET)
     try:
-        supabase = get_supabase()
-        query = supabase.table("appointments").select("*")
-        
-        if hospital_id:
-            query = query.eq("hospital_id", hospital_id)
-        if status:
-            query = query.eq("status", status)
-        if date:
-            query = query.eq("date", date)
-        if department:
-            query = query.eq("department", department)
-        if patient_id:
-            query = query.eq("patient_id", patient_id)
-        
-        response = query.order("date", desc=False).order("time", desc=False).execute()
-        return response.data
-    except Exception:
-        return []
+        rows, next_cursor = await appointments_table.find_page(
+            APPOINTMENT_KEYSET,
+            page.page_size,
+            after,
+            columns=expand.columns(fields.columns(*APPOINTMENT_KEYSET)),
+            filters={
+                "hospital_id": hospital_id,
+                "status": one_of(status),
+                "date": date or between(date_from, date_to),
+                "department": one_of(department),
+                "patient_id": patient_id
+            }
+        )
+        set_next_cursor(response, next_cursor)
+        return expand.project(fields, AppointmentExpanded).render(rows, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise query_failed(e, "Appointments")
+
+
+@router.get("/slots", response_model=List[AppointmentSlot])
+async def search_slots(
+    department: str = Query(..., description="Department to book in"),
+    date_from: Date = Query(..., description="First day to search (YYYY-MM-DD)"),
+    date_to: Optional[Date] = Query(None, description="Last day to search (default: date_from)"),
+    type: AppointmentType = Query(..., description="Appointment type, which sets the slot length"),
+    hospital_id: Optional[str] = Query(None, description="Filter by hospital ID"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum slots to return")
+):
+    """Find free (doctor, room, time) slots from the schedule index."""
+    date_to = date_to or date_from
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to is before date_from")
+    if (date_to - date_from).days >= get_settings().schedule_max_days:
+        raise HTTPException(status_code=400, detail=f"Date range exceeds {get_settings().schedule_max_days} days")
+
+    try:
+        return await find_slots(department, date_from, date_to, type, hospital_id, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise query_failed(e, "Schedule")
+
+
+@router.get("/export")
+async def export_appointments(
+    hospital_id: Optional[str] = Query(None, description="Filter by hospital ID"),
+    status: Optional[str] = Query(None, description="Filter by status; comma-separate several values"),
+    date: Optional[str] = Query(None, description="Filter by exact date (overrides date_from/date_to)"),
+    department: Optional[str] = Query(None, description="Filter by department; comma-separate several values"),
+    patient_id: Optional[str] = Query(None, description="Filter by patient ID"),
+    date_from: Optional[Date] = Query(None, description="On or after this date"),
+    date_to: Optional[Date] = Query(None, description="On or before this date"),
+    format: ExportFormat = Depends(export_format)
+):
+    """Stream all matching appointments as NDJSON, CSV, MessagePack or Arrow."""
+    return export_response(
+        appointments_table,
+        APPOINTMENT_KEYSET,
+        Appointment,
+        format,
+        filters={
+            "hospital_id": hospital_id,
+            "status": one_of(status),
+            "date": date or between(date_from, date_to),
+            "department": one_of(department),
+            "patient_id": patient_id
+        }
+    )
+
+
+@router.post("/bulk", response_model=BulkResponse)
+async def create_appointments_bulk(
+    items: List[Dict[str, Any]] = Body(..., description="Appointments to create"),
+    upsert: bool = Query(False, description="Replace existing appointments whose ID is given")
+):
+    """Create many appointments with chunked multi-row inserts."""
+    return await bulk_create(appointments_table, AppointmentCreate, items, upsert, rollup=APPOINTMENT_ROLLUP, check=find_conflicts)
+
+
+@router.put("/bulk", response_model=BulkResponse)
+async def update_appointments_bulk(
+    items: List[Dict[str, Any]] = Body(..., description="Partial updates, each with its appointment ID")
+):
+    """Update many appointments in as few queries as possible."""
+    return await bulk_update(appointments_table, AppointmentUpdate, items, rollup=APPOINTMENT_ROLLUP, check=find_conflicts)
+
+
+@router.post("/bulk/delete", response_model=BulkResponse)
+async def delete_appointments_bulk(request: BulkDeleteRequest):
+    """Delete many appointments by ID."""
+    return await bulk_delete(appointments_table, request.ids, rollup=APPOINTMENT_ROLLUP)
 
 
-@router.get("/{appointment_id}", response_model=Appointment)
-async def get_appointment(appointment_id: str):
-    """Get a specific appointment by ID."""
+@router.get("/batch", response_model=BatchResponse[Appointment])
+async def get_appointments_batch(
+    ids: str = Query(..., description="Comma-separated appointment IDs"),
+    fields: Projection = Depends(projection(Appointment))
+):
+    """Get many appointments by ID in one query; unknown IDs are listed in ``missing``."""
+    return await batch_lookup(appointments_table, ids, fields)
+
+
+@router.get("/{appointment_id}", response_model=AppointmentExpanded, response_model_exclude_unset=True)
+async def get_appointment(
+    appointment_id: str,
+    fields: Projection = Depends(projection(Appointment)),
+    expand: Expansion = Depends(expansion(APPOINTMENT_RELATIONS))
+):
+    """Get a specific appointment by ID, optionally with its patient and doctor embedded."""
     try:
-        supabase = get_supabase()
-        response = supabase.table("appointments").select("*").eq("id", appointment_id).execute()
+        appointment = await appointments_table.get(appointment_id, expand.columns(fields.columns()))
         
-        if not response.data:
+        if not appointment:
             raise HTTPException(status_code=404, detail="Appointment not found")
         
-        return response.data[0]
+        return expand.project(fields, AppointmentExpanded).render(appointment)
     except HTTPException:
         raise
-    except Exception:
-        raise HTTPException(status_code=404, detail="Appointment not found")
+    except Exception as e:
+        raise query_failed(e, "Appointments")
 
 
 @router.post("/", response_model=Appointment)
 async def create_appointment(appointment: AppointmentCreate):
-    """Create a new appointment."""
+    """Create a new appointment, rejecting double bookings with 409."""
     try:
-        supabase = get_supabase()
-        response = supabase.table("appointments").insert(appointment.model_dump()).execute()
+        conflicts = await find_conflicts([(None, appointment.model_dump())])
+        if conflicts:
+            raise HTTPException(status_code=409, detail=conflicts[0])
         
-        if not response.data:
+        data = await appointments_table.insert(appointment.model_dump())
+        
+        if not data:
             raise HTTPException(status_code=400, detail="Failed to create appointment")
         
-        return response.data[0]
+        await APPOINTMENT_ROLLUP.changed(data)
+        return data[0]
     except HTTPException:
         raise
     except Exception as e:
+        if is_conflict_error(e):
+            raise HTTPException(status_code=409, detail="Double booking: doctor or room is already booked at that time")
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.put("/{appointment_id}", response_model=Appointment)
 async def update_appointment(appointment_id: str, appointment: AppointmentUpdate):
-    """Update an appointment."""
+    """Update an appointment, rejecting double bookings with 409."""
     try:
-        supabase = get_supabase()
-        
         update_data = {k: v for k, v in appointment.model_dump().items() if v is not None}
         
         if not update_data:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        response = supabase.table("appointments").update(update_data).eq("id", appointment_id).execute()
+        conflicts = await find_conflicts([(appointment_id, update_data)])
+        if conflicts:
+            raise HTTPException(status_code=409, detail=conflicts[0])
         
-        if not response.data:
+        data = await appointments_table.update(appointment_id, update_data)
+        
+        if not data:
             raise HTTPException(status_code=404, detail="Appointment not found")
         
-        return response.data[0]
+        await APPOINTMENT_ROLLUP.changed(data, update_data)
+        return data[0]
     except HTTPException:
         raise
     except Exception as e:
+        if is_conflict_error(e):
+            raise HTTPException(status_code=409, detail="Double booking: doctor or room is already booked at that time")
         raise HTTPException(status_code=400, detail=str(e))
 
 
@@ -97,14 +228,14 @@ async def update_appointment(appointment_id: str, appointment: AppointmentUpdate
 async def delete_appointment(appointment_id: str):
     """Delete an appointment."""
     try:
-        supabase = get_supabase()
-        response = supabase.table("appointments").delete().eq("id", appointment_id).execute()
+        data = await appointments_table.delete(appointment_id)
         
-        if not response.data:
+        if not data:
             raise HTTPException(status_code=404, detail="Appointment not found")
         
+        await APPOINTMENT_ROLLUP.changed(data)
         return {"message": "Appointment deleted successfully"}
     except HTTPException:
         raise
-    except Exception:
-        raise HTTPException(status_code=404, detail="Appointment not found")
+    except Exception as e:
+        raise query_failed(e, "Appointments")
@@ -0,0 +1,75 @@
+import asyncio
+import json
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from changefeed import FEED_TABLES, Subscription, get_feed
+from config import get_settings
+from metrics import InstrumentedRoute
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+# Events written per flush when a subscriber has a backlog
+MAX_BATCH = 64
+
+
+def _format(event: dict) -> str:
+    return f"event: {event['op']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def _event_stream(request: Request, subscription: Subscription) -> AsyncIterator[bytes]:
+    heartbeat = get_settings().changefeed_heartbeat
+    try:
+        # Flush headers straight away and set the client's reconnect delay
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield b": keep-alive\n\n"
+                continue
+
+            chunk = [_format(event)]
+            while len(chunk) < MAX_BATCH and not subscription.queue.empty():
+                chunk.append(_format(subscription.queue.get_nowait()))
+            yield "".join(chunk).encode()
+    finally:
+        get_feed().unsubscribe(subscription)
+
+
+@router.get("/")
+async def stream_changes(
+    request: Request,
+    hospital_id: Optional[str] = Query(None, description="Only changes for this hospital"),
+    tables: Optional[str] = Query(None, description="Comma-separated tables to watch (default: all)")
+):
+    """Stream row changes as server-sent events.
+
+    Each event names the operation (``insert``, ``upsert``, ``update``,
+    ``delete``) and carries the table, row ID, hospital ID and the new row
+    or changed fields. A ``resync`` event means the client fell behind and
+    should refetch its views.
+    """
+    watched = frozenset(FEED_TABLES)
+    if tables:
+        watched = frozenset(name.strip() for name in tables.split(",") if name.strip())
+        unknown = sorted(watched - set(FEED_TABLES))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown tables: {', '.join(unknown)}")
+
+    # Subscribed here so a full feed is a 503 rather than a broken stream.
+    # A client gone before the first chunk never starts the generator, so
+    # its finally cannot be relied on alone to release the subscription.
+    feed = get_feed()
+    subscription = feed.subscribe(hospital_id, watched)
+    return StreamingResponse(
+        _event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(feed.unsubscribe, subscription)
+    )
@@ -1,57 +1,110 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List, Optional
 from models.department import Department, DepartmentCreate, DepartmentUpdate
-from database import get_supabase
+from models.batch import BatchResponse
+from metrics import InstrumentedRoute
+from repository import Repository, query_failed
+from projection import Projection, projection
+from loader import batch_lookup
+from pagination import ID_KEYSET, PAGE_RESPONSES, PageParams, set_next_cursor
+from cache import get_cache
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
+departments_table = Repository("departments")
 
-@router.get("/", response_model=List[Department])
+
+async def _invalidate_department_views(department: dict, moved: bool = False) -> None:
+    """Drop cached department reads affected by a write to ``department``.
+
+    ``moved`` means the department changed hospital, so every hospital's
+    listing is dropped rather than only its current one.
+    """
+    cache = get_cache()
+    hospital_id = None if moved else department.get("hospital_id")
+    await cache.invalidate("departments.list", hospital_id=hospital_id)
+    await cache.invalidate("departments.detail")
+
+
+@router.get("/", response_model=List[Department], responses=PAGE_RESPONSES)
 async def get_departments(
-    hospital_id: Optional[str] = Query(None, description="Filter by hospital ID")
+    response: Response,
+    hospital_id: Optional[str] = Query(None, description="Filter by hospital ID"),
+    page: PageParams = Depends(),
+    fields: Projection = Depends(projection(Department))
 ):
-    """Get all departments with optional hospital filter."""
+    """Get all departments with optional hospital filter, paginated by keyset cursor."""
+    after = page.cursor(ID_KEYSET)
     try:
-        supabase = get_supabase()
-        query = supabase.table("departments").select("*")
-        
-        if hospital_id:
-            query = query.eq("hospital_id", hospital_id)
-        
-        response = query.execute()
-        return response.data
-    except Exception:
-        return []
+        rows, next_cursor = await get_cache().fetch(
+            "departments.list",
+            hospital_id,
+            lambda: departments_table.find_page(
+                ID_KEYSET,
+                page.page_size,
+                after,
+                columns=fields.columns(*ID_KEYSET),
+                filters={
+                    "hospital_id": hospital_id
+                }
+            ),
+            page.page_size,
+            after,
+            fields.columns()
+        )
+        set_next_cursor(response, next_cursor)
+        return fields.render(rows, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise query_failed(e, "Departments")
+
+
+@router.get("/batch", response_model=BatchResponse[Department])
+async def get_departments_batch(
+    ids: str = Query(..., description="Comma-separated department IDs"),
+    fields: Projection = Depends(projection(Department))
+):
+    """Get many departments by ID in one query; unknown IDs are listed in ``missing``."""
+    return await batch_lookup(departments_table, ids, fields)
 
 
 @router.get("/{department_id}", response_model=Department)
-async def get_department(department_id: str):
+async def get_department(
+    department_id: str,
+    fields: Projection = Depends(projection(Department))
+):
     """Get a specific department by ID."""
     try:
-        supabase = get_supabase()
-        response = supabase.table("departments").select("*").eq("id", department_id).execute()
+        department = await get_cache().fetch(
+            "departments.detail",
+            None,
+            lambda: departments_table.get(department_id, fields.columns()),
+            department_id,
+            fields.columns()
+        )
         
-        if not response.data:
+        if not department:
             raise HTTPException(status_code=404, detail="Department not found")
         
-        return response.data[0]
+        return fields.render(department)
     except HTTPException:
         raise
-    except Exception:
-        raise HTTPException(status_code=404, detail="Department not found")
+    except Exception as e:
+        raise query_failed(e, "Departments")
 
 
 @router.post("/", response_model=Department)
 async def create_department(department: DepartmentCreate):
     """Create a new department."""
     try:
-        supabase = get_supabase()
-        response = supabase.table("departments").insert(department.model_dump()).execute()
+        data = await departments_table.insert(department.model_dump())
         
-        if not response.data:
+        if not data:
             raise HTTPException(status_code=400, detail="Failed to create department")
         
-        return response.data[0]
+        await _invalidate_department_views(data[0])
+        return data[0]
     except HTTPException:
         raise
     except Exception as e:
@@ -62,19 +115,18 @@ async def create_department(department: DepartmentCreate):
 async def update_department(department_id: str, department: DepartmentUpdate):
     """Update a department."""
     try:
-        supabase = get_supabase()
-        
         update_data = {k: v for k, v in department.model_dump().items() if v is not None}
         
         if not update_data:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        response = supabase.table("departments").update(update_data).eq("id", department_id).execute()
+        data = await departments_table.update(department_id, update_data)
         
-        if not response.data:
+        if not data:
             raise HTTPException(status_code=404, detail="Department not found")
         
-        return response.data[0]
+        await _invalidate_department_views(data[0], moved="hospital_id" in update_data)
+        return data[0]
     except HTTPException:
         raise
     except Exception as e:
@@ -85,14 +137,14 @@ async def update_department(department_id: str, department: DepartmentUpdate):
 async def delete_department(department_id: str):
     """Delete a department."""
     try:
-        supabase = get_supabase()
-        response = supabase.table("departments").delete().eq("id", department_id).execute()
+        data = await departments_table.delete(department_id)
         
-        if not response.data:
+        if not data:
             raise HTTPException(status_code=404, detail="Department not found")
         
+        await _invalidate_department_views(data[0])
         return {"message": "Department deleted successfully"}
     except HTTPException:
         raise
-    except Exception:
-        raise HTTPException(status_code=404, detail="Department not found")
+    except Exception as e:
+        raise query_failed(e, "Departments")
@@ -1,66 +1,139 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from typing import Any, Dict, List, Optional
 from models.doctor import Doctor, DoctorCreate, DoctorUpdate
-from database import get_supabase
+from models.bulk import BulkDeleteRequest, BulkResponse
+from models.batch import BatchResponse
+from metrics import InstrumentedRoute
+from repository import Repository, query_failed
+from bulk import bulk_create, bulk_update, bulk_delete
+from export import ExportFormat, export_format, export_response
+from projection import Projection, projection
+from loader import batch_lookup
+from filters import one_of
+from pagination import ID_KEYSET, PAGE_RESPONSES, PageParams, set_next_cursor
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
+doctors_table = Repository("doctors")
 
-@router.get("/", response_model=List[Doctor])
+
+@router.get("/", response_model=List[Doctor], responses=PAGE_RESPONSES)
 async def get_doctors(
+    response: Response,
     hospital_id: Optional[str] = Query(None, description="Filter by hospital ID"),
-    availability: Optional[str] = Query(None, description="Filter by availability"),
-    department: Optional[str] = Query(None, description="Filter by department"),
-    specialty: Optional[str] = Query(None, description="Filter by specialty")
+    availability: Optional[str] = Query(None, description="Filter by availability; comma-separate several values"),
+    department: Optional[str] = Query(None, description="Filter by department; comma-separate several values"),
+    specialty: Optional[str] = Query(None, description="Filter by specialty; comma-separate several values"),
+    page: PageParams = Depends(),
+    fields: Projection = Depends(projection(Doctor))
 ):
-    """Get all doctors with optional filters."""
+    """Get all doctors with optional filters, paginated by keyset cursor."""
+    after = page.cursor(ID_KEYSET)
     try:
-        supabase = get_supabase()
-        query = supabase.table("doctors").select("*")
-        
-        if hospital_id:
-            query = query.eq("hospital_id", hospital_id)
-        if availability:
-            query = query.eq("availability", availability)
-        if department:
-            query = query.eq("department", department)
-        if specialty:
-            query = query.eq("specialty", specialty)
-        
-        response = query.execute()
-        return response.data
-    except Exception:
-        return []
+        rows, next_cursor = await doctors_table.find_page(
+            ID_KEYSET,
+            page.page_size,
+            after,
+            columns=fields.columns(*ID_KEYSET),
+            filters={
+                "hospital_id": hospital_id,
+                "availability": one_of(availability),
+                "department": one_of(department),
+                "specialty": one_of(specialty)
+            }
+        )
+        set_next_cursor(response, next_cursor)
+        return fields.render(rows, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise query_failed(e, "Doctors")
+
+
+@router.get("/export")
+async def export_doctors(
+    hospital_id: Optional[str] = Query(None, description="Filter by hospital ID"),
+    availability: Optional[str] = Query(None, description="Filter by availability; comma-separate several values"),
+    department: Optional[str] = Query(None, description="Filter by department; comma-separate several values"),
+    specialty: Optional[str] = Query(None, description="Filter by specialty; comma-separate several values"),
+    format: ExportFormat = Depends(export_format)
+):
+    """Stream all matching doctors as NDJSON, CSV, MessagePack or Arrow."""
+    return export_response(
+        doctors_table,
+        ID_KEYSET,
+        Doctor,
+        format,
+        filters={
+            "hospital_id": hospital_id,
+            "availability": one_of(availability),
+            "department": one_of(department),
+            "specialty": one_of(specialty)
+        }
+    )
+
+
+@router.post("/bulk", response_model=BulkResponse)
+async def create_doctors_bulk(
+    items: List[Dict[str, Any]] = Body(..., description="Doctors to create"),
+    upsert: bool = Query(False, description="Replace existing doctors whose ID is given")
+):
+    """Create many doctors with chunked multi-row inserts."""
+    return await bulk_create(doctors_table, DoctorCreate, items, upsert)
+
+
+@router.put("/bulk", response_model=BulkResponse)
+async def update_doctors_bulk(
+    items: List[Dict[str, Any]] = Body(..., description="Partial updates, each with its doctor ID")
+):
+    """Update many doctors in as few queries as possible."""
+    return await bulk_update(doctors_table, DoctorUpdate, items)
+
+
+@router.post("/bulk/delete", response_model=BulkResponse)
+async def delete_doctors_bulk(request: BulkDeleteRequest):
+    """Delete many doctors by ID."""
+    return await bulk_delete(doctors_table, request.ids)
+
+
+@router.get("/batch", response_model=BatchResponse[Doctor])
+async def get_doctors_batch(
+    ids: str = Query(..., description="Comma-separated doctor IDs"),
+    fields: Projection = Depends(projection(Doctor))
+):
+    """Get many doctors by ID in one query; unknown IDs are listed in ``missing``."""
+    return await batch_lookup(doctors_table, ids, fields)
 
 
 @router.get("/{doctor_id}", response_model=Doctor)
-async def get_doctor(doctor_id: str):
+async def get_doctor(
+    doctor_id: str,
+    fields: Projection = Depends(projection(Doctor))
+):
     """Get a specific doctor by ID."""
     try:
-        supabase = get_supabase()
-        response = supabase.table("doctors").select("*").eq("id", doctor_id).execute()
+        doctor = await doctors_table.get(doctor_id, fields.columns())
         
-        if not response.data:
+        if not doctor:
             raise HTTPException(status_code=404, detail="Doctor not found")
         
-        return response.data[0]
+        return fields.render(doctor)
     except HTTPException:
         raise
-    except Exception:
-        raise HTTPException(status_code=404, detail="Doctor not found")
+    except Exception as e:
+        raise query_failed(e, "Doctors")
 
 
 @router.post("/", response_model=Doctor)
 async def create_doctor(doctor: DoctorCreate):
     """Create a new doctor."""
     try:
-        supabase = get_supabase()
-        response = supabase.table("doctors").insert(doctor.model_dump()).execute()
+        data = await doctors_table.insert(doctor.model_dump())
         
-        if not response.data:
+        if not data:
             raise HTTPException(status_code=400, detail="Failed to create doctor")
         
-        return response.data[0]
+        return data[0]
     except HTTPException:
         raise
     except Exception as e:
@@ -71,19 +144,17 @@ async def create_doctor(doctor: DoctorCreate):
 async def update_doctor(doctor_id: str, doctor: DoctorUpdate):
     """Update a doctor."""
     try:
-        supabase = get_supabase()
-        
         update_data = {k: v for k, v in doctor.model_dump().items() if v is not None}
         
         if not update_data:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        response = supabase.table("doctors").update(update_data).eq("id", doctor_id).execute()
+        data = await doctors_table.update(doctor_id, update_data)
         
-        if not response.data:
+        if not data:
             raise HTTPException(status_code=404, detail="Doctor not found")
         
-        return response.data[0]
+        return data[0]
     except HTTPException:
         raise
     except Exception as e:
@@ -94,14 +165,13 @@ async def update_doctor(doctor_id: str, doctor: DoctorUpdate):
 async def delete_doctor(doctor_id: str):
     """Delete a doctor."""
     try:
-        supabase = get_supabase()
-        response = supabase.table("doctors").delete().eq("id", doctor_id).execute()
+        data = await doctors_table.delete(doctor_id)
         
-        if not response.data:
+        if not data:
             raise HTTPException(status_code=404, detail="Doctor not found")
         
         return {"message": "Doctor deleted successfully"}
     except HTTPException:
         raise
-    except Exception:
-        raise HTTPException(status_code=404, detail="Doctor not found")
+    except Exception as e:
+        raise query_failed(e, "Doctors")
@@ -1,69 +1,111 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List
 from models.hospital import Hospital, HospitalCreate, HospitalUpdate
-from database import get_supabase
+from models.batch import BatchResponse
+from metrics import InstrumentedRoute
+from repository import Repository
+from projection import Projection, projection
+from loader import batch_lookup
+from pagination import ID_KEYSET, PAGE_RESPONSES, PageParams, set_next_cursor
+from cache import get_cache
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
+hospitals_table = Repository("hospitals", scope_column="id")
 
-@router.get("/", response_model=List[Hospital])
-async def get_hospitals():
-    """Get all hospitals."""
-    supabase = get_supabase()
-    response = supabase.table("hospitals").select("*").execute()
-    return response.data
+
+@router.get("/", response_model=List[Hospital], responses=PAGE_RESPONSES)
+async def get_hospitals(
+    response: Response,
+    page: PageParams = Depends(),
+    fields: Projection = Depends(projection(Hospital))
+):
+    """Get all hospitals, paginated by keyset cursor."""
+    after = page.cursor(ID_KEYSET)
+    rows, next_cursor = await get_cache().fetch(
+        "hospitals.list",
+        None,
+        lambda: hospitals_table.find_page(
+            ID_KEYSET,
+            page.page_size,
+            after,
+            columns=fields.columns(*ID_KEYSET)
+        ),
+        page.page_size,
+        after,
+        fields.columns()
+    )
+    set_next_cursor(response, next_cursor)
+    return fields.render(rows, response)
+
+
+@router.get("/batch", response_model=BatchResponse[Hospital])
+async def get_hospitals_batch(
+    ids: str = Query(..., description="Comma-separated hospital IDs"),
+    fields: Projection = Depends(projection(Hospital))
+):
+    """Get many hospitals by ID in one query; unknown IDs are listed in ``missing``."""
+    return await batch_lookup(hospitals_table, ids, fields)
 
 
 @router.get("/{hospital_id}", response_model=Hospital)
-async def get_hospital(hospital_id: str):
+async def get_hospital(
+    hospital_id: str,
+    fields: Projection = Depends(projection(Hospital))
+):
     """Get a specific hospital by ID."""
-    supabase = get_supabase()
-    response = supabase.table("hospitals").select("*").eq("id", hospital_id).execute()
+    hospital = await get_cache().fetch(
+        "hospitals.detail",
+        hospital_id,
+        lambda: hospitals_table.get(hospital_id, fields.columns()),
+        fields.columns()
+    )
     
-    if not response.data:
+    if not hospital:
         raise HTTPException(status_code=404, detail="Hospital not found")
     
-    return response.data[0]
+    return fields.render(hospital)
 
 
 @router.post("/", response_model=Hospital)
 async def create_hospital(hospital: HospitalCreate):
     """Create a new hospital."""
-    supabase = get_supabase()
-    response = supabase.table("hospitals").insert(hospital.model_dump()).execute()
+    data = await hospitals_table.insert(hospital.model_dump())
     
-    if not response.data:
+    if not data:
         raise HTTPException(status_code=400, detail="Failed to create hospital")
     
-    return response.data[0]
+    await get_cache().invalidate("hospitals.list")
+    return data[0]
 
 
 @router.put("/{hospital_id}", response_model=Hospital)
 async def update_hospital(hospital_id: str, hospital: HospitalUpdate):
     """Update a hospital."""
-    supabase = get_supabase()
-    
     # Filter out None values
     update_data = {k: v for k, v in hospital.model_dump().items() if v is not None}
     
     if not update_data:
         raise HTTPException(status_code=400, detail="No fields to update")
     
-    response = supabase.table("hospitals").update(update_data).eq("id", hospital_id).execute()
+    data = await hospitals_table.update(hospital_id, update_data)
     
-    if not response.data:
+    if not data:
         raise HTTPException(status_code=404, detail="Hospital not found")
     
-    return response.data[0]
+    await get_cache().invalidate("hospitals.list")
+    await get_cache().invalidate("hospitals.detail", hospital_id=hospital_id)
+    return data[0]
 
 
 @router.delete("/{hospital_id}")
 async def delete_hospital(hospital_id: str):
     """Delete a hospital."""
-    supabase = get_supabase()
-    response = supabase.table("hospitals").delete().eq("id", hospital_id).execute()
+    data = await hospitals_table.delete(hospital_id)
     
-    if not response.data:
+    if not data:
         raise HTTPException(status_code=404, detail="Hospital not found")
     
+    await get_cache().invalidate("hospitals.list")
+    await get_cache().invalidate("hospitals.detail", hospital_id=hospital_id)
     return {"message": "Hospital deleted successfully"}
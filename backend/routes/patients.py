@@ -1,63 +1,150 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from datetime import date as Date
+from typing import Any, Dict, List, Optional
 from models.patient import Patient, PatientCreate, PatientUpdate
-from database import get_supabase
+from models.bulk import BulkDeleteRequest, BulkResponse
+from models.batch import BatchResponse
+from metrics import InstrumentedRoute
+from repository import Repository, query_failed
+from rollups import PATIENT_ROLLUP
+from bulk import bulk_create, bulk_update, bulk_delete
+from export import ExportFormat, export_format, export_response
+from projection import Projection, projection
+from loader import batch_lookup
+from filters import between, one_of
+from pagination import ID_KEYSET, PAGE_RESPONSES, PageParams, set_next_cursor
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
+patients_table = Repository("patients")
 
-@router.get("/", response_model=List[Patient])
+
+@router.get("/", response_model=List[Patient], responses=PAGE_RESPONSES)
 async def get_patients(
+    response: Response,
     hospital_id: Optional[str] = Query(None, description="Filter by hospital ID"),
-    status: Optional[str] = Query(None, description="Filter by status"),
-    department: Optional[str] = Query(None, description="Filter by department")
+    status: Optional[str] = Query(None, description="Filter by status; comma-separate several values"),
+    department: Optional[str] = Query(None, description="Filter by department; comma-separate several values"),
+    admission_date_from: Optional[Date] = Query(None, description="Admitted on or after this date"),
+    admission_date_to: Optional[Date] = Query(None, description="Admitted on or before this date"),
+    age_min: Optional[int] = Query(None, ge=0, description="Minimum age"),
+    age_max: Optional[int] = Query(None, ge=0, description="Maximum age"),
+    page: PageParams = Depends(),
+    fields: Projection = Depends(projection(Patient))
 ):
-    """Get all patients with optional filters."""
+    """Get all patients with optional filters, paginated by keyset cursor."""
+    after = page.cursor(ID_KEYSET)
     try:
-        supabase = get_supabase()
-        query = supabase.table("patients").select("*")
-        
-        if hospital_id:
-            query = query.eq("hospital_id", hospital_id)
-        if status:
-            query = query.eq("status", status)
-        if department:
-            query = query.eq("department", department)
-        
-        response = query.execute()
-        return response.data
-    except Exception:
-        return []
+        rows, next_cursor = await patients_table.find_page(
+            ID_KEYSET,
+            page.page_size,
+            after,
+            columns=fields.columns(*ID_KEYSET),
+            filters={
+                "hospital_id": hospital_id,
+                "status": one_of(status),
+                "department": one_of(department),
+                "admission_date": between(admission_date_from, admission_date_to),
+                "age": between(age_min, age_max)
+            }
+        )
+        set_next_cursor(response, next_cursor)
+        return fields.render(rows, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise query_failed(e, "Patients")
+
+
+@router.get("/export")
+async def export_patients(
+    hospital_id: Optional[str] = Query(None, description="Filter by hospital ID"),
+    status: Optional[str] = Query(None, description="Filter by status; comma-separate several values"),
+    department: Optional[str] = Query(None, description="Filter by department; comma-separate several values"),
+    admission_date_from: Optional[Date] = Query(None, description="Admitted on or after this date"),
+    admission_date_to: Optional[Date] = Query(None, description="Admitted on or before this date"),
+    age_min: Optional[int] = Query(None, ge=0, description="Minimum age"),
+    age_max: Optional[int] = Query(None, ge=0, description="Maximum age"),
+    format: ExportFormat = Depends(export_format)
+):
+    """Stream all matching patients as NDJSON, CSV, MessagePack or Arrow."""
+    return export_response(
+        patients_table,
+        ID_KEYSET,
+        Patient,
+        format,
+        filters={
+            "hospital_id": hospital_id,
+            "status": one_of(status),
+            "department": one_of(department),
+            "admission_date": between(admission_date_from, admission_date_to),
+            "age": between(age_min, age_max)
+        }
+    )
+
+
+@router.post("/bulk", response_model=BulkResponse)
+async def create_patients_bulk(
+    items: List[Dict[str, Any]] = Body(..., description="Patients to create"),
+    upsert: bool = Query(False, description="Replace existing patients whose ID is given")
+):
+    """Create many patients with chunked multi-row inserts."""
+    return await bulk_create(patients_table, PatientCreate, items, upsert, rollup=PATIENT_ROLLUP)
+
+
+@router.put("/bulk", response_model=BulkResponse)
+async def update_patients_bulk(
+    items: List[Dict[str, Any]] = Body(..., description="Partial updates, each with its patient ID")
+):
+    """Update many patients in as few queries as possible."""
+    return await bulk_update(patients_table, PatientUpdate, items, rollup=PATIENT_ROLLUP)
+
+
+@router.post("/bulk/delete", response_model=BulkResponse)
+async def delete_patients_bulk(request: BulkDeleteRequest):
+    """Delete many patients by ID."""
+    return await bulk_delete(patients_table, request.ids, rollup=PATIENT_ROLLUP)
+
+
+@router.get("/batch", response_model=BatchResponse[Patient])
+async def get_patients_batch(
+    ids: str = Query(..., description="Comma-separated patient IDs"),
+    fields: Projection = Depends(projection(Patient))
+):
+    """Get many patients by ID in one query; unknown IDs are listed in ``missing``."""
+    return await batch_lookup(patients_table, ids, fields)
 
 
 @router.get("/{patient_id}", response_model=Patient)
-async def get_patient(patient_id: str):
+async def get_patient(
+    patient_id: str,
+    fields: Projection = Depends(projection(Patient))
+):
     """Get a specific patient by ID."""
     try:
-        supabase = get_supabase()
-        response = supabase.table("patients").select("*").eq("id", patient_id).execute()
+        patient = await patients_table.get(patient_id, fields.columns())
         
-        if not response.data:
+        if not patient:
             raise HTTPException(status_code=404, detail="Patient not found")
         
-        return response.data[0]
+        return fields.render(patient)
     except HTTPException:
         raise
-    except Exception:
-        raise HTTPException(status_code=404, detail="Patient not found")
+    except Exception as e:
+        raise query_failed(e, "Patients")
 
 
 @router.post("/", response_model=Patient)
 async def create_patient(patient: PatientCreate):
     """Create a new patient."""
     try:
-        supabase = get_supabase()
-        response = supabase.table("patients").insert(patient.model_dump()).execute()
+        data = await patients_table.insert(patient.model_dump())
         
-        if not response.data:
+        if not data:
             raise HTTPException(status_code=400, detail="Failed to create patient")
         
-        return response.data[0]
+        await PATIENT_ROLLUP.changed(data)
+        return data[0]
     except HTTPException:
         raise
     except Exception as e:
@@ -68,19 +155,18 @@ async def create_patient(patient: PatientCreate):
 async def update_patient(patient_id: str, patient: PatientUpdate):
     """Update a patient."""
     try:
-        supabase = get_supabase()
-        
         update_data = {k: v for k, v in patient.model_dump().items() if v is not None}
         
         if not update_data:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        response = supabase.table("patients").update(update_data).eq("id", patient_id).execute()
+        data = await patients_table.update(patient_id, update_data)
         
-        if not response.data:
+        if not data:
             raise HTTPException(status_code=404, detail="Patient not found")
         
-        return response.data[0]
+        await PATIENT_ROLLUP.changed(data, update_data)
+        return data[0]
     except HTTPException:
         raise
     except Exception as e:
@@ -91,14 +177,14 @@ async def update_patient(patient_id: str, patient: PatientUpdate):
 async def delete_patient(patient_id: str):
     """Delete a patient."""
     try:
-        supabase = get_supabase()
-        response = supabase.table("patients").delete().eq("id", patient_id).execute()
+        data = await patients_table.delete(patient_id)
         
-        if not response.data:
+        if not data:
             raise HTTPException(status_code=404, detail="Patient not found")
         
+        await PATIENT_ROLLUP.changed(data)
         return {"message": "Patient deleted successfully"}
     except HTTPException:
         raise
-    except Exception:
-        raise HTTPException(status_code=404, detail="Patient not found")
+    except Exception as e:
+        raise query_failed(e, "Patients")
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional, get_args
+from models.search import SearchResult, SearchType
+from metrics import InstrumentedRoute
+from repository import query_failed, rpc
+from pagination import PAGE_RESPONSES, PageParams, set_next_cursor
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+# Cursor values: rank of the last result, then its "type:id"
+SEARCH_KEYSET = ["rank", "key"]
+SEARCH_PAGE_SIZE = 20
+
+
+@router.get("/", response_model=List[SearchResult], responses=PAGE_RESPONSES)
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100, description="Words or partial words to search for"),
+    hospital_id: Optional[str] = Query(None, description="Filter by hospital ID"),
+    types: Optional[str] = Query(None, description="Comma-separated result types: patient, doctor (default: both)"),
+    page: PageParams = Depends()
+):
+    """Search patient names and conditions and doctor names and specialties, best match first."""
+    search_types = list(get_args(SearchType))
+    if types:
+        search_types = list(dict.fromkeys(name.strip() for name in types.split(",") if name.strip()))
+        unknown = [name for name in search_types if name not in get_args(SearchType)]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown types: {', '.join(unknown)}")
+
+    after = page.cursor(SEARCH_KEYSET)
+    limit = page.page_size or SEARCH_PAGE_SIZE
+    try:
+        rows = await rpc("search_records", {
+            "p_query": q,
+            "p_hospital_id": hospital_id,
+            "p_types": search_types,
+            "p_limit": limit + 1,
+            "p_after_rank": after[0] if after else None,
+            "p_after_key": after[1] if after else None
+        }, read_only=True)
+    except Exception as e:
+        raise query_failed(e, "Search")
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        set_next_cursor(response, [last["rank"], f"{last['type']}:{last['id']}"])
+    return rows
@@ -0,0 +1,606 @@
+import asyncio
+import bisect
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+
+from changefeed import RESYNC, Event, get_feed
+from config import get_settings
+from export import iter_pages
+from filters import OneOf, between
+from loader import Loader
+from pagination import APPOINTMENT_KEYSET, ID_KEYSET
+from repository import Repository
+
+# Minutes blocked by each appointment type (keep in sync with appointment_duration() in SQL)
+APPOINTMENT_DURATIONS: Dict[str, int] = {
+    "Consultation": 30,
+    "Follow-up": 20,
+    "Check-up": 30,
+    "Surgery": 120,
+    "Prenatal": 30,
+    "Emergency": 60,
+}
+DEFAULT_DURATION = 30
+MAX_DURATION = max(APPOINTMENT_DURATIONS.values())
+
+# Doctors who cannot be booked
+UNBOOKABLE = {"Off Duty", "On Leave"}
+
+# Appointment fields that decide when and where it takes place
+SCHEDULE_FIELDS = ("hospital_id", "doctor_name", "room", "date", "time", "type", "status")
+
+# SQLSTATE of an exclusion constraint violation
+EXCLUSION_VIOLATION = "23P01"
+
+APPOINTMENT_COLUMNS = "id,hospital_id,doctor_name,department,date,time,type,status,room"
+DOCTOR_COLUMNS = "id,hospital_id,name,department,availability"
+DEPARTMENT_COLUMNS = "id,hospital_id,name,rooms"
+
+DOCTOR = "doctor"
+ROOM = "room"
+
+# (hospital_id, DOCTOR | ROOM, doctor name or room, date)
+ResourceKey = Tuple[str, str, str, str]
+# (start minute, end minute, appointment ID)
+Interval = Tuple[int, int, str]
+
+_appointments = Repository("appointments")
+_doctors = Repository("doctors")
+_departments = Repository("departments")
+
+# Repository and columns of each table the index holds
+SOURCES: Dict[str, Tuple[Repository, str]] = {
+    "appointments": (_appointments, APPOINTMENT_COLUMNS),
+    "doctors": (_doctors, DOCTOR_COLUMNS),
+    "departments": (_departments, DEPARTMENT_COLUMNS),
+}
+
+_schedule: Optional["ScheduleIndex"] = None
+_refresher: Optional[asyncio.Task] = None
+
+
+def parse_time(value: str) -> int:
+    """Minutes since midnight for ``"09:30 AM"`` or ``"14:30"``."""
+    value = value.strip().upper()
+    for fmt in ("%I:%M %p", "%H:%M", "%H:%M:%S"):
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        return parsed.hour * 60 + parsed.minute
+    raise ValueError(f"Invalid time: {value}")
+
+
+def format_time(minutes: int) -> str:
+    """Format minutes since midnight the way appointments store times."""
+    return f"{(minutes // 60 - 1) % 12 + 1:02d}:{minutes % 60:02d} {'AM' if minutes < 720 else 'PM'}"
+
+
+def appointment_interval(row: Dict[str, Any]) -> Tuple[int, int]:
+    """Start and end minute of an appointment."""
+    start = parse_time(row["time"])
+    return start, start + APPOINTMENT_DURATIONS.get(row["type"], DEFAULT_DURATION)
+
+
+class IntervalIndex:
+    """Booked intervals per resource and day, sorted by start time.
+
+    Appointments never last longer than ``MAX_DURATION``, so overlap queries
+    bisect to the first interval that could reach ``start`` and stop at the
+    first one starting after ``end``: O(log n) plus the overlaps found.
+    """
+
+    def __init__(self):
+        self._intervals: Dict[ResourceKey, List[Interval]] = {}
+
+    def add(self, key: ResourceKey, interval: Interval) -> None:
+        bisect.insort(self._intervals.setdefault(key, []), interval)
+
+    def remove(self, key: ResourceKey, interval: Interval) -> None:
+        intervals = self._intervals.get(key, [])
+        position = bisect.bisect_left(intervals, interval)
+        if position < len(intervals) and intervals[position] == interval:
+            del intervals[position]
+        if not intervals:
+            self._intervals.pop(key, None)
+
+    def intervals(self, key: ResourceKey) -> List[Interval]:
+        return self._intervals.get(key, [])
+
+    def overlapping(self, key: ResourceKey, start: int, end: int) -> List[Interval]:
+        """Booked intervals on ``key`` that overlap ``[start, end)``."""
+        intervals = self._intervals.get(key, [])
+        position = bisect.bisect_right(intervals, (start - MAX_DURATION, start - MAX_DURATION, ""))
+        found = []
+        while position < len(intervals) and intervals[position][0] < end:
+            if intervals[position][1] > start:
+                found.append(intervals[position])
+            position += 1
+        return found
+
+
+async def _fetch_all(
+    repository: Repository,
+    keyset: List[str],
+    columns: str,
+    filters: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    async for page in iter_pages(repository, keyset, filters, columns=columns):
+        rows.extend(page)
+    return rows
+
+
+class ScheduleIndex:
+    """In-memory view of bookings, bookable doctors and rooms for slot search.
+
+    Holds the appointments from yesterday to SCHEDULE_HORIZON_DAYS ahead
+    (``window``) plus the doctors and departments tables, and is kept
+    current from the change feed; a periodic rebuild picks up writes made
+    outside the API and moves the window along. Rooms are those listed on
+    the departments and those appointments already use.
+    """
+
+    def __init__(self):
+        self.index = IntervalIndex()
+        self._appointments: Dict[str, Dict[str, Any]] = {}
+        self._doctors: Dict[str, Dict[str, Any]] = {}
+        self._departments: Dict[str, Dict[str, Any]] = {}
+        self._rooms: Dict[Tuple[str, str], Set[str]] = {}
+        # First and last day (ISO dates) whose appointments are all held
+        self.window: Optional[Tuple[str, str]] = None
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        # Events received while a (re)build is running, replayed afterwards
+        self._pending: Optional[List[Event]] = None
+        # Loaders shared by the refetches of one event-loop tick, per table
+        self._refetches: Dict[str, Loader] = {}
+
+    def _keys(self, row: Dict[str, Any]) -> List[ResourceKey]:
+        day = str(row["date"])
+        return [
+            (row["hospital_id"], DOCTOR, row["doctor_name"], day),
+            (row["hospital_id"], ROOM, row["room"], day),
+        ]
+
+    def _index_appointment(self, row: Dict[str, Any], add: bool) -> None:
+        if row.get("status") == "Cancelled":
+            return
+        try:
+            start, end = appointment_interval(row)
+        except (KeyError, ValueError):
+            return
+        for key in self._keys(row):
+            if add:
+                self.index.add(key, (start, end, row["id"]))
+            else:
+                self.index.remove(key, (start, end, row["id"]))
+
+    def put_appointment(self, row: Dict[str, Any]) -> None:
+        """Add or replace an appointment; cancelled ones are remembered but not indexed."""
+        self.remove_appointment(row["id"])
+        self._appointments[row["id"]] = row
+        self._rooms.setdefault((row["hospital_id"], row["department"]), set()).add(row["room"])
+        self._index_appointment(row, add=True)
+
+    def remove_appointment(self, appointment_id: str) -> None:
+        row = self._appointments.pop(appointment_id, None)
+        if row is not None:
+            self._index_appointment(row, add=False)
+
+    def put_doctor(self, row: Dict[str, Any]) -> None:
+        self._doctors[row["id"]] = row
+
+    def remove_doctor(self, doctor_id: str) -> None:
+        self._doctors.pop(doctor_id, None)
+
+    def put_department(self, row: Dict[str, Any]) -> None:
+        self._departments[row["id"]] = row
+
+    def remove_department(self, department_id: str) -> None:
+        self._departments.pop(department_id, None)
+
+    def apply(self, event: Event) -> None:
+        """Apply one change feed event; unknown partially-updated rows are refetched."""
+        if event["op"] == RESYNC:
+            # Events may have been lost, also by a build in progress; rebuild
+            # before the index is used again
+            if self._pending is not None:
+                self._pending.append(event)
+            else:
+                self._loaded = False
+            return
+        if event["table"] not in SOURCES or (not self._loaded and self._pending is None):
+            return
+        if self._pending is not None:
+            self._pending.append(event)
+            return
+
+        rows, put, remove = {
+            "appointments": (self._appointments, self.put_appointment, self.remove_appointment),
+            "doctors": (self._doctors, self.put_doctor, self.remove_doctor),
+            "departments": (self._departments, self.put_department, self.remove_department),
+        }[event["table"]]
+        if event["op"] == "delete":
+            remove(event["id"])
+            return
+
+        data = event["data"] or {}
+        if event["op"] == "update":
+            if event["id"] not in rows:
+                row = self._refetch_loader(event["table"]).load(event["id"])
+                asyncio.get_running_loop().create_task(self._refetch(event["table"], event["id"], row))
+                return
+            data = {**rows[event["id"]], **data}
+        put(data)
+
+    def _refetch_loader(self, table: str) -> Loader:
+        """Loader for ``table`` shared by every refetch queued in this tick.
+
+        A bulk update of rows the index does not hold arrives as a burst of
+        events; their refetches become one ``in`` query instead of one
+        lookup per row. The loader is dropped after the tick, so later
+        events never see a cached row.
+        """
+        loader = self._refetches.get(table)
+        if loader is None:
+            repository, columns = SOURCES[table]
+            loader = self._refetches[table] = Loader(repository, columns)
+            asyncio.get_running_loop().call_soon(self._refetches.pop, table, None)
+        return loader
+
+    async def _refetch(self, table: str, record_id: str, pending: "asyncio.Future[Optional[Dict[str, Any]]]") -> None:
+        try:
+            row = await pending
+        except Exception:
+            return
+        if row is not None:
+            self.apply({"table": table, "op": "insert", "id": record_id, "data": row})
+
+    async def _build(self) -> None:
+        today = date.today()
+        window = (
+            (today - timedelta(days=1)).isoformat(),
+            (today + timedelta(days=get_settings().schedule_horizon_days)).isoformat()
+        )
+        self._pending = []
+        try:
+            appointments, doctors, departments = await asyncio.gather(
+                _fetch_all(_appointments, APPOINTMENT_KEYSET, APPOINTMENT_COLUMNS, {"date": between(*window)}),
+                _fetch_all(_doctors, ID_KEYSET, DOCTOR_COLUMNS),
+                _fetch_all(_departments, ID_KEYSET, DEPARTMENT_COLUMNS)
+            )
+        except Exception:
+            events, self._pending = self._pending, None
+            for event in events:
+                self.apply(event)
+            raise
+
+        self.index = IntervalIndex()
+        self._appointments, self._doctors, self._departments, self._rooms = {}, {}, {}, {}
+        for row in appointments:
+            self.put_appointment(row)
+        for row in doctors:
+            self.put_doctor(row)
+        for row in departments:
+            self.put_department(row)
+        self.window = window
+
+        self._loaded = True
+        events, self._pending = self._pending, None
+        for event in events:
+            self.apply(event)
+
+    async def load(self) -> None:
+        """Rebuild the index from the database, then replay events that arrived meanwhile."""
+        async with self._lock:
+            await self._build()
+
+    async def ensure_loaded(self) -> None:
+        """Build the index on first use."""
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self._build()
+
+    def covers(self, day: str) -> bool:
+        """Whether every appointment on ``day`` (an ISO date) is held."""
+        return self.window is not None and self.window[0] <= day <= self.window[1]
+
+    def holds(self, items: List[Tuple[Optional[str], Dict[str, Any]]]) -> bool:
+        """Whether :meth:`conflicts` can check ``items`` from memory alone.
+
+        False when an item books a day outside ``window`` or rewrites an
+        appointment the index does not hold.
+        """
+        for appointment_id, data in items:
+            if not any(field in data for field in SCHEDULE_FIELDS):
+                continue
+            current = self._appointments.get(appointment_id) if appointment_id else None
+            if appointment_id and current is None:
+                return False
+            day = data.get("date", (current or {}).get("date"))
+            if day is not None and not self.covers(str(day)):
+                return False
+        return True
+
+    def for_days(self, appointments: List[Dict[str, Any]]) -> "ScheduleIndex":
+        """Copy of this index's doctors and rooms holding just ``appointments``."""
+        schedule = ScheduleIndex()
+        schedule._doctors = self._doctors
+        schedule._departments = self._departments
+        schedule._rooms = {key: set(names) for key, names in self._rooms.items()}
+        for row in appointments:
+            schedule.put_appointment(row)
+        return schedule
+
+    def rooms(self, department: str, hospital_id: Optional[str] = None) -> Dict[str, List[str]]:
+        """Bookable rooms of ``department`` by hospital, listed or already in use."""
+        rooms: Dict[str, Set[str]] = {}
+        for row in self._departments.values():
+            if row["name"] == department and (hospital_id is None or row["hospital_id"] == hospital_id):
+                rooms.setdefault(row["hospital_id"], set()).update(row.get("rooms") or ())
+        for (hospital, dept), names in self._rooms.items():
+            if dept == department and (hospital_id is None or hospital == hospital_id):
+                rooms.setdefault(hospital, set()).update(names)
+        return {hospital: sorted(names) for hospital, names in rooms.items()}
+
+    def conflicts(self, items: List[Tuple[Optional[str], Dict[str, Any]]]) -> Dict[int, str]:
+        """Check appointments about to be written against the index and each other.
+
+        ``items`` are ``(appointment ID, fields written)`` pairs in write
+        order; new appointments have no ID and updates are merged with the
+        indexed row. Accepted items vacate their old slot for later items.
+        Returns an error message per conflicting position.
+        """
+        batch = IntervalIndex()
+        vacated: Set[str] = set()
+        errors: Dict[int, str] = {}
+
+        for position, (appointment_id, data) in enumerate(items):
+            current = self._appointments.get(appointment_id) if appointment_id else None
+            if current is not None and not any(field in data for field in SCHEDULE_FIELDS):
+                continue
+            row = {**(current or {}), **data}
+            try:
+                start, end = appointment_interval(row)
+                keys = self._keys(row)
+            except (KeyError, ValueError):
+                continue
+
+            if row.get("status") != "Cancelled":
+                clash = next(
+                    (
+                        (key, other)
+                        for key in keys
+                        for index, stale in ((self.index, vacated), (batch, ()))
+                        for _, _, other in index.overlapping(key, start, end)
+                        if other != appointment_id and other not in stale
+                    ),
+                    None
+                )
+                if clash is not None:
+                    (_, resource, name, day), other = clash
+                    errors[position] = (
+                        f"Double booking: {resource} {name} is already booked on {day} at that time ({other})"
+                    )
+                    continue
+                for key in keys:
+                    batch.add(key, (start, end, appointment_id or f"item {position}"))
+
+            if appointment_id:
+                vacated.add(appointment_id)
+
+        return errors
+
+    def _busy_mask(self, key: ResourceKey, day_start: int, step: int, slots: int) -> int:
+        """Bitmask of grid slots touched by bookings on ``key``."""
+        mask = 0
+        for start, end, _ in self.index.overlapping(key, day_start, day_start + step * slots):
+            first = max(0, (start - day_start) // step)
+            last = min(slots, -(-(end - day_start) // step))
+            if last > first:
+                mask |= ((1 << (last - first)) - 1) << first
+        return mask
+
+    @staticmethod
+    def _startable(busy: int, length: int, slots: int) -> int:
+        """Bitmask of grid slots where ``length`` consecutive free slots begin."""
+        free = ~busy & ((1 << slots) - 1)
+        startable = free
+        for offset in range(1, length):
+            startable &= free >> offset
+        return startable
+
+    def search(
+        self,
+        department: str,
+        date_from: date,
+        date_to: date,
+        appointment_type: str,
+        hospital_id: Optional[str] = None,
+        limit: int = 100,
+        now: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Free (doctor, room, time) slots in time order, one room per doctor and time."""
+        settings = get_settings()
+        step = settings.schedule_slot_minutes
+        day_start = parse_time(settings.schedule_day_start)
+        slots = (parse_time(settings.schedule_day_end) - day_start) // step
+        duration = APPOINTMENT_DURATIONS.get(appointment_type, DEFAULT_DURATION)
+        length = -(-duration // step)
+        now = now or datetime.now()
+
+        doctors = sorted(
+            (
+                doctor for doctor in self._doctors.values()
+                if doctor["department"] == department
+                and doctor["availability"] not in UNBOOKABLE
+                and (hospital_id is None or doctor["hospital_id"] == hospital_id)
+            ),
+            key=lambda doctor: (doctor["hospital_id"], doctor["name"])
+        )
+        rooms = self.rooms(department, hospital_id)
+
+        results: List[Dict[str, Any]] = []
+        day = date_from
+        while day <= date_to and len(results) < limit:
+            day_key = day.isoformat()
+            window = (1 << slots) - 1
+            if day == now.date():
+                elapsed = max(0, -(-(now.hour * 60 + now.minute - day_start) // step))
+                window &= ~((1 << min(elapsed, slots)) - 1)
+
+            room_masks = {
+                (hospital, room): self._startable(
+                    self._busy_mask((hospital, ROOM, room, day_key), day_start, step, slots), length, slots
+                )
+                for hospital, names in rooms.items()
+                for room in names
+            }
+            candidates = []
+            for doctor in doctors:
+                hospital = doctor["hospital_id"]
+                doctor_mask = self._startable(
+                    self._busy_mask((hospital, DOCTOR, doctor["name"], day_key), day_start, step, slots), length, slots
+                ) & window
+                for slot in range(slots):
+                    if not doctor_mask >> slot & 1:
+                        continue
+                    room = next(
+                        (name for name in rooms.get(hospital, []) if room_masks[(hospital, name)] >> slot & 1),
+                        None
+                    )
+                    if room is not None:
+                        candidates.append((slot, hospital, doctor, room))
+
+            for slot, hospital, doctor, room in sorted(candidates, key=lambda item: (item[0], item[1], item[2]["name"])):
+                results.append({
+                    "hospital_id": hospital,
+                    "doctor_id": doctor["id"],
+                    "doctor_name": doctor["name"],
+                    "department": department,
+                    "room": room,
+                    "date": day_key,
+                    "time": format_time(day_start + slot * step),
+                    "duration": duration
+                })
+                if len(results) == limit:
+                    break
+            day += timedelta(days=1)
+
+        return results
+
+
+async def _index_days(items: List[Tuple[Optional[str], Dict[str, Any]]]) -> ScheduleIndex:
+    """Index of the appointments on the days ``items`` book, read from the database."""
+    record_ids = [appointment_id for appointment_id, _ in items if appointment_id]
+    current = {row["id"]: row for row in await _appointments.get_many(record_ids, APPOINTMENT_COLUMNS)} if record_ids else {}
+    rows = [{**current.get(appointment_id, {}), **data} for appointment_id, data in items]
+    hospitals = {row["hospital_id"] for row in rows if row.get("hospital_id") and row.get("date")}
+    days = {str(row["date"]) for row in rows if row.get("hospital_id") and row.get("date")}
+
+    schedule = ScheduleIndex()
+    if days:
+        filters = {"hospital_id": OneOf(tuple(sorted(hospitals))), "date": OneOf(tuple(sorted(days)))}
+        for row in await _fetch_all(_appointments, APPOINTMENT_KEYSET, APPOINTMENT_COLUMNS, filters):
+            schedule.put_appointment(row)
+    for appointment_id, row in current.items():
+        if appointment_id not in schedule._appointments:
+            schedule.put_appointment(row)
+    return schedule
+
+
+async def find_conflicts(items: List[Tuple[Optional[str], Dict[str, Any]]]) -> Dict[int, str]:
+    """Double bookings among ``items`` (see :meth:`ScheduleIndex.conflicts`).
+
+    Items the in-memory index holds are checked against it. Otherwise, or
+    if the index cannot be loaded, the days they book are read from the
+    database; if that fails too the write is refused with 503 rather than
+    let through unchecked.
+    """
+    schedule = get_schedule()
+    try:
+        await schedule.ensure_loaded()
+    except Exception:
+        pass
+    else:
+        if schedule.holds(items):
+            return schedule.conflicts(items)
+
+    try:
+        schedule = await _index_days(items)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Double-booking check failed: {e}")
+    return schedule.conflicts(items)
+
+
+async def find_slots(
+    department: str,
+    date_from: date,
+    date_to: date,
+    appointment_type: str,
+    hospital_id: Optional[str] = None,
+    limit: int = 100
+) -> List[Dict[str, Any]]:
+    """Free slots (see :meth:`ScheduleIndex.search`).
+
+    Days outside the index's window are searched against their
+    appointments read from the database.
+    """
+    schedule = get_schedule()
+    await schedule.ensure_loaded()
+    if not (schedule.covers(date_from.isoformat()) and schedule.covers(date_to.isoformat())):
+        filters = {"hospital_id": hospital_id, "date": between(date_from, date_to)}
+        schedule = schedule.for_days(await _fetch_all(_appointments, APPOINTMENT_KEYSET, APPOINTMENT_COLUMNS, filters))
+    return schedule.search(department, date_from, date_to, appointment_type, hospital_id, limit)
+
+
+def is_conflict_error(error: Exception) -> bool:
+    """Whether a write failed on the double-booking exclusion constraints."""
+    return getattr(error, "code", None) == EXCLUSION_VIOLATION
+
+
+def get_schedule() -> ScheduleIndex:
+    """Get or create the schedule index, subscribed to the change feed."""
+    global _schedule
+
+    if _schedule is None:
+        _schedule = ScheduleIndex()
+        get_feed().add_listener(_schedule.apply)
+
+    return _schedule
+
+
+async def _refresh_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await get_schedule().load()
+        except Exception:
+            pass
+
+
+def start_refresher() -> None:
+    """Start rebuilding the schedule index every SCHEDULE_REFRESH_INTERVAL seconds."""
+    global _refresher
+
+    interval = get_settings().schedule_refresh_interval
+    if interval > 0 and _refresher is None:
+        _refresher = asyncio.create_task(_refresh_periodically(interval))
+
+
+async def stop_refresher() -> None:
+    """Cancel the periodic schedule rebuild."""
+    global _refresher
+
+    if _refresher is not None:
+        _refresher.cancel()
+        try:
+            await _refresher
+        except asyncio.CancelledError:
+            pass
+        _refresher = None
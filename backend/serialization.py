@@ -0,0 +1,75 @@
+import json
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple, Type, get_args
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Row = Dict[str, Any]
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON-compatible ``content`` as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class TrustedJSONResponse(Response):
+    """JSON response for content that is already JSON-compatible.
+
+    Unlike ``JSONResponse`` it goes straight to the encoder, using orjson
+    when it is installed.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _nested_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    """The model embedded by a field annotated ``Model`` or ``Optional[Model]``."""
+    for candidate in (annotation, *get_args(annotation)):
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+
+@lru_cache(maxsize=None)
+def row_shaper(model: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None) -> Callable[[Row], Row]:
+    """Function narrowing a database row to ``fields`` of ``model`` (default: all).
+
+    Columns the model does not declare (``slot``, ``search_vector``, ...)
+    are dropped and embedded rows are narrowed to their own model, which
+    is what response-model validation would return for rows our own
+    writes produced, without running the validators again.
+    """
+    names = fields or tuple(model.model_fields)
+    nested = {
+        name: row_shaper(submodel) for name in names
+        if (submodel := _nested_model(model.model_fields[name].annotation)) is not None
+    }
+
+    def shape(row: Row) -> Row:
+        shaped = {name: row[name] for name in names if name in row}
+        for name, shape_nested in nested.items():
+            value = shaped.get(name)
+            if isinstance(value, dict):
+                shaped[name] = shape_nested(value)
+        return shaped
+
+    return shape
+
+
+def shape(model: Type[BaseModel], data: Any, fields: Optional[Tuple[str, ...]] = None) -> Any:
+    """``data`` (a row or list of rows) narrowed to ``model`` without validation."""
+    shaper = row_shaper(model, fields)
+    if isinstance(data, list):
+        return [shaper(row) for row in data]
+    return shaper(data)
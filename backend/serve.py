@@ -0,0 +1,41 @@
+"""Production server entry point: several uvicorn workers, never reloading.
+
+    python serve.py
+
+Worker count, keep-alive, listen backlog, event loop and HTTP parser come
+from ``config.Settings`` (``WORKERS``, ``KEEP_ALIVE``, ``BACKLOG``,
+``EVENT_LOOP``, ``HTTP_PARSER``). Each worker has its own memory cache,
+schedule index and change-feed subscribers; set ``CACHE_BACKEND=redis``
+and ``CHANGEFEED_BACKEND=redis`` to share them across workers.
+"""
+import os
+
+import uvicorn
+
+from config import get_settings
+
+
+def worker_count() -> int:
+    """Configured worker processes; ``WORKERS=0`` means one per CPU."""
+    workers = get_settings().workers
+    return workers if workers > 0 else os.cpu_count() or 1
+
+
+def run(app: str = "main:app") -> None:
+    """Serve ``app`` (an import string, as uvicorn needs for several workers)."""
+    settings = get_settings()
+    uvicorn.run(
+        app,
+        host=settings.host,
+        port=settings.port,
+        workers=worker_count(),
+        loop=settings.event_loop,
+        http=settings.http_parser,
+        timeout_keep_alive=settings.keep_alive,
+        backlog=settings.backlog,
+        lifespan="on"
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from config import get_settings
+from metrics import COALESCED_READS, record_db_time
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers asking for the same key.
+
+    The first caller for a key starts the call as a task; callers arriving
+    while it runs await that task instead of starting their own, and its
+    result or exception goes to every one of them. Nothing is kept once
+    the call finishes, so this is not a cache. Each caller waits at most
+    ``timeout`` seconds, and a caller that times out or is cancelled does
+    not cancel the shared call for the others.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._generation = 0
+
+    def invalidate(self) -> None:
+        """Stop sharing the calls in flight; later callers start new ones."""
+        self._generation += 1
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Retrieve the exception so callers that gave up do not leave it unreported
+            task.exception()
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Result of ``call`` and whether it was shared with a call already in flight."""
+        key = (self._generation, key)
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.wait_for(asyncio.shield(task), self.timeout), shared
+
+
+_single_flight: SingleFlight | None = None
+
+# Writes made by this process, for readers that must not keep a result read before one
+_writes = 0
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """Get or create the process-wide single-flight group, or None when disabled."""
+    global _single_flight
+
+    settings = get_settings()
+    if not settings.singleflight_enabled:
+        return None
+    if _single_flight is None:
+        _single_flight = SingleFlight(settings.singleflight_timeout)
+    return _single_flight
+
+
+def freeze(values: Optional[Dict[str, Any]]) -> Tuple[Tuple[str, Any], ...]:
+    """Hashable, order-independent form of a filter or parameter dict, without empty entries."""
+    return tuple(sorted(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in (values or {}).items()
+        if value is not None and value != ""
+    ))
+
+
+async def coalesce(label: str, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+    """Run the read ``call``, sharing it with identical reads already in flight.
+
+    ``label`` (the table or function) is used for metrics. Callers that
+    join a shared read record their wait as database time.
+    """
+    flight = get_single_flight()
+    try:
+        hash(key)
+    except TypeError:
+        flight = None
+    if flight is None:
+        return await call()
+
+    start = time.perf_counter()
+    result, shared = await flight.do(key, call)
+    if shared:
+        record_db_time(time.perf_counter() - start)
+        COALESCED_READS.inc(source=label)
+    return result
+
+
+def write_generation() -> int:
+    """Count of writes so far; a change across a read means a write landed during it."""
+    return _writes
+
+
+def invalidate_reads() -> None:
+    """Call after a write, so later reads never join one that started before it."""
+    global _writes
+
+    _writes += 1
+    if _single_flight is not None:
+        _single_flight.invalidate()
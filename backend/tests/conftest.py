@@ -0,0 +1,20 @@
+import os
+
+# Settings require Supabase credentials; the tests only ever talk to the fake client
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "test")
+
+import pytest  # noqa: E402
+
+import database  # noqa: E402
+import scheduling  # noqa: E402
+from benchmarks.fake_supabase import AsyncFakeClient  # noqa: E402
+
+
+@pytest.fixture
+def tables(monkeypatch):
+    """Empty appointments, doctors and departments tables behind the async fake client."""
+    data = {"appointments": [], "doctors": [], "departments": []}
+    monkeypatch.setitem(database._async_clients, database.ANON, AsyncFakeClient(data))
+    monkeypatch.setattr(scheduling, "_schedule", None)
+    return data
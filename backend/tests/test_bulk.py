@@ -0,0 +1,71 @@
+import asyncio
+
+import httpx
+from postgrest.exceptions import APIError
+
+from bulk import bulk_create, bulk_delete
+from models.doctor import DoctorCreate
+from repository import Repository
+
+
+def doctor(name, **fields):
+    return {
+        "hospital_id": "H-001", "name": name, "specialty": "Cardiology", "department": "Cardiology",
+        "experience": 10, "patients": 5, "email": "doctor@hospital.test", "phone": "555-000-0000", **fields
+    }
+
+
+def counting_insert(monkeypatch, fail):
+    calls = []
+
+    async def insert(self, rows, upsert=False):
+        calls.append(len(rows))
+        error = fail(rows)
+        if error is not None:
+            raise error
+        return [{**row, "id": f"D-{row['name']}"} for row in rows]
+
+    monkeypatch.setattr(Repository, "insert", insert)
+    return calls
+
+
+def test_each_item_reports_its_own_outcome(tables):
+    items = [doctor("a"), doctor("b", experience=99), {"name": "c"}, doctor("d")]
+    response = asyncio.run(bulk_create(Repository("doctors"), DoctorCreate, items))
+
+    assert (response.succeeded, response.failed) == (2, 2)
+    assert [result.status for result in response.results] == ["ok", "error", "error", "ok"]
+    assert "experience" in response.results[1].error
+    assert response.results[0].id is not None
+
+
+def test_rejected_chunk_is_retried_row_by_row(tables, monkeypatch):
+    def check_violation(rows):
+        if any(row["name"] == "bad" for row in rows):
+            return APIError({"code": "23514", "message": "check constraint violated"})
+
+    calls = counting_insert(monkeypatch, check_violation)
+    response = asyncio.run(bulk_create(Repository("doctors"), DoctorCreate, [doctor("a"), doctor("bad"), doctor("c")]))
+
+    assert calls == [3, 1, 1, 1]
+    assert [result.status for result in response.results] == ["ok", "error", "ok"]
+    assert "check constraint" in response.results[1].error
+
+
+def test_transport_failure_fails_the_chunk_without_retrying(tables, monkeypatch):
+    calls = counting_insert(monkeypatch, lambda rows: httpx.ReadTimeout("no response"))
+    response = asyncio.run(bulk_create(Repository("doctors"), DoctorCreate, [doctor("a"), doctor("b")]))
+
+    assert calls == [2]
+    assert response.failed == 2
+    assert all("Outcome unknown" in result.error for result in response.results)
+
+
+def test_delete_reports_missing_and_duplicate_ids(tables):
+    tables["doctors"].append({**doctor("a"), "id": "D-1"})
+    response = asyncio.run(bulk_delete(Repository("doctors"), ["D-1", "D-404", "D-1"]))
+
+    assert [(result.status, result.error) for result in response.results] == [
+        ("ok", None), ("error", "Not found"), ("error", "Duplicate id"),
+    ]
+    assert tables["doctors"] == []
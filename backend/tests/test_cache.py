@@ -0,0 +1,71 @@
+import asyncio
+
+from cache import MemoryCacheBackend, ResponseCache
+from singleflight import invalidate_reads
+
+
+def counting_loader(value):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return value
+
+    return load, calls
+
+
+def test_hits_are_served_without_loading():
+    cache = ResponseCache(MemoryCacheBackend())
+    load, calls = counting_loader([{"id": "H-001"}])
+
+    async def fetch_twice():
+        return [await cache.fetch("hospitals.list", None, load) for _ in range(2)]
+
+    assert asyncio.run(fetch_twice()) == [[{"id": "H-001"}]] * 2
+    assert len(calls) == 1
+
+
+def test_missing_rows_are_not_cached():
+    cache = ResponseCache(MemoryCacheBackend())
+    load, calls = counting_loader(None)
+
+    async def fetch_twice():
+        await cache.fetch("hospitals.detail", "H-404", load)
+        await cache.fetch("hospitals.detail", "H-404", load)
+
+    asyncio.run(fetch_twice())
+    assert len(calls) == 2
+
+
+def test_load_overlapping_a_write_is_not_stored():
+    cache = ResponseCache(MemoryCacheBackend())
+    load, calls = counting_loader({"id": "H-001", "name": "new"})
+
+    async def stale():
+        # The write commits while the read is in flight
+        invalidate_reads()
+        return {"id": "H-001", "name": "old"}
+
+    async def race():
+        first = await cache.fetch("hospitals.detail", "H-001", stale)
+        second = await cache.fetch("hospitals.detail", "H-001", load)
+        return first, second
+
+    first, second = asyncio.run(race())
+    assert first["name"] == "old" and second["name"] == "new"
+    assert len(calls) == 1
+
+
+def test_load_overlapping_an_invalidation_is_not_stored():
+    cache = ResponseCache(MemoryCacheBackend())
+    load, calls = counting_loader(["new"])
+
+    async def stale():
+        await cache.invalidate("hospitals.list")
+        return ["old"]
+
+    async def race():
+        await cache.fetch("hospitals.list", None, stale)
+        return await cache.fetch("hospitals.list", None, load)
+
+    assert asyncio.run(race()) == ["new"]
@@ -0,0 +1,102 @@
+import asyncio
+import json
+from datetime import date, timedelta
+
+from starlette.requests import Request
+
+import changefeed
+import scheduling
+from changefeed import RESYNC, ChangeFeed, RedisChangeFeed
+from routes import changes
+
+
+class FakePubSub:
+    """Yields ``messages``, then drops the connection (or idles if ``last``)."""
+
+    def __init__(self, messages, subscribes=True, last=False):
+        self.messages = messages
+        self.subscribes = subscribes
+        self.last = last
+
+    async def subscribe(self, channel):
+        if not self.subscribes:
+            raise ConnectionError("connection refused")
+
+    async def listen(self):
+        for message in self.messages:
+            yield {"type": "message", "data": json.dumps([message])}
+        if self.last:
+            await asyncio.Event().wait()
+        raise ConnectionError("connection reset")
+
+    async def aclose(self):
+        pass
+
+
+class FakeRedis:
+    def __init__(self, connections):
+        self.connections = iter(connections)
+
+    def pubsub(self):
+        return next(self.connections)
+
+
+def event(record_id):
+    return {"table": "doctors", "op": "delete", "id": record_id, "hospital_id": "H-001", "data": None}
+
+
+def test_redis_feed_reconnects_and_resyncs(monkeypatch):
+    monkeypatch.setattr(changefeed, "RECONNECT_DELAY", 0)
+    feed = RedisChangeFeed.__new__(RedisChangeFeed)
+    ChangeFeed.__init__(feed, max_subscribers=10, queue_size=10)
+    feed._channel = "hms:changes"
+    feed._redis = FakeRedis([FakePubSub([], subscribes=False), FakePubSub([event("D-2")], last=True)])
+
+    async def run():
+        subscription = feed.subscribe(None, frozenset(["doctors"]))
+        listener = asyncio.create_task(feed._listen(FakePubSub([event("D-1")])))
+        received = [await asyncio.wait_for(subscription.queue.get(), 1) for _ in range(3)]
+        listener.cancel()
+        return received
+
+    first, resync, second = asyncio.run(run())
+    assert first["id"] == "D-1" and resync["op"] == RESYNC and second["id"] == "D-2"
+
+
+def test_schedule_index_rebuilds_after_a_resync(tables):
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    booking = {
+        "id": "A-1", "hospital_id": "H-001", "doctor_name": "Dr. Chen", "department": "Cardiology",
+        "date": tomorrow, "time": "09:00 AM", "type": "Consultation", "status": "Scheduled", "room": "CARD-1"
+    }
+
+    async def run():
+        schedule = scheduling.get_schedule()
+        await schedule.ensure_loaded()
+        # Written while the feed was down, so the index never heard of it
+        tables["appointments"].append(booking)
+        schedule.apply({"table": None, "op": RESYNC, "id": None, "hospital_id": None, "data": None})
+        return await scheduling.find_conflicts([(None, {**booking, "id": None, "room": "CARD-2"})])
+
+    assert "A-1" in asyncio.run(run())[0]
+
+
+def test_stream_releases_its_subscription_when_the_client_leaves_early(monkeypatch):
+    feed = ChangeFeed(max_subscribers=10, queue_size=10)
+    monkeypatch.setattr(changefeed, "_feed", feed)
+    scope = {"type": "http", "method": "GET", "path": "/api/changes/", "query_string": b"", "headers": []}
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        await asyncio.sleep(0)
+
+    async def run():
+        request = Request(scope, receive)
+        response = await changes.stream_changes(request, hospital_id=None, tables=None)
+        # Gone before the first chunk: the event generator never starts
+        await response(scope, receive, send)
+
+    asyncio.run(run())
+    assert not feed._subscribers
@@ -0,0 +1,48 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from middleware.compression import negotiate
+
+
+def doctor(record_id):
+    return {
+        "id": record_id, "hospital_id": "H-001", "name": f"Dr. {record_id}", "specialty": "Cardiology",
+        "department": "Cardiology", "experience": 10, "patients": 5, "availability": "Available",
+        "email": "doctor@hospital.test", "phone": "555-000-0000"
+    }
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("gzip;q=1, br;q=0.5", "gzip"),
+    ("*", "zstd"),
+    ("identity", None),
+    ("gzip;q=0", None),
+])
+def test_coding_negotiation(accept_encoding, expected):
+    assert negotiate(accept_encoding, ["zstd", "br", "gzip"]) == expected
+
+
+def test_large_list_is_compressed_with_a_weak_etag(tables):
+    tables["doctors"].extend(doctor(f"D-{i}") for i in range(50))
+    client = TestClient(app)
+    identity = client.get("/api/doctors/", headers={"Accept-Encoding": "identity"})
+    response = client.get("/api/doctors/", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(identity.content)
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["etag"] == "W/" + identity.headers["etag"]
+    assert response.json() == identity.json()
+
+    # The weak tag still revalidates the identity body
+    revalidated = client.get("/api/doctors/", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+def test_small_response_is_sent_as_is(tables):
+    tables["doctors"].append(doctor("D-1"))
+    response = TestClient(app).get("/api/doctors/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+
+from main import app
+from middleware.etag import etag_matches
+
+
+def doctor(record_id, availability="Available"):
+    return {
+        "id": record_id, "hospital_id": "H-001", "name": f"Dr. {record_id}", "specialty": "Cardiology",
+        "department": "Cardiology", "experience": 10, "patients": 5, "availability": availability,
+        "email": "doctor@hospital.test", "phone": "555-000-0000"
+    }
+
+
+def test_matching_if_none_match_is_a_304_without_body(tables):
+    tables["doctors"].append(doctor("D-1"))
+    client = TestClient(app)
+    first = client.get("/api/doctors/")
+    etag = first.headers["etag"]
+
+    second = client.get("/api/doctors/", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    assert "content-type" not in second.headers
+
+
+def test_changed_rows_get_a_new_etag(tables):
+    tables["doctors"].append(doctor("D-1"))
+    client = TestClient(app)
+    etag = client.get("/api/doctors/").headers["etag"]
+
+    tables["doctors"][0]["availability"] = "Off Duty"
+    response = client.get("/api/doctors/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_errors_are_not_tagged(tables):
+    response = TestClient(app).get("/api/doctors/D-404")
+    assert response.status_code == 404
+    assert "etag" not in response.headers
+
+
+def test_if_none_match_uses_weak_comparison():
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"xyz", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
@@ -0,0 +1,49 @@
+import asyncio
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from export import iter_pages
+from main import app
+from pagination import ID_KEYSET
+from repository import Repository
+
+
+def doctor(record_id, availability="Available"):
+    return {
+        "id": record_id, "hospital_id": "H-001", "name": f"Dr. {record_id}", "specialty": "Cardiology",
+        "department": "Cardiology", "experience": 10, "patients": 5, "availability": availability,
+        "email": "doctor@hospital.test", "phone": "555-000-0000"
+    }
+
+
+def test_pages_cover_the_table_in_keyset_order(tables):
+    tables["doctors"].extend(doctor(f"D-{i}") for i in (3, 0, 4, 1, 2))
+
+    async def collect():
+        return [[row["id"] for row in rows] async for rows in iter_pages(Repository("doctors"), ID_KEYSET, page_size=2)]
+
+    assert asyncio.run(collect()) == [["D-0", "D-1"], ["D-2", "D-3"], ["D-4"]]
+
+
+def test_ndjson_export_applies_filters(tables):
+    tables["doctors"].extend([doctor("D-1"), doctor("D-2", availability="Off Duty")])
+    response = TestClient(app).get("/api/doctors/export", params={"format": "ndjson", "availability": "Available"})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="doctors.ndjson"' in response.headers["content-disposition"]
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == ["D-1"]
+    assert list(rows[0])[0] == "id"
+
+
+def test_csv_export_has_a_header_and_one_line_per_row(tables):
+    tables["doctors"].extend([doctor("D-1"), doctor("D-2")])
+    response = TestClient(app).get("/api/doctors/export", headers={"Accept": "text/csv"})
+
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    header, *rows = list(csv.reader(io.StringIO(response.text)))
+    assert header[0] == "id" and "availability" in header
+    assert [row[0] for row in rows] == ["D-1", "D-2"]
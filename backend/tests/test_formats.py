@@ -0,0 +1,64 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import formats
+from formats import ARROW_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, negotiate_format
+from main import app
+
+OFFERED = ("json", "msgpack", "arrow")
+
+
+def doctor(record_id):
+    return {
+        "id": record_id, "hospital_id": "H-001", "name": f"Dr. {record_id}", "specialty": "Cardiology",
+        "department": "Cardiology", "experience": 10, "patients": 5, "availability": "Available",
+        "email": "doctor@hospital.test", "phone": "555-000-0000"
+    }
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, "json"),
+    ("*/*", "json"),
+    ("text/html", "json"),
+    (MSGPACK_MEDIA_TYPE, "msgpack"),
+    ("application/x-msgpack", "msgpack"),
+    (f"application/json;q=0.5, {ARROW_MEDIA_TYPE}", "arrow"),
+    (f"*/*;q=0.9, {MSGPACK_MEDIA_TYPE};q=0", "json"),
+    (f"{ARROW_MEDIA_TYPE}, {MSGPACK_MEDIA_TYPE}", "msgpack"),
+])
+def test_accept_negotiation(accept, expected):
+    assert negotiate_format(accept, OFFERED) == expected
+
+
+def test_missing_package_falls_back_or_is_a_406(monkeypatch):
+    monkeypatch.setattr(formats, "msgpack", None)
+    assert negotiate_format(f"{MSGPACK_MEDIA_TYPE}, application/json;q=0.5", OFFERED) == "json"
+    with pytest.raises(HTTPException) as raised:
+        negotiate_format(MSGPACK_MEDIA_TYPE, OFFERED)
+    assert raised.value.status_code == 406
+
+
+def test_msgpack_list_holds_the_json_rows(tables):
+    msgpack = pytest.importorskip("msgpack")
+    tables["doctors"].extend([doctor("D-1"), doctor("D-2")])
+    client = TestClient(app)
+
+    response = client.get("/api/doctors/", headers={"Accept": MSGPACK_MEDIA_TYPE})
+    assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    assert "Accept" in response.headers["vary"]
+    assert msgpack.unpackb(response.content) == client.get("/api/doctors/").json()
+
+
+def test_arrow_list_is_typed_and_projected(tables):
+    pyarrow = pytest.importorskip("pyarrow")
+    tables["doctors"].extend([doctor("D-1"), doctor("D-2")])
+
+    response = TestClient(app).get(
+        "/api/doctors/", params={"fields": "id,experience"}, headers={"Accept": ARROW_MEDIA_TYPE}
+    )
+    assert response.headers["content-type"] == ARROW_MEDIA_TYPE
+    table = pyarrow.ipc.open_stream(response.content).read_all()
+    assert table.schema.names == ["id", "experience"]
+    assert table.schema.field("experience").type == pyarrow.int64()
+    assert table.to_pylist() == [{"id": "D-1", "experience": 10}, {"id": "D-2", "experience": 10}]
@@ -0,0 +1,47 @@
+import asyncio
+
+from loader import Loader
+from repository import Repository
+
+
+def test_loads_in_one_tick_share_one_query(tables, monkeypatch):
+    tables["doctors"].extend({"id": f"D-{i}", "name": f"Dr. {i}"} for i in range(3))
+    queries = []
+    get_many = Repository.get_many
+
+    async def counting(self, record_ids, columns="*"):
+        queries.append(list(record_ids))
+        return await get_many(self, record_ids, columns)
+
+    monkeypatch.setattr(Repository, "get_many", counting)
+
+    async def load():
+        loader = Loader(Repository("doctors"), "id,name")
+        return await asyncio.gather(loader.load("D-0"), loader.load("D-2"), loader.load("D-0"), loader.load("D-9"))
+
+    rows = asyncio.run(load())
+    assert queries == [["D-0", "D-2", "D-9"]]
+    assert [row and row["id"] for row in rows] == ["D-0", "D-2", "D-0", None]
+
+
+def test_failed_lookups_are_retried(tables, monkeypatch):
+    tables["doctors"].append({"id": "D-0"})
+    get_many = Repository.get_many
+    failures = [RuntimeError("unavailable")]
+
+    async def flaky(self, record_ids, columns="*"):
+        if failures:
+            raise failures.pop()
+        return await get_many(self, record_ids, columns)
+
+    monkeypatch.setattr(Repository, "get_many", flaky)
+
+    async def load():
+        loader = Loader(Repository("doctors"))
+        try:
+            await loader.load("D-0")
+        except RuntimeError:
+            pass
+        return await loader.load("D-0")
+
+    assert asyncio.run(load())["id"] == "D-0"
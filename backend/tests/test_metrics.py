@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+from metrics import current_timings, serializing
+from middleware import metrics as middleware
+
+
+def test_rendering_inside_the_handler_counts_as_serialization(monkeypatch):
+    observed = {}
+    monkeypatch.setattr(
+        middleware.REQUEST_PHASE_DURATION, "observe",
+        lambda value, phase, **labels: observed.__setitem__(phase, value)
+    )
+
+    async def app(scope, receive, send):
+        timings = current_timings()
+        timings.route = "/render"
+        start = time.perf_counter()
+        # A handler returning a response it encoded itself, e.g. Projection.render
+        with serializing():
+            await asyncio.sleep(0.05)
+        timings.handler += time.perf_counter() - start
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"[]"})
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/render", "headers": []}
+    asyncio.run(middleware.MetricsMiddleware(app)(scope, None, send))
+
+    assert observed["serialization"] >= 0.05
+    assert observed["handler"] < 0.01
@@ -0,0 +1,70 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from main import app
+from pagination import APPOINTMENT_KEYSET, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+def walk(client, path, limit):
+    """Every page of ``path``, following the next-page cursor."""
+    pages = []
+    params = {"limit": limit}
+    while True:
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        pages.append([row["id"] for row in response.json()])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+        params = {"limit": limit, "after": cursor}
+
+
+def test_cursor_round_trips_keyset_values():
+    values = ["2026-03-02", "09:00 AM", 'A-"1",\\x']
+    assert decode_cursor(encode_cursor(values), APPOINTMENT_KEYSET) == values
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor(["only-id"]), encode_cursor({"id": 1})])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor, APPOINTMENT_KEYSET)
+    assert raised.value.status_code == 400
+
+
+def test_pages_cover_every_row_once(tables):
+    tables["doctors"].extend(
+        {
+            "id": f"D-{i}", "hospital_id": "H-001", "name": f"Dr. {i}", "specialty": "Cardiology",
+            "department": "Cardiology", "experience": 10, "patients": 5, "availability": "Available",
+            "email": "doctor@hospital.test", "phone": "555-000-0000"
+        }
+        for i in (4, 1, 3, 0, 2)
+    )
+    assert walk(TestClient(app), "/api/doctors/", 2) == [["D-0", "D-1"], ["D-2", "D-3"], ["D-4"]]
+
+
+def test_pages_break_ties_on_the_full_keyset(tables):
+    tables["appointments"].extend(
+        {
+            "id": f"A-{i}", "hospital_id": "H-001", "patient_name": "Ava Patel", "patient_id": "P-1",
+            "doctor_name": "Dr. Chen", "department": "Cardiology", "date": "2026-03-02",
+            "time": "09:00 AM" if i < 3 else "10:00 AM", "type": "Consultation", "status": "Scheduled", "room": "CARD-1"
+        }
+        for i in range(5)
+    )
+    pages = walk(TestClient(app), "/api/appointments/", 2)
+    assert pages == [["A-0", "A-1"], ["A-2", "A-3"], ["A-4"]]
+
+
+def test_unknown_cursor_is_a_400(tables):
+    response = TestClient(app).get("/api/doctors/", params={"after": "garbage"})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("path", [
+    "/api/hospitals/", "/api/departments/", "/api/doctors/", "/api/patients/", "/api/appointments/", "/api/search/",
+])
+def test_list_routes_document_the_cursor_header(path):
+    response = app.openapi()["paths"][path]["get"]["responses"]["200"]
+    assert NEXT_CURSOR_HEADER in response["headers"]
@@ -0,0 +1,36 @@
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+import repository
+from main import app
+from repository import query_failed
+
+
+def test_timeouts_are_504_and_other_failures_503():
+    assert query_failed(asyncio.TimeoutError(), "Patients").status_code == 504
+    assert query_failed(httpx.ReadTimeout("slow"), "Patients").status_code == 504
+    assert query_failed(RuntimeError("connection refused"), "Patients").status_code == 503
+
+
+def test_failed_list_is_an_error_not_an_empty_page(tables, monkeypatch):
+    async def timed_out(self, *args, **kwargs):
+        raise asyncio.TimeoutError()
+
+    async def unavailable(self, *args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    client = TestClient(app)
+    monkeypatch.setattr(repository.Repository, "find_page", timed_out)
+    assert client.get("/api/doctors/").status_code == 504
+    monkeypatch.setattr(repository.Repository, "find_page", unavailable)
+    assert client.get("/api/patients/").status_code == 503
+
+
+def test_failed_delete_is_not_reported_as_not_found(tables, monkeypatch):
+    async def unavailable(self, *args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(repository.Repository, "delete", unavailable)
+    assert TestClient(app).delete("/api/doctors/D-1").status_code == 503
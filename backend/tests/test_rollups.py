@@ -0,0 +1,51 @@
+import asyncio
+
+import cache
+import database
+import rollups
+from benchmarks.fake_supabase import AsyncFakeClient
+from cache import MemoryCacheBackend, ResponseCache
+
+
+def install(monkeypatch, reconcile):
+    calls = []
+
+    def function(tables, p_min_interval=None):
+        calls.append(p_min_interval)
+        return reconcile
+
+    client = AsyncFakeClient({}, functions={"reconcile_analytics_rollups": function})
+    monkeypatch.setitem(database._async_clients, database.ANON, client)
+    monkeypatch.setattr(cache, "_response_cache", ResponseCache(MemoryCacheBackend()))
+    return calls
+
+
+async def weekly_patients(value):
+    async def load():
+        return [value]
+
+    return await cache.get_cache().fetch("analytics.weekly_patients", "H-001", load)
+
+
+def test_rebuild_drops_the_cached_views(monkeypatch):
+    calls = install(monkeypatch, 42)
+
+    async def run():
+        await weekly_patients("before")
+        buckets = await rollups.reconcile()
+        return buckets, await weekly_patients("after")
+
+    assert asyncio.run(run()) == (42, ["after"])
+    assert calls == [None]
+
+
+def test_skipped_rebuild_keeps_the_cached_views(monkeypatch):
+    calls = install(monkeypatch, None)
+
+    async def run():
+        await weekly_patients("before")
+        buckets = await rollups.reconcile(min_interval=3600)
+        return buckets, await weekly_patients("after")
+
+    assert asyncio.run(run()) == (None, ["before"])
+    assert calls == [3600]
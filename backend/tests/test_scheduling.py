@@ -0,0 +1,239 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+import scheduling
+from scheduling import DOCTOR, ROOM, IntervalIndex, ScheduleIndex, find_conflicts, parse_time
+
+KEY = ("H-001", DOCTOR, "Dr. Chen", "2026-03-02")
+DAY = date(2026, 3, 2)
+
+
+def appointment(record_id, doctor="Dr. Chen", room="CARD-1", day="2026-03-02", time="09:00 AM", **fields):
+    return {
+        "id": record_id, "hospital_id": "H-001", "doctor_name": doctor, "department": "Cardiology",
+        "date": day, "time": time, "type": "Consultation", "status": "Scheduled", "room": room, **fields
+    }
+
+
+def doctor(record_id, name, availability="Available"):
+    return {"id": record_id, "hospital_id": "H-001", "name": name, "department": "Cardiology", "availability": availability}
+
+
+def department(rooms):
+    return {"id": "DEP-001-0", "hospital_id": "H-001", "name": "Cardiology", "rooms": rooms}
+
+
+def schedule_of(appointments=(), doctors=(), departments=()):
+    schedule = ScheduleIndex()
+    for row in appointments:
+        schedule.put_appointment(row)
+    for row in doctors:
+        schedule.put_doctor(row)
+    for row in departments:
+        schedule.put_department(row)
+    return schedule
+
+
+# IntervalIndex
+
+
+def test_back_to_back_intervals_do_not_overlap():
+    index = IntervalIndex()
+    index.add(KEY, (540, 570, "A-1"))
+    assert index.overlapping(KEY, 570, 600) == []
+    assert index.overlapping(KEY, 510, 540) == []
+
+
+def test_partial_containing_and_contained_intervals_overlap():
+    index = IntervalIndex()
+    index.add(KEY, (540, 570, "A-1"))
+    assert index.overlapping(KEY, 555, 585) == [(540, 570, "A-1")]
+    assert index.overlapping(KEY, 530, 600) == [(540, 570, "A-1")]
+    assert index.overlapping(KEY, 545, 550) == [(540, 570, "A-1")]
+
+
+def test_long_interval_starting_well_before_is_found():
+    index = IntervalIndex()
+    index.add(KEY, (480, 600, "surgery"))
+    index.add(KEY, (600, 630, "A-2"))
+    assert index.overlapping(KEY, 590, 605) == [(480, 600, "surgery"), (600, 630, "A-2")]
+
+
+def test_intervals_are_kept_per_resource():
+    index = IntervalIndex()
+    index.add(KEY, (540, 570, "A-1"))
+    assert index.overlapping(("H-001", ROOM, "Dr. Chen", "2026-03-02"), 540, 570) == []
+    assert index.overlapping(("H-001", DOCTOR, "Dr. Chen", "2026-03-03"), 540, 570) == []
+
+
+def test_remove_drops_only_that_interval():
+    index = IntervalIndex()
+    index.add(KEY, (540, 570, "A-1"))
+    index.add(KEY, (540, 570, "A-2"))
+    index.remove(KEY, (540, 570, "A-1"))
+    assert index.overlapping(KEY, 540, 570) == [(540, 570, "A-2")]
+    index.remove(KEY, (540, 570, "A-2"))
+    assert index.intervals(KEY) == []
+
+
+# ScheduleIndex.conflicts
+
+
+def test_same_doctor_at_overlapping_time_is_rejected():
+    schedule = schedule_of([appointment("A-1")])
+    errors = schedule.conflicts([(None, appointment(None, room="CARD-2", time="09:15 AM"))])
+    assert list(errors) == [0]
+    assert "doctor Dr. Chen" in errors[0] and "A-1" in errors[0]
+
+
+def test_same_room_with_another_doctor_is_rejected():
+    schedule = schedule_of([appointment("A-1")])
+    errors = schedule.conflicts([(None, appointment(None, doctor="Dr. Silva", time="09:15 AM"))])
+    assert "room CARD-1" in errors[0]
+
+
+def test_adjacent_and_cancelled_bookings_are_accepted():
+    schedule = schedule_of([appointment("A-1"), appointment("A-2", time="10:00 AM", status="Cancelled")])
+    assert schedule.conflicts([
+        (None, appointment(None, time="09:30 AM")),
+        (None, appointment(None, time="10:00 AM")),
+    ]) == {}
+
+
+def test_moving_an_appointment_within_its_own_slot_is_accepted():
+    schedule = schedule_of([appointment("A-1")])
+    assert schedule.conflicts([("A-1", {"time": "09:10 AM"})]) == {}
+
+
+def test_items_of_one_batch_are_checked_against_each_other():
+    schedule = schedule_of()
+    errors = schedule.conflicts([
+        (None, appointment(None)),
+        (None, appointment(None, room="CARD-2", time="09:20 AM")),
+    ])
+    assert list(errors) == [1]
+    assert "item 0" in errors[1]
+
+
+def test_slot_vacated_earlier_in_the_batch_can_be_taken():
+    schedule = schedule_of([appointment("A-1")])
+    assert schedule.conflicts([
+        ("A-1", {"time": "11:00 AM"}),
+        (None, appointment(None)),
+    ]) == {}
+
+
+# ScheduleIndex.search
+
+
+def test_search_skips_booked_slots_and_busy_rooms():
+    schedule = schedule_of(
+        [appointment("A-1", time="08:00 AM"), appointment("A-2", doctor="Dr. Silva", room="CARD-2", time="08:30 AM")],
+        [doctor("D-1", "Dr. Chen")],
+        [department(["CARD-1", "CARD-2"])],
+    )
+    slots = schedule.search("Cardiology", DAY, DAY, "Consultation", limit=4, now=datetime(2026, 1, 1))
+    assert [(slot["time"], slot["room"]) for slot in slots] == [
+        ("08:30 AM", "CARD-1"), ("08:45 AM", "CARD-1"), ("09:00 AM", "CARD-1"), ("09:15 AM", "CARD-1"),
+    ]
+    assert all(slot["doctor_id"] == "D-1" and slot["duration"] == 30 for slot in slots)
+
+
+def test_search_offers_department_rooms_without_appointments():
+    schedule = schedule_of([], [doctor("D-1", "Dr. Chen")], [department(["CARD-9"])])
+    slots = schedule.search("Cardiology", DAY, DAY, "Consultation", limit=1, now=datetime(2026, 1, 1))
+    assert slots[0]["room"] == "CARD-9" and slots[0]["time"] == "08:00 AM"
+
+
+def test_search_excludes_unbookable_doctors_and_other_departments():
+    schedule = schedule_of(
+        [],
+        [doctor("D-1", "Dr. Chen", "Off Duty"), {**doctor("D-2", "Dr. Silva"), "department": "Neurology"}],
+        [department(["CARD-1"])],
+    )
+    assert schedule.search("Cardiology", DAY, DAY, "Consultation", now=datetime(2026, 1, 1)) == []
+
+
+def test_search_fits_the_whole_appointment_before_the_day_ends():
+    schedule = schedule_of([], [doctor("D-1", "Dr. Chen")], [department(["CARD-1"])])
+    slots = schedule.search("Cardiology", DAY, DAY, "Surgery", limit=1000, now=datetime(2026, 1, 1))
+    assert parse_time(slots[-1]["time"]) == parse_time("04:00 PM")
+
+
+def test_search_today_starts_after_now():
+    schedule = schedule_of([], [doctor("D-1", "Dr. Chen")], [department(["CARD-1"])])
+    slots = schedule.search("Cardiology", DAY, DAY, "Consultation", limit=1, now=datetime(2026, 3, 2, 10, 5))
+    assert slots[0]["time"] == "10:15 AM"
+
+
+# find_conflicts
+
+
+def test_index_failure_falls_back_to_the_database(tables, monkeypatch):
+    tables["appointments"].append(appointment("A-1"))
+
+    async def unavailable(self):
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(ScheduleIndex, "ensure_loaded", unavailable)
+    errors = asyncio.run(find_conflicts([(None, appointment(None, room="CARD-2"))]))
+    assert list(errors) == [0] and "A-1" in errors[0]
+
+
+def test_days_outside_the_window_are_checked_against_the_database(tables):
+    tables["appointments"].append(appointment("A-1", day="2020-01-06"))
+    errors = asyncio.run(find_conflicts([(None, appointment(None, day="2020-01-06", room="CARD-2"))]))
+    assert list(errors) == [0]
+
+
+def test_days_inside_the_window_use_the_index(tables):
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    tables["appointments"].append(appointment("A-1", day=tomorrow))
+
+    async def check():
+        await scheduling.get_schedule().ensure_loaded()
+        # Only the index knows about this booking
+        scheduling.get_schedule().put_appointment(appointment("A-2", day=tomorrow, time="11:00 AM"))
+        return await find_conflicts([(None, appointment(None, day=tomorrow, time="11:00 AM", room="CARD-2"))])
+
+    errors = asyncio.run(check())
+    assert "A-2" in errors[0]
+
+
+def test_unchecked_writes_are_refused_when_the_database_fails(tables, monkeypatch):
+    async def unavailable(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(ScheduleIndex, "ensure_loaded", unavailable)
+    monkeypatch.setattr(scheduling, "_fetch_all", unavailable)
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(find_conflicts([(None, appointment(None))]))
+    assert raised.value.status_code == 503
+
+
+def test_refetches_of_one_event_burst_share_one_query(tables, monkeypatch):
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    queries = []
+    get_many = scheduling.Repository.get_many
+
+    async def counting(self, record_ids, columns="*"):
+        queries.append(list(record_ids))
+        return await get_many(self, record_ids, columns)
+
+    async def burst():
+        schedule = scheduling.get_schedule()
+        await schedule.ensure_loaded()
+        # Written behind the index's back, then updated through the feed
+        tables["appointments"].extend(appointment(f"A-{i}", day=tomorrow, time=f"0{i + 1}:00 PM") for i in range(3))
+        monkeypatch.setattr(scheduling.Repository, "get_many", counting)
+        for i in range(3):
+            schedule.apply({"table": "appointments", "op": "update", "id": f"A-{i}", "data": {"status": "Confirmed"}})
+        await asyncio.sleep(0.01)
+        return schedule
+
+    schedule = asyncio.run(burst())
+    assert queries == [["A-0", "A-1", "A-2"]]
+    assert schedule.conflicts([(None, appointment(None, day=tomorrow, time="01:15 PM", room="CARD-2"))])
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight, freeze
+
+
+def slow_call(calls, value, delay=0.01):
+    async def call():
+        calls.append(value)
+        await asyncio.sleep(delay)
+        return value
+
+    return call
+
+
+def test_concurrent_identical_calls_share_one():
+    flight = SingleFlight(timeout=1)
+    calls = []
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", slow_call(calls, "rows")) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert calls == ["rows"]
+    assert [result for result, _ in results] == ["rows"] * 5
+    assert [shared for _, shared in results] == [False, True, True, True, True]
+
+
+def test_calls_after_invalidation_are_not_shared():
+    flight = SingleFlight(timeout=1)
+    calls = []
+
+    async def run():
+        before = asyncio.ensure_future(flight.do("key", slow_call(calls, "before")))
+        await asyncio.sleep(0)
+        # A write lands while the first read is in flight
+        flight.invalidate()
+        after = await flight.do("key", slow_call(calls, "after"))
+        return await before, after
+
+    before, after = asyncio.run(run())
+    assert calls == ["before", "after"]
+    assert before == ("before", False) and after == ("after", False)
+
+
+def test_timed_out_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight(timeout=0.01)
+    calls = []
+
+    async def run():
+        call = slow_call(calls, "rows", delay=0.05)
+        impatient = asyncio.ensure_future(flight.do("key", call))
+        await asyncio.sleep(0)
+        flight.timeout = 1
+        patient = asyncio.ensure_future(flight.do("key", call))
+        with pytest.raises(asyncio.TimeoutError):
+            await impatient
+        return await patient
+
+    assert asyncio.run(run()) == ("rows", True)
+    assert calls == ["rows"]
+
+
+def test_errors_reach_every_caller_and_are_not_kept():
+    flight = SingleFlight(timeout=1)
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database unavailable")
+
+    async def run():
+        outcomes = await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+        retry = await flight.do("key", slow_call([], "rows"))
+        return outcomes, retry
+
+    outcomes, retry = asyncio.run(run())
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert len(attempts) == 1
+    assert retry == ("rows", False)
+
+
+def test_freeze_ignores_order_and_empty_filters():
+    assert freeze({"status": ["A", "B"], "hospital_id": "H-1", "department": None, "q": ""}) == \
+        freeze({"hospital_id": "H-1", "status": ["A", "B"]})
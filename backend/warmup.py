@@ -0,0 +1,48 @@
+import asyncio
+import logging
+
+from config import get_settings
+from pagination import ID_KEYSET
+from repository import Repository
+from routes import analytics
+import scheduling
+
+logger = logging.getLogger(__name__)
+
+# Concurrent queries issued at startup, so the HTTP pool holds open connections
+WARMUP_CONNECTIONS = 4
+
+
+async def _open_connections() -> None:
+    hospitals = Repository("hospitals", scope_column="id")
+    # Distinct limits, so single-flight does not merge them into one request
+    await asyncio.gather(*(
+        hospitals.find_page(ID_KEYSET, n + 1, columns="id") for n in range(WARMUP_CONNECTIONS)
+    ))
+
+
+async def _fill_caches() -> None:
+    await asyncio.gather(
+        scheduling.get_schedule().ensure_loaded(),
+        analytics.get_all_analytics(hospital_id=None)
+    )
+
+
+async def warm_up() -> None:
+    """Prepare this worker before it accepts traffic.
+
+    Opens pooled Supabase connections, loads the schedule index and fills
+    the all-hospitals analytics cache, so the first requests a new worker
+    serves do not pay for connection setup or cold caches. Runs from the
+    lifespan, which uvicorn completes before the worker starts accepting
+    connections. Failures are logged and do not stop startup.
+    """
+    timeout = get_settings().warmup_timeout
+    if timeout <= 0:
+        return
+
+    try:
+        await asyncio.wait_for(_open_connections(), timeout)
+        await asyncio.wait_for(_fill_caches(), timeout)
+    except Exception as e:
+        logger.warning("Worker warm-up incomplete: %r", e)